@@ -17,5 +17,8 @@ except Exception:
 os.curdir = os.path.abspath(os.path.dirname(__file__))
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     import novelwriter
     novelwriter.main(sys.argv[1:])
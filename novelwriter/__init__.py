@@ -29,10 +29,12 @@ import sys
 
 from typing import TYPE_CHECKING
 
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication, QErrorMessage
 
 from novelwriter.config import Config
 from novelwriter.error import exceptionHandler
+from novelwriter.metrics import Metrics
 from novelwriter.shared import SharedData
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -60,9 +62,10 @@ logger = logging.getLogger(__name__)
 #  Main Program
 ##
 
-# Global config and data singletons
+# Global config, data and metrics singletons
 CONFIG = Config()
 SHARED = SharedData()
+METRICS = Metrics()
 
 
 def main(sysArgs: list | None = None) -> GuiMain | None:
@@ -81,7 +84,9 @@ def main(sysArgs: list | None = None) -> GuiMain | None:
         "config=",
         "data=",
         "testmode",
-        "meminfo"
+        "meminfo",
+        "profile=",
+        "tracemalloc",
     ]
 
     helpMsg = (
@@ -99,6 +104,9 @@ def main(sysArgs: list | None = None) -> GuiMain | None:
         "     --info     Print additional runtime information.\n"
         "     --debug    Print debug output. Includes --info.\n"
         "     --meminfo  Show memory usage information in the status bar.\n"
+        "     --profile= Write cProfile stats for the session to a folder.\n"
+        "     --tracemalloc  Write memory allocation reports at project open,\n"
+        "                    build and close. Uses the --profile folder if set.\n"
         "     --style=   Sets Qt5 style flag. Defaults to 'Fusion'.\n"
         "     --config=  Alternative config file.\n"
         "     --data=    Alternative user data path.\n"
@@ -112,6 +120,8 @@ def main(sysArgs: list | None = None) -> GuiMain | None:
     testMode = False
     qtStyle = "Fusion"
     cmdOpen = None
+    profPath = None
+    traceMem = False
 
     # Parse Options
     try:
@@ -147,6 +157,10 @@ def main(sysArgs: list | None = None) -> GuiMain | None:
             testMode = True
         elif inOpt == "--meminfo":
             CONFIG.memInfo = True
+        elif inOpt == "--profile":
+            profPath = inArg
+        elif inOpt == "--tracemalloc":
+            traceMem = True
 
     # Setup Logging
     pkgLogger = logging.getLogger(__package__)
@@ -198,6 +212,12 @@ def main(sysArgs: list | None = None) -> GuiMain | None:
     # Finish initialising config
     CONFIG.initConfig(confPath, dataPath)
 
+    # Start profiling, if requested
+    if profPath or traceMem:
+        METRICS.startProfiling(
+            profPath or CONFIG.dataPath("profiling"), profile=bool(profPath), trace=traceMem
+        )
+
     if sys.platform == "darwin":
         try:
             from Foundation import NSBundle  # type: ignore
@@ -215,7 +235,12 @@ def main(sysArgs: list | None = None) -> GuiMain | None:
             pass  # Quietly ignore error
 
     # Import GUI (after dependency checks), and launch
-    from novelwriter.guimain import GuiMain
+    with METRICS.trackImports() as tracker:
+        from novelwriter.guimain import GuiMain
+    METRICS.markStartup("imports")
+    for name, elapsed in sorted(tracker.modules.items(), key=lambda x: -x[1])[:10]:
+        logger.debug("Startup: import %s took %.1f ms", name, 1000.0*elapsed)
+
     if testMode:
         nwGUI = GuiMain()
         return nwGUI
@@ -237,9 +262,13 @@ def main(sysArgs: list | None = None) -> GuiMain | None:
 
         # Launch main GUI
         nwGUI = GuiMain()
+        METRICS.markStartup("mainWindow")
+        QTimer.singleShot(0, lambda: METRICS.markStartup("firstPaint"))
         nwGUI.postLaunchTasks(cmdOpen)
 
-        sys.exit(nwApp.exec())
+        exitCode = nwApp.exec()
+        METRICS.stopProfiling()
+        sys.exit(exitCode)
 
     return None
 
@@ -452,16 +452,17 @@ def jsonEncode(data: dict | list | tuple, n: int = 0, nmax: int = 0) -> str:
     return "".join(buffer)
 
 
-def xmlIndent(tree: ET.Element | ET.ElementTree) -> None:
+def xmlIndent(tree: ET.Element | ET.ElementTree, level: int = 0) -> None:
     """A modified version of the XML indent function in the standard
     library. It behaves more closely to how the one from lxml does.
+    The level sets the depth of the element within a larger document.
     """
     if isinstance(tree, ET.ElementTree):
         tree = tree.getroot()
     if not isinstance(tree, ET.Element):
         return
 
-    indentations = ["\n"]
+    indentations = ["\n" + "  "*level]
 
     def indentChildren(elem: ET.Element, level: int) -> None:
         chLevel = level + 1
@@ -130,6 +130,7 @@ class Config:
         self.emphLabels      = True   # Add emphasis to H1 and H2 item labels
         self.backupOnClose   = False  # Flag for running automatic backups
         self.askBeforeBackup = True   # Flag for asking before running automatic backup
+        self.incrementalBackup = False  # Flag for storing backups as incremental snapshots
 
         # Text Editor Settings
         self.textFont        = ""     # Editor font
@@ -585,6 +586,7 @@ class Config:
         self._backupPath     = conf.rdPath(sec, "backuppath", self._backupPath)
         self.backupOnClose   = conf.rdBool(sec, "backuponclose", self.backupOnClose)
         self.askBeforeBackup = conf.rdBool(sec, "askbeforebackup", self.askBeforeBackup)
+        self.incrementalBackup = conf.rdBool(sec, "incrementalbackup", self.incrementalBackup)
 
         # Editor
         sec = "Editor"
@@ -693,6 +695,7 @@ class Config:
             "backuppath":      str(self._backupPath),
             "backuponclose":   str(self.backupOnClose),
             "askbeforebackup": str(self.askBeforeBackup),
+            "incrementalbackup": str(self.incrementalBackup),
         }
 
         conf["Editor"] = {
@@ -70,6 +70,7 @@ class nwRegEx:
     FMT_ST = r"(?<![\w\\])([~]{2})(?![\s~])(.+?)(?<![\s\\])(\1)(?!\w)"
     FMT_SC = r"(?i)(?<!\\)(\[[\/\!]?(?:i|b|s|u|m|sup|sub)\])"
     FMT_SV = r"(?<!\\)(\[(?i)(?:footnote):)(.+?)(?<!\\)(\])"
+    SPELL_WORD = r"\b[^\s\-\+\/–—\[\]:]+\b"
 
 # END Class nwRegEx
 
@@ -123,9 +124,12 @@ class nwFiles:
     # Project Meta Files
     BUILDS_FILE = "builds.json"
     INDEX_FILE  = "index.json"
+    TRIGRAM_FILE = "trigrams.json"
     OPTS_FILE   = "options.json"
     DICT_FILE   = "userdict.json"
-    SESS_FILE   = "sessions.jsonl"
+    SESS_FILE   = "sessions.jsonl"  # Replaced by segments in 2.5
+    SESS_PREFIX = "sessions-"
+    SESS_EXT    = ".nwsl"
 
 # END Class nwFiles
 
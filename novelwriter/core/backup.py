@@ -0,0 +1,367 @@
+"""
+novelWriter – Incremental Project Backup
+========================================
+
+File History:
+Created: 2024-05-09 [2.5a3] NWBackup
+Created: 2024-05-10 [2.5a3] BackgroundBackup
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import shutil
+import zlib
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path, PurePosixPath
+from time import time
+from typing import Any
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+from novelwriter.common import formatTimeStamp, minmax
+from novelwriter.error import logException
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+COMPRESSION_LEVEL = 2
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+T_Progress = Callable[[int, int], None]
+
+
+def stageFiles(files: list[tuple[Path, str]], path: Path) -> list[tuple[Path, str]]:
+    """Copy a list of project files into a staging folder, keeping
+    their relative paths, and return the list of copied files. The
+    copy is a consistent snapshot the backup can be made from while
+    the project is modified or closed.
+    """
+    staged = []
+    for srcPath, relPath in files:
+        dstPath = path.joinpath(*PurePosixPath(relPath).parts)
+        dstPath.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(srcPath, dstPath)
+        staged.append((dstPath, relPath))
+    return staged
+
+
+def zipFiles(
+    files: list[tuple[Path, str]], target: str | Path,
+    compression: int | None = None, progress: T_Progress | None = None
+) -> bool:
+    """Write a list of files with their relative paths into a zip file.
+    The compression level is 0 to 9, or None for no compression.
+    """
+    comp = ZIP_STORED if compression is None else ZIP_DEFLATED
+    level = minmax(compression, 0, 9) if isinstance(compression, int) else None
+    try:
+        with ZipFile(target, mode="w", compression=comp, compresslevel=level) as zipObj:
+            logger.info("Creating archive: %s", target)
+            for i, (srcPath, zipPath) in enumerate(files, 1):
+                zipObj.write(srcPath, zipPath)
+                logger.debug("Added: %s", zipPath)
+                if progress:
+                    progress(i, len(files))
+    except Exception:
+        logger.error("Failed to create archive")
+        logException()
+        return False
+    return True
+
+
+@dataclasses.dataclass
+class StagedSnapshot:
+
+    entries: dict[str, dict]
+    changed: dict[str, tuple[bytes, int, int]]
+
+
+class NWBackup:
+    """Core: Incremental Project Backup
+
+    A backup folder where each file is stored once, compressed, under
+    the SHA-256 hash of its content. Unchanged files are shared by all
+    snapshots that contain them. A snapshot is a small JSON manifest
+    that maps each project file to the hash of its content.
+
+    The size and modification time of each file is recorded in the
+    manifest, so files that are unchanged since the last snapshot are
+    not read again. The time a snapshot takes therefore depends on the
+    amount of change, not the size of the project.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._objects = self._path / "objects"
+        self._snapshots = self._path / "snapshots"
+        self._newFiles = 0
+        self._newBytes = 0
+        return
+
+    ##
+    #  Properties
+    ##
+
+    @property
+    def path(self) -> Path:
+        """The root folder of the backup."""
+        return self._path
+
+    @property
+    def newFiles(self) -> int:
+        """The number of files stored by the last snapshot."""
+        return self._newFiles
+
+    @property
+    def newBytes(self) -> int:
+        """The number of compressed bytes stored by the last snapshot."""
+        return self._newBytes
+
+    ##
+    #  Methods
+    ##
+
+    def listSnapshots(self) -> list[str]:
+        """Return the names of all snapshots, oldest first."""
+        if not self._snapshots.is_dir():
+            return []
+        return sorted(p.stem for p in self._snapshots.glob("*.json") if p.is_file())
+
+    def readManifest(self, name: str) -> dict | None:
+        """Read the manifest of a snapshot."""
+        try:
+            with open(self._snapshots / f"{name}.json", mode="r", encoding="utf-8") as fObj:
+                data = json.load(fObj)
+            if isinstance(data, dict) and isinstance(data.get("files"), dict):
+                return data
+            logger.error("Invalid backup manifest: %s", name)
+        except Exception:
+            logger.error("Failed to read backup manifest: %s", name)
+            logException()
+        return None
+
+    def createSnapshot(
+        self, files: list[tuple[Path, str]], name: str | None = None, meta: dict | None = None
+    ) -> str | None:
+        """Create a new snapshot from a list of files with their paths
+        relative to the project folder. Returns the snapshot name.
+        """
+        try:
+            staged = self.stageSnapshot(files)
+        except Exception:
+            logger.error("Failed to read project files for backup")
+            logException()
+            return None
+        return self.writeSnapshot(staged, name, meta)
+
+    def stageSnapshot(self, files: list[tuple[Path, str]]) -> StagedSnapshot:
+        """Check a list of files against the last snapshot, and read the
+        content of the files that have changed. Files where the size and
+        modification time are unchanged are not read.
+        """
+        previous = {}
+        if snapshots := self.listSnapshots():
+            if manifest := self.readManifest(snapshots[-1]):
+                previous = manifest["files"]
+
+        entries = {}
+        changed = {}
+        for srcPath, relPath in files:
+            stat = srcPath.stat()
+            entry = previous.get(relPath)
+            if (
+                isinstance(entry, dict)
+                and entry.get("size") == stat.st_size
+                and entry.get("mtime") == stat.st_mtime_ns
+                and self._objectPath(entry.get("hash", "")).is_file()
+            ):
+                entries[relPath] = entry
+            else:
+                changed[relPath] = (srcPath.read_bytes(), stat.st_size, stat.st_mtime_ns)
+
+        return StagedSnapshot(entries, changed)
+
+    def writeSnapshot(
+        self, staged: StagedSnapshot, name: str | None = None, meta: dict | None = None,
+        progress: T_Progress | None = None
+    ) -> str | None:
+        """Store the changed files of a staged snapshot and write its
+        manifest. The files are hashed and compressed in parallel.
+        """
+        self._newFiles = 0
+        self._newBytes = 0
+
+        name = name or formatTimeStamp(time(), fileSafe=True)
+        entries = dict(staged.entries)
+        total = len(staged.changed)
+        try:
+            self._objects.mkdir(parents=True, exist_ok=True)
+            self._snapshots.mkdir(parents=True, exist_ok=True)
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                futures = {
+                    executor.submit(self._storeObject, data): (relPath, size, mtime)
+                    for relPath, (data, size, mtime) in staged.changed.items()
+                }
+                for i, future in enumerate(as_completed(futures), 1):
+                    relPath, size, mtime = futures[future]
+                    digest, stored = future.result()
+                    entries[relPath] = {"hash": digest, "size": size, "mtime": mtime}
+                    if stored:
+                        self._newFiles += 1
+                        self._newBytes += stored
+                    if progress:
+                        progress(i, total)
+
+            # The manifest is written last, so an interrupted snapshot
+            # is never listed
+            manifest = {
+                "format": MANIFEST_FORMAT,
+                "created": formatTimeStamp(time()),
+                "meta": meta or {},
+                "files": dict(sorted(entries.items())),
+            }
+            tmp = self._snapshots / f"{name}.tmp"
+            with open(tmp, mode="w", encoding="utf-8") as fObj:
+                json.dump(manifest, fObj, indent=2)
+            tmp.replace(self._snapshots / f"{name}.json")
+        except Exception:
+            logger.error("Failed to create backup snapshot")
+            logException()
+            return None
+
+        logger.info(
+            "Created backup snapshot '%s' with %d files, %d new (%d bytes)",
+            name, len(entries), self._newFiles, self._newBytes
+        )
+
+        return name
+
+    def restoreSnapshot(self, name: str, target: str | Path) -> bool:
+        """Rebuild the full project of a snapshot in a target folder.
+        The target folder must be empty or not exist.
+        """
+        target = Path(target)
+        if target.exists() and (not target.is_dir() or any(target.iterdir())):
+            logger.error("Restore target is not an empty folder: %s", target)
+            return False
+
+        if (manifest := self.readManifest(name)) is None:
+            return False
+
+        try:
+            for relPath, entry in manifest["files"].items():
+                parts = PurePosixPath(relPath).parts
+                if not parts or parts[0] == "/" or ".." in parts:
+                    raise ValueError(f"Invalid path in manifest: {relPath}")
+                data = self._loadObject(entry["hash"])
+                dstPath = target.joinpath(*parts)
+                dstPath.parent.mkdir(parents=True, exist_ok=True)
+                dstPath.write_bytes(data)
+                logger.debug("Restored: %s", relPath)
+        except Exception:
+            logger.error("Failed to restore backup snapshot: %s", name)
+            logException()
+            return False
+
+        logger.info("Restored backup snapshot '%s' to: %s", name, target)
+
+        return True
+
+    ##
+    #  Internal Functions
+    ##
+
+    def _objectPath(self, digest: str) -> Path:
+        """Return the storage path of an object."""
+        return self._objects / digest[:2] / digest[2:]
+
+    def _storeObject(self, data: bytes) -> tuple[str, int]:
+        """Store the data as an object, unless it is already stored.
+        Returns the hash and the number of bytes written.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._objectPath(digest)
+        if path.is_file():
+            return digest, 0
+
+        packed = zlib.compress(data, COMPRESSION_LEVEL)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{id(data)}.tmp")
+        tmp.write_bytes(packed)
+        tmp.replace(path)
+
+        return digest, len(packed)
+
+    def _loadObject(self, digest: str) -> bytes:
+        """Load an object and check its hash."""
+        data = zlib.decompress(self._objectPath(digest).read_bytes())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Backup object is corrupted: {digest}")
+        return data
+
+# END Class NWBackup
+
+
+class BackgroundBackup(QRunnable):
+    """A runnable that writes a backup in the thread pool. The job is
+    a function that receives a progress callback and returns a truthy
+    value on success. The job must only use files that have been staged
+    for the backup, and not the live project files. The cleanup path is
+    deleted when the job is done.
+    """
+
+    def __init__(self, job: Callable[[T_Progress], Any], cleanup: Path | None = None) -> None:
+        super().__init__()
+        self._job = job
+        self._cleanup = cleanup
+        self.signals = BackgroundBackupSignals()
+        return
+
+    @pyqtSlot()
+    def run(self) -> None:
+        """Run the backup job and clean up any staged files."""
+        try:
+            result = bool(self._job(self.signals.backupProgress.emit))
+        except Exception:
+            logger.error("Background backup failed")
+            logException()
+            result = False
+        if self._cleanup:
+            shutil.rmtree(self._cleanup, ignore_errors=True)
+        self.signals.backupFinished.emit(result)
+        return
+
+# END Class BackgroundBackup
+
+
+class BackgroundBackupSignals(QObject):
+    """The QRunnable cannot emit a signal, so we need a simple QObject
+    to hold the backup signals.
+    """
+    backupProgress = pyqtSignal(int, int)
+    backupFinished = pyqtSignal(bool)
+
+# END Class BackgroundBackupSignals
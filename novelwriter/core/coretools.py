@@ -7,6 +7,7 @@ Created: 2022-10-02 [2.0rc1] DocMerger
 Created: 2022-10-11 [2.0rc1] DocSplitter
 Created: 2022-11-03 [2.0rc2] ProjectBuilder
 Created: 2023-07-20 [2.1b1]  DocDuplicator
+Created: 2024-05-16 [2.5a3]  DocReplacement
 
 This file is a part of novelWriter
 Copyright 2018–2024, Veronica Berglyd Olsen
@@ -26,7 +27,10 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
+import dataclasses
+import difflib
 import logging
+import re
 import shutil
 
 from collections.abc import Iterable
@@ -37,14 +41,20 @@ from zipfile import ZipFile, is_zipfile
 from PyQt5.QtCore import QCoreApplication, QRegularExpression
 
 from novelwriter import CONFIG, SHARED
-from novelwriter.common import isHandle, minmax, simplified
+from novelwriter.common import isHandle, minmax, simplified, transferCase
 from novelwriter.constants import nwConst, nwFiles, nwItemClass
+from novelwriter.core.index import textTrigrams
 from novelwriter.core.item import NWItem
 from novelwriter.core.project import NWProject
 from novelwriter.core.storage import NWStorageCreate
 
 logger = logging.getLogger(__name__)
 
+# Escape sequences in a RegEx that only match a single character or a
+# position, and can therefore be skipped when extracting literal text
+RX_SAFE_ESCAPES = "bBdDsSwWhHvVRAzZGnrtf"
+RX_FLAG_GROUP = re.compile(r"\(\?([\w^-]*)\)")
+
 
 class DocMerger:
     """Document tool for merging a set of documents into a single new
@@ -286,7 +296,9 @@ class DocDuplicator:
                     return
                 hMap[tHandle] = newItem.itemHandle
                 if newItem.itemParent in hMap:
-                    newItem.setParent(hMap[newItem.itemParent])
+                    self._project.tree.setItemParent(
+                        newItem.itemHandle, hMap[newItem.itemParent]
+                    )
                     self._project.tree.updateItemData(newItem.itemHandle)
                 if newItem.isFileType():
                     newDoc = self._project.storage.getDocument(newItem.itemHandle)
@@ -300,6 +312,23 @@ class DocDuplicator:
 # END Class DocDuplicator
 
 
+@dataclasses.dataclass
+class DocReplacement:
+
+    handle: str
+    count: int
+    oldText: str
+    newText: str
+
+    def diffLines(self) -> list[str]:
+        """Return the changed lines as a diff without context."""
+        return [
+            line for line in difflib.unified_diff(
+                self.oldText.splitlines(), self.newText.splitlines(), n=0, lineterm=""
+            ) if not line.startswith(("---", "+++"))
+        ]
+
+
 class DocSearch:
 
     def __init__(self) -> None:
@@ -307,6 +336,7 @@ class DocSearch:
         self.setCaseSensitive(False)
         self._words = False
         self._escape = True
+        self._matchCap = False
         return
 
     ##
@@ -331,6 +361,13 @@ class DocSearch:
         self._escape = not state
         return
 
+    def setMatchCap(self, state: bool) -> None:
+        """Set the flag for transferring the case of a match to its
+        replacement.
+        """
+        self._matchCap = state
+        return
+
     def iterSearch(
         self, project: NWProject, search: str
     ) -> Iterable[tuple[NWItem, list[tuple[int, int, str]], bool]]:
@@ -338,10 +375,18 @@ class DocSearch:
         self._regEx.setPattern(self._buildPattern(search))
         logger.debug("Searching with pattern '%s'", self._regEx.pattern())
         storage = project.storage
+        trigrams = self._requiredTrigrams(search)
+        skipped = 0
         for item in project.tree:
             if item.isFileType():
-                results, capped = self.searchText(storage.getDocumentText(item.itemHandle))
+                tHandle = item.itemHandle
+                if trigrams and not project.index.textMayContain(tHandle, trigrams):
+                    skipped += 1
+                    yield item, [], False
+                    continue
+                results, capped = self.searchText(storage.getDocumentText(tHandle))
                 yield item, results, capped
+        logger.debug("Skipped %d documents that cannot match", skipped)
         return
 
     def searchText(self, text: str) -> tuple[list[tuple[int, int, str]], bool]:
@@ -363,6 +408,106 @@ class DocSearch:
                     break
         return results, capped
 
+    def iterReplace(
+        self, project: NWProject, search: str, replace: str
+    ) -> Iterable[DocReplacement]:
+        """Iteratively replace text in all documents of a project. The
+        documents are read one by one, and the new text is only kept in
+        memory. Documents without matches are skipped.
+        """
+        self._regEx.setPattern(self._buildPattern(search))
+        logger.debug("Replacing with pattern '%s'", self._regEx.pattern())
+        storage = project.storage
+        trigrams = self._requiredTrigrams(search)
+        for item in project.tree:
+            if item.isFileType():
+                if trigrams and not project.index.textMayContain(item.itemHandle, trigrams):
+                    continue
+                text = storage.getDocumentText(item.itemHandle)
+                newText, count = self.replaceText(text, replace)
+                if count > 0:
+                    yield DocReplacement(item.itemHandle, count, text, newText)
+        return
+
+    def findMatches(self, text: str, search: str) -> list[tuple[int, int, str]]:
+        """Return the position, length and text of all matches in a
+        piece of text. The positions count UTF-16 code units, like the
+        positions in a QTextDocument. Empty matches are skipped.
+        """
+        self._regEx.setPattern(self._buildPattern(search))
+        results = []
+        rxItt = self._regEx.globalMatch(text)
+        while rxItt.hasNext():
+            rxMatch = rxItt.next()
+            if (num := rxMatch.capturedLength()) > 0:
+                results.append((rxMatch.capturedStart(), num, rxMatch.captured(0)))
+        return results
+
+    def replaceText(self, text: str, replace: str) -> tuple[str, int]:
+        """Replace all RegEx matches in a piece of text, and return the
+        new text and the number of replacements.
+        """
+        # The match positions count UTF-16 code units, so they must be
+        # mapped to string indices if the text has characters outside
+        # the Basic Multilingual Plane
+        index = None
+        if len(text.encode("utf-16-le")) != 2*len(text):
+            index = []
+            for i, c in enumerate(text):
+                index.extend((i, i) if ord(c) > 0xffff else (i,))
+            index.append(len(text))
+
+        parts = []
+        last = 0
+        count = 0
+        rxItt = self._regEx.globalMatch(text)
+        while rxItt.hasNext():
+            rxMatch = rxItt.next()
+            pos = rxMatch.capturedStart()
+            end = rxMatch.capturedEnd()
+            if end <= pos:
+                continue
+            if index:
+                pos = index[pos]
+                end = index[end]
+            parts.append(text[last:pos])
+            parts.append(transferCase(text[pos:end], replace) if self._matchCap else replace)
+            last = end
+            count += 1
+
+        if count == 0:
+            return text, 0
+
+        parts.append(text[last:])
+
+        return "".join(parts), count
+
+    def writeReplacements(
+        self, project: NWProject, replacements: list[DocReplacement]
+    ) -> list[str]:
+        """Write the new text of a list of replacements, and update the
+        index in a single batch. A document that has changed since the
+        replacement was made is skipped. Returns the handles of the
+        documents that were written.
+        """
+        written = []
+        storage = project.storage
+        with SHARED.indexBatch():
+            for entry in replacements:
+                document = storage.getDocument(entry.handle)
+                if document.readDocument() != entry.oldText:
+                    logger.warning("Document '%s' changed before replace, skipping", entry.handle)
+                    continue
+                if document.writeDocument(entry.newText):
+                    project.index.scanText(entry.handle, entry.newText)
+                    written.append(entry.handle)
+                else:
+                    logger.error("Failed to write document '%s'", entry.handle)
+
+        logger.info("Replaced text in %d documents", len(written))
+
+        return written
+
     ##
     #  Internal Functions
     ##
@@ -375,6 +520,113 @@ class DocSearch:
             search = f"(?:^|\\b){search}(?:$|\\b)"
         return search
 
+    def _requiredTrigrams(self, search: str) -> set[str]:
+        """Return the case folded trigrams a text must contain for the
+        search to match. An empty set means any text may match.
+        """
+        if self._escape:
+            return textTrigrams(search)
+        trigrams = set()
+        for literal in self._regExLiterals(search):
+            trigrams.update(textTrigrams(literal))
+        return trigrams
+
+    def _regExLiterals(self, pattern: str) -> list[str]:
+        """Extract the literal strings that any match of a RegEx must
+        contain. Only the top level of the pattern is used, and any
+        construct that isn't understood gives an empty result, which is
+        always safe.
+        """
+        if "(?#" in pattern or any("x" in f for f in RX_FLAG_GROUP.findall(pattern)):
+            return []
+
+        literals = []
+        current = []
+        depth = 0
+        i = 0
+        n = len(pattern)
+        while i < n:
+            c = pattern[i]
+            if c == "\\":
+                if i + 1 >= n:
+                    return []
+                e = pattern[i+1]
+                if e.isalnum():
+                    if e not in RX_SAFE_ESCAPES:
+                        return []
+                    current = self._pushLiteral(literals, current)
+                elif depth == 0:
+                    current.append(e)
+                i += 2
+                continue
+            elif c == "[":
+                current = self._pushLiteral(literals, current)
+                i = self._skipCharClass(pattern, i)
+                if i < 0:
+                    return []
+                continue
+            elif c == "(":
+                depth += 1
+                current = self._pushLiteral(literals, current)
+            elif c == ")":
+                depth -= 1
+                if depth < 0:
+                    return []
+            elif c == "|":
+                if depth == 0:
+                    return []
+            elif c in "?*{":
+                # The previous character is optional
+                if current:
+                    current.pop()
+                current = self._pushLiteral(literals, current)
+                if c == "{":
+                    if (end := pattern.find("}", i)) < 0:
+                        return []
+                    i = end
+            elif c in "+.^$":
+                current = self._pushLiteral(literals, current)
+            elif depth == 0:
+                current.append(c)
+            i += 1
+
+        self._pushLiteral(literals, current)
+
+        return literals
+
+    @staticmethod
+    def _pushLiteral(literals: list[str], current: list[str]) -> list[str]:
+        """Add the current literal to the list, and return a new one."""
+        if current:
+            literals.append("".join(current))
+        return []
+
+    @staticmethod
+    def _skipCharClass(pattern: str, pos: int) -> int:
+        """Return the position after a character class starting at pos,
+        or -1 if it does not end.
+        """
+        n = len(pattern)
+        i = pos + 1
+        if i < n and pattern[i] == "^":
+            i += 1
+        if i < n and pattern[i] == "]":
+            i += 1
+        while i < n:
+            c = pattern[i]
+            if c == "\\":
+                i += 2
+                continue
+            if c == "[" and pattern[i+1:i+2] in (":", ".", "="):
+                if (end := pattern.find(pattern[i+1] + "]", i + 2)) < 0:
+                    return -1
+                i = end + 2
+                continue
+            if c == "]":
+                return i + 1
+            i += 1
+        return -1
+
 # END Class DocSearch
 
 
@@ -23,6 +23,8 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 
 from pathlib import Path
@@ -30,10 +32,10 @@ from collections.abc import Iterable
 
 from PyQt5.QtGui import QFont, QFontInfo
 
-from novelwriter import CONFIG
+from novelwriter import CONFIG, METRICS
 from novelwriter.enum import nwBuildFmt
 from novelwriter.error import formatException, logException
-from novelwriter.constants import nwLabels
+from novelwriter.constants import nwHeadFmt, nwKeyWords, nwLabels
 from novelwriter.core.item import NWItem
 from novelwriter.core.tomd import ToMarkdown
 from novelwriter.core.toodt import ToOdt
@@ -54,7 +56,7 @@ class NWBuildDocument:
 
     __slots__ = (
         "_project", "_build", "_queue", "_error", "_cache", "_count",
-        "_outline", "_preview"
+        "_outline", "_preview", "_fragments", "_newFragments", "_buildKey",
     )
 
     def __init__(self, project: NWProject, build: BuildSettings) -> None:
@@ -66,6 +68,9 @@ class NWBuildDocument:
         self._count = False
         self._outline = False
         self._preview = False
+        self._fragments: dict[str, dict] = {}
+        self._newFragments: dict[str, dict] = {}
+        self._buildKey = ""
         return
 
     ##
@@ -85,6 +90,14 @@ class NWBuildDocument:
         """
         return self._cache
 
+    @property
+    def previewCache(self) -> dict:
+        """Return the fragment cache of the last preview build. The
+        HTML of each fragment is stored as an index into the fullHTML
+        list of the build, so it must be saved together with it.
+        """
+        return {"key": self._buildKey, "docs": self._newFragments}
+
     ##
     #  Setters
     ##
@@ -108,6 +121,34 @@ class NWBuildDocument:
         self._count = state
         return
 
+    def setPreviewCache(self, data: dict) -> None:
+        """Set the result of a previous preview build. Documents that
+        have not changed since then, and that are entered with the same
+        builder state, will re-use the previously generated HTML instead
+        of being processed again. The cache is ignored if the build
+        settings have changed.
+        """
+        self._fragments = {}
+        cache = data.get("fragments")
+        html = data.get("html")
+        if not (isinstance(cache, dict) and isinstance(html, list)):
+            return
+        if cache.get("key") != self._previewKey():
+            logger.debug("Build settings changed, discarding preview cache")
+            return
+        docs = cache.get("docs")
+        if isinstance(docs, dict):
+            for tHandle, entry in docs.items():
+                if not isinstance(entry, dict):
+                    continue
+                index = entry.get("html")
+                if index is None:
+                    self._fragments[tHandle] = entry
+                elif isinstance(index, int) and 0 <= index < len(html):
+                    self._fragments[tHandle] = {**entry, "html": html[index]}
+        logger.debug("Loaded %d cached preview fragment(s)", len(self._fragments))
+        return
+
     ##
     #  Special Methods
     ##
@@ -165,14 +206,17 @@ class NWBuildDocument:
         self._cache = makeObj
 
         try:
-            if isFlat:
-                makeObj.saveFlatXML(path)
-            else:
-                makeObj.saveOpenDocText(path)
+            with METRICS.timer("build.write"):
+                if isFlat:
+                    makeObj.saveFlatXML(path)
+                else:
+                    makeObj.saveOpenDocText(path)
         except Exception as exc:
             logException()
             self._error = formatException(exc)
 
+        METRICS.memorySnapshot("build-odt")
+
         return
 
     def iterBuildHTML(self, path: Path | None, asJson: bool = False) -> Iterable[tuple[int, bool]]:
@@ -184,10 +228,15 @@ class NWBuildDocument:
 
         makeObj.setPreview(self._preview)
         makeObj.setLinkHeadings(self._preview)
+        self._newFragments = {}
+        self._buildKey = self._previewKey() if self._preview else ""
         for i, tHandle in enumerate(self._queue):
             self._error = None
             if filtered.get(tHandle, (False, 0))[0]:
-                yield i, self._doBuild(makeObj, tHandle)
+                if self._preview:
+                    yield i, self._doPreviewBuild(makeObj, tHandle)
+                else:
+                    yield i, self._doBuild(makeObj, tHandle)
             else:
                 yield i, False
 
@@ -201,14 +250,17 @@ class NWBuildDocument:
 
         if isinstance(path, Path):
             try:
-                if asJson:
-                    makeObj.saveHtmlJson(path)
-                else:
-                    makeObj.saveHtml5(path)
+                with METRICS.timer("build.write"):
+                    if asJson:
+                        makeObj.saveHtmlJson(path)
+                    else:
+                        makeObj.saveHtml5(path)
             except Exception as exc:
                 logException()
                 self._error = formatException(exc)
 
+        METRICS.memorySnapshot("build-html")
+
         return
 
     def iterBuildMarkdown(self, path: Path, extendedMd: bool) -> Iterable[tuple[int, bool]]:
@@ -239,11 +291,14 @@ class NWBuildDocument:
         self._cache = makeObj
 
         try:
-            makeObj.saveMarkdown(path)
+            with METRICS.timer("build.write"):
+                makeObj.saveMarkdown(path)
         except Exception as exc:
             logException()
             self._error = formatException(exc)
 
+        METRICS.memorySnapshot("build-md")
+
         return
 
     def iterBuildNWD(self, path: Path | None, asJson: bool = False) -> Iterable[tuple[int, bool]]:
@@ -268,20 +323,24 @@ class NWBuildDocument:
 
         if isinstance(path, Path):
             try:
-                if asJson:
-                    makeObj.saveRawMarkdownJSON(path)
-                else:
-                    makeObj.saveRawMarkdown(path)
+                with METRICS.timer("build.write"):
+                    if asJson:
+                        makeObj.saveRawMarkdownJSON(path)
+                    else:
+                        makeObj.saveRawMarkdown(path)
             except Exception as exc:
                 logException()
                 self._error = formatException(exc)
 
+        METRICS.memorySnapshot("build-nwd")
+
         return
 
     ##
     #  Internal Functions
     ##
 
+    @METRICS.timed("build.setup")
     def _setupBuild(self, bldObj: Tokenizer) -> dict:
         """Configure the build object."""
         # Get Settings
@@ -369,7 +428,92 @@ class NWBuildDocument:
 
         return filtered
 
-    def _doBuild(self, bldObj: Tokenizer, tHandle: str, convert: bool = True) -> bool:
+    def _doPreviewBuild(self, bldObj: ToHtml, tHandle: str) -> bool:
+        """Build a single document for the preview. If the document is
+        unchanged since the last preview, and the builder state going
+        into it is the same, the cached fragment is used instead.
+        """
+        tItem = self._project.tree[tHandle]
+        if not isinstance(tItem, NWItem):
+            return True
+
+        text = self._project.storage.getDocumentText(tHandle) if tItem.isFileType() else ""
+        docKey = self._fragmentKey(tItem, text)
+        state = bldObj.buildState
+        nHtml = len(bldObj.fullHTML)
+
+        cached = self._fragments.get(tHandle)
+        if cached and cached.get("key") == docKey and cached.get("state") == state:
+            if (html := cached.get("html")) is not None:
+                bldObj.appendFragment(html, cached.get("notes", {}), cached.get("used", []))
+            bldObj.addStats(cached.get("stats", {}))
+            bldObj.addOutline(cached.get("outline", {}))
+            bldObj.setBuildState(cached.get("end", state))
+            self._newFragments[tHandle] = {**cached, "html": None if html is None else nHtml}
+            METRICS.count("build.cachedDocuments")
+            return True
+
+        counts = bldObj.textStats.copy()
+        outline = set(bldObj.textOutline)
+        if not self._doBuild(bldObj, tHandle, text=text):
+            return False
+
+        if (nNew := len(bldObj.fullHTML) - nHtml) in (0, 1):
+            notes, used = bldObj.getFootnoteData(tHandle, state[-1])
+            self._newFragments[tHandle] = {
+                "key": docKey,
+                "state": state,
+                "end": bldObj.buildState[:5],
+                "html": nHtml if nNew else None,
+                "stats": {
+                    k: v - counts.get(k, 0) for k, v in bldObj.textStats.items()
+                    if v != counts.get(k, 0)
+                },
+                "outline": {
+                    k: v for k, v in bldObj.textOutline.items() if k not in outline
+                },
+                "notes": notes,
+                "used": used,
+            }
+
+        return True
+
+    def _previewKey(self) -> str:
+        """Generate a key for the settings that affect all documents of
+        a preview build.
+        """
+        data = json.dumps([
+            self._build.pack().get("settings", {}),
+            self._project.data.autoReplace,
+            self._project.data.language,
+            CONFIG.tabWidth,
+        ], sort_keys=True)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def _fragmentKey(self, tItem: NWItem, text: str) -> str:
+        """Generate a key for the content of a single document. This
+        includes the referenced tags used in the heading formats.
+        """
+        tHandle = tItem.itemHandle
+        digest = hashlib.sha1(text.encode("utf-8"))
+        digest.update(f"{tItem.itemName}|{tItem.itemType.name}|{tItem.itemLayout.name}".encode())
+        formats = " ".join(
+            self._build.getStr(k) for k in (
+                "headings.fmtChapter", "headings.fmtUnnumbered", "headings.fmtScene",
+                "headings.fmtAltScene", "headings.fmtSection", "headings.fmtTitle",
+            )
+        )
+        if nwHeadFmt.CHAR_POV in formats or nwHeadFmt.CHAR_FOCUS in formats:
+            index = self._project.index
+            for nHead in range(1, index.getHandleHeaderCount(tHandle) + 1):
+                for keyClass in (nwKeyWords.POV_KEY, nwKeyWords.FOCUS_KEY):
+                    refs = index.getReferenceForHeader(tHandle, nHead, keyClass)
+                    digest.update("|".join(refs).encode())
+        return digest.hexdigest()
+
+    def _doBuild(
+        self, bldObj: Tokenizer, tHandle: str, convert: bool = True, text: str | None = None
+    ) -> bool:
         """Build a single document and add it to the build object."""
         tItem = self._project.tree[tHandle]
         if isinstance(tItem, NWItem):
@@ -383,15 +527,21 @@ class NWBuildDocument:
                     if self._outline:
                         bldObj.buildOutline()
                 elif tItem.isFileType():
-                    bldObj.setText(tHandle)
-                    bldObj.doPreProcessing()
-                    bldObj.tokenizeText()
-                    if self._count:
-                        bldObj.countStats()
-                    if self._outline:
-                        bldObj.buildOutline()
+                    with METRICS.timer("build.read"):
+                        bldObj.setText(tHandle, text)
+                    with METRICS.timer("build.tokenize"):
+                        bldObj.doPreProcessing()
+                        bldObj.tokenizeText()
+                    with METRICS.timer("build.stats"):
+                        if self._count:
+                            bldObj.countStats()
+                        if self._outline:
+                            bldObj.buildOutline()
                     if convert:
-                        bldObj.doConvert()
+                        with METRICS.timer("build.convert"):
+                            bldObj.doConvert()
+                    bldObj.releaseTokens()
+                    METRICS.count("build.documents")
                 else:
                     logger.info(f"Build: Skipping '{tHandle}'")
 
@@ -30,6 +30,7 @@ from time import time
 from typing import TYPE_CHECKING
 from pathlib import Path
 
+from novelwriter import METRICS
 from novelwriter.enum import nwItemLayout, nwItemClass
 from novelwriter.error import formatException, logException
 from novelwriter.common import formatTimeStamp, isHandle
@@ -142,6 +143,7 @@ class NWDocument:
 
         return (contentPath / f"{self._handle}.nwd").is_file()
 
+    @METRICS.timed("document.read")
     def readDocument(self, isOrphan: bool = False) -> str | None:
         """Read the document specified by the handle set in the
         constructor, capturing potential file system errors and parse
@@ -200,6 +202,7 @@ class NWDocument:
 
         return text
 
+    @METRICS.timed("document.write")
     def writeDocument(self, text: str, forceWrite: bool = False) -> bool:
         """Write the document specified by the handle attribute. Handle
         any IO errors in the process  Returns True if successful, False
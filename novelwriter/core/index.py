@@ -8,6 +8,7 @@ Created: 2022-05-28 [2.0rc1] IndexItem
 Created: 2022-05-28 [2.0rc1] IndexHeading
 Created: 2022-05-29 [2.0rc1] TagsIndex
 Created: 2022-05-29 [2.0rc1] ItemIndex
+Created: 2024-05-16 [2.5a3]  TrigramIndex
 
 This file is a part of novelWriter
 Copyright 2018–2024, Veronica Berglyd Olsen
@@ -31,12 +32,14 @@ import json
 import logging
 import random
 
-from collections.abc import ItemsView, Iterable
+from bisect import bisect_left, insort
+from collections.abc import ItemsView, Iterable, Set
+from heapq import nsmallest
 from pathlib import Path
 from time import time
 from typing import TYPE_CHECKING, Literal
 
-from novelwriter import SHARED
+from novelwriter import METRICS, SHARED
 from novelwriter.common import (
     checkInt, isHandle, isItemClass, isListInstance, isTitleTag, jsonEncode
 )
@@ -52,8 +55,10 @@ if TYPE_CHECKING:  # pragma: no cover
 logger = logging.getLogger(__name__)
 
 T_NoteTypes = Literal["footnotes", "comments"]
+T_FileStamp = tuple[int, int]
 
 TT_NONE = "T0000"  # Default title key
+NGRAM_SIZE = 3     # Longest n-gram in the tag completion index
 MAX_RETRY = 1000  # Key generator recursion limit
 KEY_SOURCE = "0123456789bcdfghjklmnpqrstvwxz"
 NOTE_TYPES: list[T_NoteTypes] = ["footnotes", "comments"]
@@ -79,8 +84,13 @@ class NWIndex:
     TagsIndex class. This is duplicate information used for quicker
     lookups from the tags and back to items where they are defined.
 
+    The text of every document is also kept as a set of trigrams in a
+    TrigramIndex, which the project search uses to skip documents that
+    cannot contain a match.
+
     The index data is cached in a JSON file between writing sessions in
-    order to save startup time. The cached index is validated on input,
+    order to save startup time. The trigrams are cached in a separate
+    file next to it. The cached index is validated on input,
     and a broken flag set if it is not valid. If it is invalid, the
     loaded data is cleared and it is up to the calling code to initiate
     a rebuild of the index data.
@@ -93,6 +103,7 @@ class NWIndex:
         # Storage and State
         self._tagsIndex = TagsIndex()
         self._itemIndex = ItemIndex(project)
+        self._textIndex = TrigramIndex()
         self._indexBroken = False
 
         # TimeStamps
@@ -120,20 +131,23 @@ class NWIndex:
         """Clear the index dictionaries and time stamps."""
         self._tagsIndex.clear()
         self._itemIndex.clear()
+        self._textIndex.clear()
         self._indexChange = 0.0
         self._rootChange = {}
         SHARED.indexSignalProxy({"event": "clearIndex"})
         return
 
+    @METRICS.timed("index.rebuild")
     def rebuildIndex(self) -> None:
         """Rebuild the entire index from scratch."""
-        self.clearIndex()
-        for nwItem in self._project.tree:
-            if nwItem.isFileType():
-                text = self._project.storage.getDocumentText(nwItem.itemHandle)
-                self.scanText(nwItem.itemHandle, text, blockSignal=True)
-        self._indexBroken = False
-        SHARED.indexSignalProxy({"event": "buildIndex"})
+        with SHARED.indexBatch():
+            self.clearIndex()
+            for nwItem in self._project.tree:
+                if nwItem.isFileType():
+                    text = self._project.storage.getDocumentText(nwItem.itemHandle)
+                    self.scanText(nwItem.itemHandle, text, blockSignal=True)
+            self._indexBroken = False
+            SHARED.indexSignalProxy({"event": "buildIndex"})
         return
 
     def deleteHandle(self, tHandle: str) -> None:
@@ -143,6 +157,7 @@ class NWIndex:
         for tTag in delTags:
             del self._tagsIndex[tTag]
         del self._itemIndex[tHandle]
+        del self._textIndex[tHandle]
         SHARED.indexSignalProxy({
             "event": "updateTags",
             "deleted": delTags,
@@ -159,6 +174,55 @@ class NWIndex:
             self.scanText(tHandle, self._project.storage.getDocumentText(tHandle))
         return
 
+    def updateMovedHandle(self, tHandle: str, oldRoot: str | None, wasActive: bool) -> bool:
+        """Update the index for an item that has been moved in the
+        project tree. A move only changes the root, class and active
+        state of an item, so the document text is only re-scanned when
+        it was not indexed as an active document before. Returns True if
+        the document was re-scanned.
+        """
+        tItem = self._project.tree[tHandle]
+        if tItem is None:
+            return False
+        if tItem.isInactiveClass():
+            self.deleteHandle(tHandle)
+            return False
+        if not tItem.isFileType():
+            return False
+        if not wasActive or tHandle not in self._itemIndex:
+            self.reIndexHandle(tHandle)
+            return True
+
+        # The tags defined in the item follow its class
+        logger.debug("Updating moved item '%s'", tHandle)
+        className = tItem.itemClass.name
+        updated = []
+        for tagKey in self._itemIndex.allItemTags(tHandle):
+            tags = self._tagsIndex
+            if tags.tagHandle(tagKey) == tHandle and tags.tagClass(tagKey) != className:
+                tags.add(
+                    tags.tagName(tagKey), tags.tagDisplay(tagKey), tHandle,
+                    tags.tagHeading(tagKey), className,
+                )
+                updated.append(tagKey)
+
+        nowTime = time()
+        self._indexChange = nowTime
+        self._rootChange[oldRoot] = nowTime
+        self._rootChange[tItem.itemRoot] = nowTime
+        if updated:
+            SHARED.indexSignalProxy({
+                "event": "updateTags",
+                "updated": updated,
+                "deleted": [],
+            })
+        SHARED.indexSignalProxy({
+            "event": "scanText",
+            "handle": tHandle,
+        })
+
+        return False
+
     def indexChangedSince(self, checkTime: int | float) -> bool:
         """Check if the index has changed since a given time."""
         return self._indexChange > float(checkTime)
@@ -203,18 +267,26 @@ class NWIndex:
                 self._indexBroken = True
                 return False
 
+        self._loadTrigrams()
+
         logger.debug("Checking index")
 
         # Check that all files are indexed
-        for fHandle in self._project.storage.scanContent():
-            if fHandle not in self._itemIndex:
-                logger.warning("Item '%s' is not in the index", fHandle)
-                self.reIndexHandle(fHandle)
-
-        self._indexChange = time()
-        SHARED.indexSignalProxy({"event": "buildIndex"})
-
-        logger.debug("Index loaded in %.3f ms", (time() - tStart)*1000)
+        storage = self._project.storage
+        with SHARED.indexBatch():
+            for fHandle in storage.scanContent():
+                if fHandle not in self._itemIndex:
+                    logger.warning("Item '%s' is not in the index", fHandle)
+                    self.reIndexHandle(fHandle)
+                elif not self._textIndex.isCurrent(fHandle, stamp := self._fileStamp(fHandle)):
+                    self._textIndex.add(fHandle, storage.getDocumentText(fHandle), stamp)
+
+            self._indexChange = time()
+            SHARED.indexSignalProxy({"event": "buildIndex"})
+
+        tTotal = time() - tStart
+        METRICS.addTime("index.load", tTotal)
+        logger.debug("Index loaded in %.3f ms", tTotal*1000)
 
         return True
 
@@ -243,7 +315,12 @@ class NWIndex:
             logException()
             return False
 
-        logger.debug("Index saved in %.3f ms", (time() - tStart)*1000)
+        if not self._saveTrigrams():
+            return False
+
+        tTotal = time() - tStart
+        METRICS.addTime("index.save", tTotal)
+        logger.debug("Index saved in %.3f ms", tTotal*1000)
 
         return True
 
@@ -251,6 +328,7 @@ class NWIndex:
     #  Index Building
     ##
 
+    @METRICS.timed("index.scanText")
     def scanText(self, tHandle: str, text: str, blockSignal: bool = False) -> bool:
         """Scan a piece of text associated with a handle. This will
         update the indices accordingly. This function takes the handle
@@ -270,8 +348,12 @@ class NWIndex:
         itemTags = dict.fromkeys(self._itemIndex.allItemTags(tHandle), False)
         self._itemIndex.add(tHandle, tItem)
 
+        # Keep the trigrams of all files, since they are all searchable
+        self._textIndex.add(tHandle, text, self._fileStamp(tHandle))
+
         # Run word counter for the whole text
         cC, wC, pC = standardCounter(text)
+        METRICS.sample("index.scanText.words", wC)
         tItem.setCharCount(cC)
         tItem.setWordCount(wC)
         tItem.setParaCount(pC)
@@ -303,6 +385,56 @@ class NWIndex:
 
         return True
 
+    ##
+    #  Internal Load and Save Helpers
+    ##
+
+    def _loadTrigrams(self) -> None:
+        """Load the trigrams cache file. The trigrams are only used to
+        speed up searches, so if the file is missing or invalid, the
+        trigrams are rebuilt from the documents instead.
+        """
+        self._textIndex.clear()
+        textFile = self._project.storage.getMetaFile(nwFiles.TRIGRAM_FILE)
+        if isinstance(textFile, Path) and textFile.exists():
+            try:
+                with open(textFile, mode="r", encoding="utf-8") as inFile:
+                    data = json.load(inFile)["novelWriter.trigramIndex"]
+                self._textIndex.unpackData(data)
+            except Exception:
+                logger.error("Failed to load trigrams file")
+                logException()
+                self._textIndex.clear()
+        return
+
+    def _saveTrigrams(self) -> bool:
+        """Save the trigrams cache file."""
+        textFile = self._project.storage.getMetaFile(nwFiles.TRIGRAM_FILE)
+        if not isinstance(textFile, Path):
+            return False
+        try:
+            data = self._textIndex.packData()
+            with open(textFile, mode="w+", encoding="utf-8") as outFile:
+                json.dump({"novelWriter.trigramIndex": data}, outFile)
+        except Exception:
+            logger.error("Failed to save trigrams file")
+            logException()
+            return False
+        return True
+
+    def _fileStamp(self, tHandle: str) -> T_FileStamp:
+        """Return the modification time and size of a document file, or
+        zeros if it doesn't exist.
+        """
+        contentPath = self._project.storage.contentPath
+        if isinstance(contentPath, Path):
+            try:
+                stat = (contentPath / f"{tHandle}.nwd").stat()
+                return stat.st_mtime_ns, stat.st_size
+            except OSError:
+                pass
+        return 0, 0
+
     ##
     #  Internal Indexer Helpers
     ##
@@ -359,9 +491,9 @@ class NWIndex:
             self._indexWordCounts(tHandle, text, cTitle)
 
         # Prune no longer used tags
+        updated = []
+        deleted = []
         for tTag, isActive in tags.items():
-            updated = []
-            deleted = []
             if isActive:
                 logger.debug("Added/updated tag '%s'", tTag)
                 updated.append(tTag)
@@ -369,12 +501,12 @@ class NWIndex:
                 logger.debug("Removed tag '%s'", tTag)
                 del self._tagsIndex[tTag]
                 deleted.append(tTag)
-            if updated or deleted:
-                SHARED.indexSignalProxy({
-                    "event": "updateTags",
-                    "updated": updated,
-                    "deleted": deleted,
-                })
+        if updated or deleted:
+            SHARED.indexSignalProxy({
+                "event": "updateTags",
+                "updated": updated,
+                "deleted": deleted,
+            })
 
         return
 
@@ -503,13 +635,23 @@ class NWIndex:
 
         # If we're still here, we check that the references exist
         # Class references cannot have the | symbol in them
-        refKey = nwKeyWords.KEY_CLASS[tBits[0]].name
+        refTags = self._tagsIndex.classSet(nwKeyWords.KEY_CLASS[tBits[0]].name)
         for n in range(1, nBits):
-            if (aBit := tBits[n]) in self._tagsIndex:
-                isGood[n] = self._tagsIndex.tagClass(aBit) == refKey and "|" not in aBit
+            aBit = tBits[n]
+            isGood[n] = aBit.lower() in refTags and "|" not in aBit
 
         return isGood
 
+    def tagsVersion(self) -> int:
+        """Return the current version of the tags index."""
+        return self._tagsIndex.version
+
+    def tagsChangedSince(self, keys: Iterable[str], version: int) -> bool:
+        """Check if any of the tag keys have changed after a given
+        version of the tags index.
+        """
+        return self._tagsIndex.changedSince(keys, version)
+
     def parseValue(self, text: str) -> tuple[str, str]:
         """Parse a single value into a name and display part."""
         name, _, display = text.partition("|")
@@ -527,6 +669,12 @@ class NWIndex:
     #  Extract Data
     ##
 
+    def textMayContain(self, tHandle: str, trigrams: Iterable[str]) -> bool:
+        """Check if the text of a document may contain all of a set of
+        trigrams. Only a False result is certain.
+        """
+        return self._textIndex.mayContain(tHandle, trigrams, self._fileStamp(tHandle))
+
     def getItemData(self, tHandle: str) -> IndexItem | None:
         """Get the index data for a given item."""
         return self._itemIndex[tHandle]
@@ -685,11 +833,29 @@ class NWIndex:
         """Return all tags based on itemClass."""
         return self._tagsIndex.filterTagNames(itemClass.name)
 
+    def completeTags(self, itemClass: nwItemClass, text: str, limit: int = 15) -> list[str]:
+        """Return the names of the tags of a class that contain a piece
+        of text. The most referenced tags are listed first.
+        """
+        matches = self._tagsIndex.matchClassKeys(itemClass.name, text)
+        if not matches:
+            return []
+        counts = self._itemIndex.referenceCounts()
+        keys = nsmallest(limit, matches, key=lambda k: (-counts.get(k, 0), k))
+        return [self._tagsIndex.tagName(k) for k in keys]
+
     def getTagsData(
-        self, activeOnly: bool = True
+        self, activeOnly: bool = True, itemClass: nwItemClass | None = None
     ) -> Iterable[tuple[str, str, str, IndexItem | None, IndexHeading | None]]:
-        """Return all known tags."""
-        for tag, data in self._tagsIndex.items():
+        """Return all known tags, or the tags of a given class sorted by
+        their key.
+        """
+        if itemClass is None:
+            tags = self._tagsIndex.items()
+        else:
+            keys = self._tagsIndex.classKeys(itemClass.name)
+            tags = ((k, self._tagsIndex[k] or {}) for k in keys)
+        for tag, data in tags:
             iItem = self._itemIndex[data.get("handle")]
             hItem = None if iItem is None else iItem[data.get("heading")]
             if not activeOnly or (iItem and iItem.item.isActive):
@@ -719,20 +885,42 @@ class TagsIndex:
 
     A wrapper class that holds the reverse lookup tags index. This is
     just a simple wrapper around a single dictionary to keep tighter
-    control of the keys.
+    control of the keys. A sorted list of the keys of each class is
+    also kept, so the tags of a class can be listed in order without
+    filtering and sorting the full index. For tag completion, each
+    class also has a map from every n-gram of up to NGRAM_SIZE
+    characters to the keys that contain it.
+
+    Every change to a tag's existence, class or handle increments a
+    version counter, and the version of the last change of each tag is
+    recorded. Users can use this to check whether the tags they have
+    validated have changed since.
     """
 
-    __slots__ = ("_tags")
+    __slots__ = (
+        "_tags", "_classes", "_grams", "_version", "_reset", "_changes", "_snapshot",
+        "_dirty",
+    )
 
     def __init__(self) -> None:
         self._tags: dict[str, dict[str, str]] = {}
+        self._classes: dict[str, list[str]] = {}
+        self._grams: dict[str, dict[str, set[str]]] = {}
+        self._version = 0
+        self._reset = 0
+        self._changes: dict[str, int] = {}
+        self._snapshot: dict[str, frozenset[str]] = {}
+        self._dirty: set[str] = set()
         return
 
     def __contains__(self, tagKey: str) -> bool:
         return tagKey.lower() in self._tags
 
     def __delitem__(self, tagKey: str) -> None:
-        self._tags.pop(tagKey.lower(), None)
+        key = tagKey.lower()
+        if entry := self._tags.pop(key, None):
+            self._removeClassKey(key, entry["class"])
+            self._touch(key, entry["class"])
         return
 
     def __getitem__(self, tagKey: str) -> dict | None:
@@ -742,9 +930,21 @@ class TagsIndex:
     #  Methods
     ##
 
+    @property
+    def version(self) -> int:
+        """The version of the tags, which increases on every change."""
+        return self._version
+
     def clear(self) -> None:
         """Clear the index."""
         self._tags = {}
+        self._classes = {}
+        self._grams = {}
+        self._version += 1
+        self._reset = self._version
+        self._changes = {}
+        self._snapshot = {}
+        self._dirty = set()
         return
 
     def items(self) -> ItemsView:
@@ -754,7 +954,19 @@ class TagsIndex:
     def add(self, tagKey: str, displayName: str, tHandle: str,
             sTitle: str, className: str) -> None:
         """Add a key to the index and set all values."""
-        self._tags[tagKey.lower()] = {
+        key = tagKey.lower()
+        if (entry := self._tags.get(key)) and entry["class"] != className:
+            self._removeClassKey(key, entry["class"])
+            self._touch(key, entry["class"])
+        if not entry or entry["class"] != className:
+            insort(self._classes.setdefault(className, []), key)
+            grams = self._grams.setdefault(className, {})
+            for gram in _nGrams(key):
+                grams.setdefault(gram, set()).add(key)
+            self._touch(key, className)
+        elif entry["handle"] != tHandle:
+            self._touch(key, className)
+        self._tags[key] = {
             "name": tagKey,
             "display": displayName or tagKey,
             "handle": tHandle,
@@ -789,6 +1001,49 @@ class TagsIndex:
             x.get("name", "") for x in self._tags.values() if x.get("class", "") == className
         ]
 
+    def classKeys(self, className: str) -> list[str]:
+        """Get the sorted list of tag keys for a given class."""
+        return self._classes.get(className, []).copy()
+
+    def classSet(self, className: str) -> frozenset[str]:
+        """Get a frozen set of the tag keys of a given class. The sets
+        are cached, and only rebuilt for classes that have changed.
+        """
+        if className in self._dirty:
+            self._snapshot[className] = frozenset(self._classes.get(className, []))
+            self._dirty.discard(className)
+        elif className not in self._snapshot:
+            self._snapshot[className] = frozenset(self._classes.get(className, []))
+        return self._snapshot[className]
+
+    def matchClassKeys(self, className: str, text: str) -> Set[str]:
+        """Get the tag keys of a class that contain a piece of text.
+        The returned set must not be modified.
+        """
+        text = text.lower()
+        if not text:
+            return self.classSet(className)
+        grams = self._grams.get(className, {})
+        if len(text) <= NGRAM_SIZE:
+            return grams.get(text, set())
+
+        # Intersect the n-grams of the text, smallest first, and then
+        # check the remaining candidates
+        parts = sorted(
+            (grams.get(text[i:i+NGRAM_SIZE], set()) for i in range(len(text) - NGRAM_SIZE + 1)),
+            key=len
+        )
+        candidates = parts[0].intersection(*parts[1:])
+        return {k for k in candidates if text in k}
+
+    def changedSince(self, keys: Iterable[str], version: int) -> bool:
+        """Check if any of the tag keys have changed after a given
+        version of the index.
+        """
+        if version < self._reset:
+            return True
+        return any(self._changes.get(key, 0) > version for key in keys)
+
     ##
     #  Pack/Unpack
     ##
@@ -801,7 +1056,7 @@ class TagsIndex:
         """Iterate through the tagsIndex loaded from cache and check
         that it's valid.
         """
-        self._tags = {}
+        self.clear()
         if not isinstance(data, dict):
             raise ValueError("tagsIndex is not a dict")
 
@@ -832,9 +1087,130 @@ class TagsIndex:
 
         return
 
+    ##
+    #  Internal Functions
+    ##
+
+    def _touch(self, key: str, className: str) -> None:
+        """Record a change to a tag of a given class."""
+        self._version += 1
+        self._changes[key] = self._version
+        self._dirty.add(className)
+        return
+
+    def _removeClassKey(self, key: str, className: str) -> None:
+        """Remove a key from the sorted keys of a class."""
+        keys = self._classes.get(className, [])
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            keys.pop(pos)
+        grams = self._grams.get(className, {})
+        for gram in _nGrams(key):
+            if (gKeys := grams.get(gram)) is not None:
+                gKeys.discard(key)
+                if not gKeys:
+                    del grams[gram]
+        return
+
 # END Class TagsIndex
 
 
+# =============================================================================================== #
+#  The Trigram Index Object
+# =============================================================================================== #
+
+class TrigramIndex:
+    """Core: Trigram Index Wrapper Class
+
+    Holds the case folded trigrams of the text of every document. The
+    trigrams of a document are stored as a single string of sorted,
+    concatenated trigrams, which takes a fraction of the memory of a
+    set. A lookup may match across two trigrams, which only means the
+    document is not skipped.
+
+    Each entry also records the modification time and size of the
+    document file when the trigrams were made. An entry is only used
+    while the file is unchanged, so a document written without being
+    re-indexed is never skipped.
+    """
+
+    __slots__ = ("_data", "_stamps")
+
+    def __init__(self) -> None:
+        self._data: dict[str, str] = {}
+        self._stamps: dict[str, T_FileStamp] = {}
+        return
+
+    def __contains__(self, tHandle: str) -> bool:
+        return tHandle in self._data
+
+    def __delitem__(self, tHandle: str) -> None:
+        self._data.pop(tHandle, None)
+        self._stamps.pop(tHandle, None)
+        return
+
+    def clear(self) -> None:
+        """Clear the index."""
+        self._data = {}
+        self._stamps = {}
+        return
+
+    def add(self, tHandle: str, text: str, stamp: T_FileStamp) -> None:
+        """Set the trigrams of a document."""
+        self._data[tHandle] = "".join(sorted(textTrigrams(text)))
+        self._stamps[tHandle] = stamp
+        return
+
+    def isCurrent(self, tHandle: str, stamp: T_FileStamp) -> bool:
+        """Check if a document has an entry for its current file."""
+        return tHandle in self._data and self._stamps.get(tHandle) == stamp
+
+    def mayContain(self, tHandle: str, trigrams: Iterable[str], stamp: T_FileStamp) -> bool:
+        """Check if a document may contain all of a set of trigrams. A
+        document without a current entry may contain anything.
+        """
+        if not self.isCurrent(tHandle, stamp):
+            return True
+        data = self._data[tHandle]
+        return all(gram in data for gram in trigrams)
+
+    ##
+    #  Pack/Unpack
+    ##
+
+    def packData(self) -> dict:
+        """Pack the trigrams and file stamps into a single dictionary."""
+        return {
+            tHandle: [*self._stamps[tHandle], trigrams]
+            for tHandle, trigrams in self._data.items()
+        }
+
+    def unpackData(self, data: dict) -> None:
+        """Iterate through the trigramIndex loaded from cache and check
+        that it's valid.
+        """
+        self.clear()
+        if not isinstance(data, dict):
+            raise ValueError("trigramIndex is not a dict")
+
+        for tHandle, entry in data.items():
+            if not isHandle(tHandle):
+                raise ValueError("trigramIndex keys must be handles")
+            if not (isinstance(entry, list) and len(entry) == 3):
+                raise ValueError("trigramIndex entry is not a list of three values")
+            mTime, size, trigrams = entry
+            if not (isinstance(mTime, int) and isinstance(size, int)):
+                raise ValueError("trigramIndex file stamp is not two integers")
+            if not isinstance(trigrams, str) or len(trigrams) % 3 != 0:
+                raise ValueError("trigramIndex entry is not a string of trigrams")
+            self._data[tHandle] = trigrams
+            self._stamps[tHandle] = (mTime, size)
+
+        return
+
+# END Class TrigramIndex
+
+
 # =============================================================================================== #
 #  The Item Index Objects
 # =============================================================================================== #
@@ -849,18 +1225,20 @@ class ItemIndex:
     IndexHeading object for each heading of the text.
     """
 
-    __slots__ = ("_project", "_items")
+    __slots__ = ("_project", "_items", "_refCounts")
 
     def __init__(self, project: NWProject) -> None:
         self._project = project
         self._items: dict[str, IndexItem] = {}
+        self._refCounts: dict[str, int] = {}
         return
 
     def __contains__(self, tHandle: str) -> bool:
         return tHandle in self._items
 
     def __delitem__(self, tHandle: str) -> None:
-        self._items.pop(tHandle, None)
+        if tItem := self._items.pop(tHandle, None):
+            self._countReferences(tItem, -1)
         return
 
     def __getitem__(self, tHandle: str) -> IndexItem | None:
@@ -873,15 +1251,24 @@ class ItemIndex:
     def clear(self) -> None:
         """Clear the index."""
         self._items = {}
+        self._refCounts = {}
         return
 
     def add(self, tHandle: str, nwItem: NWItem) -> None:
         """Add a new item to the index. This will overwrite the item if
         it already exists.
         """
+        if tItem := self._items.get(tHandle):
+            self._countReferences(tItem, -1)
         self._items[tHandle] = IndexItem(tHandle, nwItem)
         return
 
+    def referenceCounts(self) -> dict[str, int]:
+        """Return the number of keyword references to each tag key. The
+        counts are updated as items are added and removed.
+        """
+        return self._refCounts
+
     def allItemTags(self, tHandle: str) -> list[str]:
         """Get all tags set for headings of an item."""
         if tHandle in self._items:
@@ -963,8 +1350,12 @@ class ItemIndex:
 
     def addHeadingRef(self, tHandle: str, sTitle: str, tagKeys: list[str], refType: str) -> None:
         """Set the reference tags for a heading on a given item."""
-        if tHandle in self._items:
-            self._items[tHandle].addHeadingRef(sTitle, tagKeys, refType)
+        if (tItem := self._items.get(tHandle)) and (hItem := tItem[sTitle]):
+            before = {k: len(v) for k, v in hItem.references.items()}
+            tItem.addHeadingRef(sTitle, tagKeys, refType)
+            for tagKey, refTypes in hItem.references.items():
+                if (diff := len(refTypes) - before.get(tagKey, 0)) > 0:
+                    self._refCounts[tagKey] = self._refCounts.get(tagKey, 0) + diff
         return
 
     def addNoteKey(self, tHandle: str, style: T_NoteTypes, key: str) -> None:
@@ -999,6 +1390,7 @@ class ItemIndex:
         that it's valid. This will raise errors if there is a problem.
         """
         self._items = {}
+        self._refCounts = {}
         if not isinstance(data, dict):
             raise ValueError("itemIndex is not a dict")
 
@@ -1011,9 +1403,27 @@ class ItemIndex:
                 tItem = IndexItem(tHandle, nwItem)
                 tItem.unpackData(tData)
                 self._items[tHandle] = tItem
+                self._countReferences(tItem, 1)
 
         return
 
+    ##
+    #  Internal Functions
+    ##
+
+    def _countReferences(self, tItem: IndexItem, sign: int) -> None:
+        """Add or subtract the references of an item to or from the
+        reference counts.
+        """
+        counts = self._refCounts
+        for _, hItem in tItem.items():
+            for tagKey, refTypes in hItem.references.items():
+                if (count := counts.get(tagKey, 0) + sign*len(refTypes)) > 0:
+                    counts[tagKey] = count
+                else:
+                    counts.pop(tagKey, None)
+        return
+
 # END Class ItemIndex
 
 
@@ -1374,6 +1784,21 @@ KEY_REQ = {
 }
 
 
+def _nGrams(key: str) -> set[str]:
+    """Return all substrings of a tag key up to NGRAM_SIZE long."""
+    return {
+        key[i:i+n] for n in range(1, NGRAM_SIZE + 1) for i in range(len(key) - n + 1)
+    }
+
+
+def textTrigrams(text: str) -> set[str]:
+    """Return all case folded substrings of a text that are three
+    characters long.
+    """
+    text = text.casefold()
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+
 def _checkModKey(modifier: str, key: str) -> bool:
     """Check if a modifier and key set are ok."""
     if modifier in MODIFIERS:
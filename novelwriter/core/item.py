@@ -37,6 +37,7 @@ from novelwriter.constants import nwHeaders, nwLabels, trConst
 
 if TYPE_CHECKING:  # pragma: no cover
     from novelwriter.core.project import NWProject
+    from novelwriter.core.tree import NWTree
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +55,7 @@ class NWItem:
         "_project", "_name", "_handle", "_parent", "_root", "_order",
         "_type", "_class", "_layout", "_status", "_import", "_active",
         "_expanded", "_heading", "_charCount", "_wordCount",
-        "_paraCount", "_cursorPos", "_initCount",
+        "_paraCount", "_cursorPos", "_initCount", "_tree",
     )
 
     def __init__(self, project: NWProject, handle: str) -> None:
@@ -81,6 +82,9 @@ class NWItem:
         self._cursorPos = 0     # Last cursor position
         self._initCount = 0     # Initial word count
 
+        # The tree keeping running counts of the item, if any
+        self._tree: NWTree | None = None
+
         return
 
     def __repr__(self) -> str:
@@ -400,6 +404,15 @@ class NWItem:
         if self._import is None:
             self.setImport("New")  # This forces a default value lookup
 
+        self._countChanged()
+
+        return
+
+    def setTree(self, tree: NWTree | None) -> None:
+        """Set the tree that keeps running counts of the item's word
+        count and status.
+        """
+        self._tree = tree
         return
 
     ##
@@ -466,6 +479,7 @@ class NWItem:
         else:
             logger.error("Unrecognised item class '%s'", value)
             self._class = nwItemClass.NO_CLASS
+        self._countChanged()
         return
 
     def setLayout(self, value: Any) -> None:
@@ -479,6 +493,7 @@ class NWItem:
         else:
             logger.error("Unrecognised item layout '%s'", value)
             self._layout = nwItemLayout.NO_LAYOUT
+        self._countChanged()
         return
 
     def setStatus(self, value: Any) -> None:
@@ -486,6 +501,7 @@ class NWItem:
         items of the current project.
         """
         self._status = self._project.data.itemStatus.check(value)
+        self._countChanged()
         return
 
     def setImport(self, value: Any) -> None:
@@ -493,6 +509,7 @@ class NWItem:
         items of the current project.
         """
         self._import = self._project.data.itemImport.check(value)
+        self._countChanged()
         return
 
     def setActive(self, state: Any) -> None:
@@ -535,6 +552,7 @@ class NWItem:
             self._wordCount = max(0, count)
         else:
             self._wordCount = 0
+        self._countChanged()
         return
 
     def setParaCount(self, count: Any) -> None:
@@ -558,4 +576,14 @@ class NWItem:
         self._initCount = self._wordCount
         return
 
+    ##
+    #  Internal Functions
+    ##
+
+    def _countChanged(self) -> None:
+        """Let the tree update its running counts for the item."""
+        if self._tree is not None:
+            self._tree.updateItemCounts(self)
+        return
+
 # END Class NWItem
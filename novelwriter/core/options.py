@@ -54,6 +54,7 @@ VALID_MAP: dict[str, set[str]] = {
         "winWidth", "winHeight", "replaceColW", "statusColW", "importColW",
     },
     "GuiWordList": {"winWidth", "winHeight"},
+    "GuiSpellReport": {"winWidth", "winHeight", "widthCol0"},
     "GuiNovelView": {"lastCol", "lastColSize"},
     "GuiBuildSettings": {
         "winWidth", "winHeight", "treeWidth", "filterWidth",
@@ -25,21 +25,24 @@ from __future__ import annotations
 
 import json
 import logging
+import shutil
 
 from collections.abc import Iterable
 from enum import Enum
 from functools import partial
 from pathlib import Path
+from tempfile import mkdtemp
 from time import time
 from typing import TYPE_CHECKING
 
 from PyQt5.QtCore import QCoreApplication
 
-from novelwriter import CONFIG, SHARED, __version__, __hexversion__
+from novelwriter import CONFIG, METRICS, SHARED, __version__, __hexversion__
 from novelwriter.common import (
     checkStringNone, formatInt, formatTimeStamp, getFileSize, hexToInt, makeFileNameSafe, minmax
 )
 from novelwriter.constants import trConst, nwLabels
+from novelwriter.core.backup import BackgroundBackup, NWBackup, stageFiles, zipFiles
 from novelwriter.core.index import NWIndex
 from novelwriter.core.options import OptionState
 from novelwriter.core.projectdata import NWProjectData
@@ -83,6 +86,7 @@ class NWProject:
         self._changed  = False  # The project has unsaved changes
         self._valid    = False  # The project was successfully loaded
         self._state    = NWProjectState.UNKNOWN
+        self._backups: set[BackgroundBackup] = set()  # Running backups
 
         # Internal Mapping
         self.tr = partial(QCoreApplication.translate, "NWProject")
@@ -244,6 +248,7 @@ class NWProject:
     #  Project Methods
     ##
 
+    @METRICS.timed("project.open")
     def openProject(self, projPath: str | Path, clearLock: bool = False) -> bool:
         """Open the project file provided. If it doesn't exist, assume
         it is a folder and look for the file within it. If successful,
@@ -272,8 +277,8 @@ class NWProject:
             return False
 
         self._data = NWProjectData(self)
-        projContent = []
-        xmlParsed = xmlReader.read(self._data, projContent)
+        self._tree.clear()
+        xmlParsed = xmlReader.read(self._data, self._tree.unpackItem)
         appVersion = xmlReader.appVersion or self.tr("Unknown")
         if not xmlParsed:
             if xmlReader.state == XMLReadState.NOT_NWX_FILE:
@@ -319,7 +324,6 @@ class NWProject:
         # Extract Data
         # ============
 
-        self._tree.unpack(projContent)
         self._options.loadSettings()
         self._loadProjectLocalisation()
 
@@ -349,9 +353,11 @@ class NWProject:
         self._state = NWProjectState.READY
 
         SHARED.newStatusMessage(self.tr("Opened Project: {0}").format(self._data.name))
+        METRICS.memorySnapshot("open")
 
         return True
 
+    @METRICS.timed("project.save")
     def saveProject(self, autoSave: bool = False) -> bool:
         """Save the project main XML file. The saving command itself
         uses a temporary filename, and the file is replaced afterwards
@@ -371,6 +377,7 @@ class NWProject:
         else:
             self._data.incSaveCount()
 
+        self._tree.checkCounts()
         self.updateWordCounts()
         self.countStatus()
 
@@ -401,9 +408,11 @@ class NWProject:
 
         return True
 
+    @METRICS.timed("project.close")
     def closeProject(self, idleTime: float = 0.0) -> None:
         """Close the project."""
         logger.info("Closing project")
+        METRICS.memorySnapshot("close")
         self._index.clearIndex()  # Triggers clear signal, see #1718
         self._options.saveSettings()
         self._tree.writeToCFile()
@@ -412,8 +421,12 @@ class NWProject:
         self._lockedBy = None
         return
 
+    @METRICS.timed("project.backup")
     def backupProject(self, doNotify: bool) -> bool:
-        """Create a zip file of the entire project."""
+        """Create a backup of the entire project. The backup is written
+        in the background, and the function returns True if it was
+        started.
+        """
         if not self._storage.isOpen():
             logger.error("No project open")
             return False
@@ -437,20 +450,37 @@ class NWProject:
             SHARED.error(self.tr("Could not create backup folder."), exc=exc)
             return False
 
+        # The files are staged on the calling thread, so the backup is
+        # consistent even if the project changes or is closed, while the
+        # archive is written in the thread pool
         timeStamp = formatTimeStamp(time(), fileSafe=True)
-        archName = baseDir / f"{cleanName} {timeStamp}.zip"
-        if self._storage.zipIt(archName, compression=2):
-            if doNotify:
-                size = formatInt(getFileSize(archName))
-                SHARED.info(
-                    self.tr("Created a backup of your project of size {0}B.").format(size),
-                    info=self.tr("Path: {0}").format(str(backupPath))
-                )
-        else:
-            SHARED.error(self.tr("Could not write backup archive."))
+        files = self._storage.listProjectFiles()
+        backup = None
+        stagePath = None
+        try:
+            if CONFIG.incrementalBackup:
+                backup = NWBackup(baseDir / "Snapshots")
+                staged = backup.stageSnapshot(files)
+                meta = {"uuid": self._data.uuid, "name": self._data.name}
+                target = backup.path
+                job = partial(backup.writeSnapshot, staged, timeStamp, meta)
+            else:
+                stagePath = Path(mkdtemp(prefix="nw-backup-"))
+                target = baseDir / f"{cleanName} {timeStamp}.zip"
+                job = partial(zipFiles, stageFiles(files, stagePath), target, 2)
+        except Exception as exc:
+            if stagePath:
+                shutil.rmtree(stagePath, ignore_errors=True)
+            SHARED.error(self.tr("Could not prepare the project backup."), exc=exc)
             return False
 
-        SHARED.newStatusMessage(self.tr("Project backed up to '{0}'").format(str(archName)))
+        runner = BackgroundBackup(job, cleanup=stagePath)
+        runner.signals.backupProgress.connect(self._backupProgress)
+        runner.signals.backupFinished.connect(
+            partial(self._backupFinished, runner, target, backup, doNotify)
+        )
+        self._backups.add(runner)
+        SHARED.runInThreadPool(runner)
 
         return True
 
@@ -540,13 +570,15 @@ class NWProject:
             else:
                 # Item is orphaned
                 logger.error("Item '%s' has no parent in current tree", tHandle)
-                tItem.setParent(None)
+                self._tree.setItemParent(tHandle, None)
                 yield tItem
         return
 
     def updateWordCounts(self) -> None:
-        """Update the total word count values."""
-        novel, notes = self._tree.sumWords()
+        """Update the total word count values from the running totals
+        of the project tree.
+        """
+        novel, notes = self._tree.wordTotals()
         self._data.setCurrCounts(novel=novel, notes=notes)
         return
 
@@ -555,13 +587,13 @@ class NWProject:
         project tree. The counts themselves are kept in the NWStatus
         objects. This is essentially a refresh.
         """
+        status, imports = self._tree.statusTotals()
         self._data.itemStatus.resetCounts()
         self._data.itemImport.resetCounts()
-        for nwItem in self._tree:
-            if nwItem.isNovelLike():
-                self._data.itemStatus.increment(nwItem.itemStatus)
-            else:
-                self._data.itemImport.increment(nwItem.itemImport)
+        for key, count in status.items():
+            self._data.itemStatus.increment(key, count)
+        for key, count in imports.items():
+            self._data.itemImport.increment(key, count)
         return
 
     def localLookup(self, word: str | int) -> str:
@@ -575,6 +607,35 @@ class NWProject:
     #  Internal Functions
     ##
 
+    def _backupProgress(self, done: int, total: int) -> None:
+        """Report the progress of a running backup."""
+        if total > 0:
+            SHARED.newStatusMessage(
+                self.tr("Backing up project ... {0}%").format(round(100*done/total))
+            )
+        return
+
+    def _backupFinished(
+        self, runner: BackgroundBackup, target: Path, backup: NWBackup | None,
+        doNotify: bool, success: bool
+    ) -> None:
+        """Report the result of a finished backup."""
+        self._backups.discard(runner)
+        if not success:
+            SHARED.error(self.tr("Could not write backup archive."))
+            return
+
+        if doNotify:
+            size = formatInt(backup.newBytes if backup else getFileSize(target))
+            SHARED.info(
+                self.tr("Created a backup of your project of size {0}B.").format(size),
+                info=self.tr("Path: {0}").format(str(target))
+            )
+
+        SHARED.newStatusMessage(self.tr("Project backed up to '{0}'").format(str(target)))
+
+        return
+
     def _loadProjectLocalisation(self) -> bool:
         """Load the language data for the current project language."""
         if self._data.language is None or CONFIG._nwLangPath is None:
@@ -28,12 +28,13 @@ from __future__ import annotations
 import logging
 import xml.etree.ElementTree as ET
 
+from collections.abc import Callable
 from enum import Enum
 from time import time
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, BinaryIO, TextIO
 from pathlib import Path
 
-from novelwriter import __version__, __hexversion__
+from novelwriter import METRICS, __version__, __hexversion__
 from novelwriter.common import (
     checkBool, checkInt, checkString, checkStringNone, formatTimeStamp,
     hexToInt, simplified, xmlIndent, yesNo
@@ -167,57 +168,35 @@ class ProjectXMLReader:
     #  Methods
     ##
 
-    def read(self, data: NWProjectData, content: list) -> bool:
-        """Read and parse the project XML file."""
+    def read(self, data: NWProjectData, content: list | Callable[[dict], Any]) -> bool:
+        """Read and parse the project XML file. The file is parsed
+        incrementally, and the content items are passed on and released
+        as they are read. The content argument is either a list the
+        items are appended to, or a function that receives each item.
+        """
         tStart = time()
         logger.debug("Reading project XML")
+
+        addItem = content.append if isinstance(content, list) else content
+        self._state = XMLReadState.NO_ERROR
+
         try:
-            xml = ET.parse(str(self._path))
-            self._state = XMLReadState.NO_ERROR
+            with open(self._path, mode="rb") as fObj:
+                if not self._parseStream(fObj, data, addItem):
+                    return False
         except Exception as exc:
             logger.error("Failed to parse project XML", exc_info=exc)
             self._state = XMLReadState.CANNOT_PARSE
             return False
 
-        xRoot = xml.getroot()
-        self._root = str(xRoot.tag)
-        if self._root != "novelWriterXML":
-            self._state = XMLReadState.NOT_NWX_FILE
-            return False
-
-        fileVersion = str(xRoot.attrib.get("fileVersion", ""))
-        if fileVersion in NUM_VERSION:
-            self._version = NUM_VERSION[fileVersion]
-        else:
-            self._state = XMLReadState.UNKNOWN_VERSION
-            return False
-
-        logger.debug("XML is '%s' version '%s'", self._root, fileVersion)
-
-        self._revision = checkInt(xRoot.attrib.get("fileRevision"), 0)
-        self._appVersion = str(xRoot.attrib.get("appVersion", ""))
-        self._hexVersion = hexToInt(xRoot.attrib.get("hexVersion", ""))
-        self._timeStamp = str(xRoot.attrib.get("timeStamp", ""))
-
-        for xSection in xRoot:
-            if xSection.tag == "project":
-                self._parseProjectMeta(xSection, data)
-            elif xSection.tag == "settings":
-                self._parseProjectSettings(xSection, data)
-            elif xSection.tag == "content":
-                if self._version >= 0x0104:
-                    self._parseProjectContent(xSection, data, content)
-                else:
-                    self._parseProjectContentLegacy(xSection, data, content)
-            else:
-                logger.warning("Ignored <root/%s> in XML", xSection.tag)
-
         if self._version == HEX_VERSION:
             self._state = XMLReadState.PARSED_OK
         else:
             self._state = XMLReadState.WAS_LEGACY
 
-        logger.debug("Project XML loaded in %.3f ms", (time() - tStart)*1000)
+        tTotal = time() - tStart
+        METRICS.addTime("project.xml.read", tTotal)
+        logger.debug("Project XML loaded in %.3f ms", tTotal*1000)
 
         return True
 
@@ -294,65 +273,120 @@ class ProjectXMLReader:
 
         return
 
-    def _parseProjectContent(
-        self, xSection: ET.Element, data: NWProjectData, content: list
-    ) -> None:
-        """Parse the content section of the XML file."""
-        logger.debug("Parsing <content> section")
+    def _parseStream(
+        self, fObj: BinaryIO, data: NWProjectData, addItem: Callable[[dict], Any]
+    ) -> bool:
+        """Parse the XML file as a stream of elements. The project and
+        settings sections are parsed when they are complete, while the
+        content items are parsed one by one and then dropped from the
+        tree to keep the memory use flat for large projects.
+        """
+        xRoot = None
+        xContent = None
+        depth = 0
+        for event, xElem in ET.iterparse(fObj, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    xRoot = xElem
+                    if not self._parseRoot(xRoot):
+                        return False
+                elif depth == 2 and xElem.tag == "content" and self._version >= 0x0104:
+                    xContent = xElem
+                    logger.debug("Parsing <content> section")
+                    data.setInitCounts(novel=xElem.attrib.get("novelWords", None))  # Moved in 1.5
+                    data.setInitCounts(notes=xElem.attrib.get("notesWords", None))  # Moved in 1.5
+                continue
 
-        data.setInitCounts(novel=xSection.attrib.get("novelWords", None))  # Moved in 1.5
-        data.setInitCounts(notes=xSection.attrib.get("notesWords", None))  # Moved in 1.5
+            depth -= 1
+            if depth == 1 and xRoot is not None:
+                if xElem.tag == "project":
+                    self._parseProjectMeta(xElem, data)
+                elif xElem.tag == "settings":
+                    self._parseProjectSettings(xElem, data)
+                elif xElem.tag == "content":
+                    if xContent is None:
+                        self._parseProjectContentLegacy(xElem, data, addItem)
+                else:
+                    logger.warning("Ignored <root/%s> in XML", xElem.tag)
+                xRoot.remove(xElem)
+            elif depth == 2 and xContent is not None:
+                if xElem.tag == "item":
+                    addItem(self._parseContentItem(xElem))
+                else:
+                    logger.warning("Ignored item <root/content/%s> in XML", xElem.tag)
+                del xContent[:]
 
-        for xItem in xSection:
-            if xItem.tag != "item":
-                logger.warning("Ignored item <root/content/%s> in XML", xItem.tag)
-                continue
+        return True
 
-            item = {}
-            meta = {}
-            name = {}
-            itemName = ""
+    def _parseRoot(self, xRoot: ET.Element) -> bool:
+        """Parse the attributes of the root element."""
+        self._root = str(xRoot.tag)
+        if self._root != "novelWriterXML":
+            self._state = XMLReadState.NOT_NWX_FILE
+            return False
 
-            item["handle"] = checkStringNone(xItem.attrib.get("handle"), None)
-            item["parent"] = checkStringNone(xItem.attrib.get("parent"), None)
-            item["root"]   = checkStringNone(xItem.attrib.get("root"), None)
-            item["order"]  = checkInt(xItem.attrib.get("order"), 0)
-            item["type"]   = checkString(xItem.attrib.get("type"), "NO_TYPE")
-            item["class"]  = checkString(xItem.attrib.get("class"), "NO_CLASS")
-            item["layout"] = checkString(xItem.attrib.get("layout"), "NO_LAYOUT")
-            for xVal in xItem:
-                if xVal.tag == "meta":
-                    meta["expanded"]  = checkBool(xVal.attrib.get("expanded"), False)
-                    meta["heading"]   = checkString(xVal.attrib.get("heading"), "H0")
-                    meta["charCount"] = checkInt(xVal.attrib.get("charCount"), 0)
-                    meta["wordCount"] = checkInt(xVal.attrib.get("wordCount"), 0)
-                    meta["paraCount"] = checkInt(xVal.attrib.get("paraCount"), 0)
-                    meta["cursorPos"] = checkInt(xVal.attrib.get("cursorPos"), 0)
-                elif xVal.tag == "name":
-                    itemName = simplified(checkString(xVal.text, ""))
-                    name["status"] = checkStringNone(xVal.attrib.get("status"), None)
-                    name["import"] = checkStringNone(xVal.attrib.get("import"), None)
-                    name["active"] = checkBool(xVal.attrib.get("active"), False)
-                else:
-                    logger.warning("Ignored <root/content/item/%s> in XML", xVal.tag)
+        fileVersion = str(xRoot.attrib.get("fileVersion", ""))
+        if fileVersion in NUM_VERSION:
+            self._version = NUM_VERSION[fileVersion]
+        else:
+            self._state = XMLReadState.UNKNOWN_VERSION
+            return False
 
-            # Deprecated Nodes
-            if self._version < HEX_VERSION:
-                for xVal in xItem:
-                    if xVal.tag == "name" and "exported" in xVal.attrib:
-                        name["active"] = checkBool(xVal.attrib.get("exported"), False)
+        logger.debug("XML is '%s' version '%s'", self._root, fileVersion)
 
-            content.append({
-                "name": itemName,
-                "itemAttr": item,
-                "metaAttr": meta,
-                "nameAttr": name,
-            })
+        self._revision = checkInt(xRoot.attrib.get("fileRevision"), 0)
+        self._appVersion = str(xRoot.attrib.get("appVersion", ""))
+        self._hexVersion = hexToInt(xRoot.attrib.get("hexVersion", ""))
+        self._timeStamp = str(xRoot.attrib.get("timeStamp", ""))
 
-        return
+        return True
+
+    def _parseContentItem(self, xItem: ET.Element) -> dict:
+        """Parse a single item of the content section."""
+        item = {}
+        meta = {}
+        name = {}
+        itemName = ""
+
+        item["handle"] = checkStringNone(xItem.attrib.get("handle"), None)
+        item["parent"] = checkStringNone(xItem.attrib.get("parent"), None)
+        item["root"]   = checkStringNone(xItem.attrib.get("root"), None)
+        item["order"]  = checkInt(xItem.attrib.get("order"), 0)
+        item["type"]   = checkString(xItem.attrib.get("type"), "NO_TYPE")
+        item["class"]  = checkString(xItem.attrib.get("class"), "NO_CLASS")
+        item["layout"] = checkString(xItem.attrib.get("layout"), "NO_LAYOUT")
+        for xVal in xItem:
+            if xVal.tag == "meta":
+                meta["expanded"]  = checkBool(xVal.attrib.get("expanded"), False)
+                meta["heading"]   = checkString(xVal.attrib.get("heading"), "H0")
+                meta["charCount"] = checkInt(xVal.attrib.get("charCount"), 0)
+                meta["wordCount"] = checkInt(xVal.attrib.get("wordCount"), 0)
+                meta["paraCount"] = checkInt(xVal.attrib.get("paraCount"), 0)
+                meta["cursorPos"] = checkInt(xVal.attrib.get("cursorPos"), 0)
+            elif xVal.tag == "name":
+                itemName = simplified(checkString(xVal.text, ""))
+                name["status"] = checkStringNone(xVal.attrib.get("status"), None)
+                name["import"] = checkStringNone(xVal.attrib.get("import"), None)
+                name["active"] = checkBool(xVal.attrib.get("active"), False)
+            else:
+                logger.warning("Ignored <root/content/item/%s> in XML", xVal.tag)
+
+        # Deprecated Nodes
+        if self._version < HEX_VERSION:
+            for xVal in xItem:
+                if xVal.tag == "name" and "exported" in xVal.attrib:
+                    name["active"] = checkBool(xVal.attrib.get("exported"), False)
+
+        return {
+            "name": itemName,
+            "itemAttr": item,
+            "metaAttr": meta,
+            "nameAttr": name,
+        }
 
     def _parseProjectContentLegacy(
-        self, xSection: ET.Element, data: NWProjectData, content: list
+        self, xSection: ET.Element, data: NWProjectData, addItem: Callable[[dict], Any]
     ) -> None:
         """Parse the content section of the XML file for older versions."""
         logger.debug("Parsing <content> section (legacy format)")
@@ -420,7 +454,7 @@ class ProjectXMLReader:
             if item.get("type", "") == "TRASH":
                 item["type"] = "ROOT"
 
-            content.append({
+            addItem({
                 "name": itemName,
                 "itemAttr": item,
                 "metaAttr": meta,
@@ -491,13 +525,13 @@ class ProjectXMLWriter:
         tStart = time()
         logger.debug("Writing project XML")
 
-        xRoot = ET.Element("novelWriterXML", attrib={
+        rootAttr = {
             "appVersion": str(__version__),
             "hexVersion": str(__hexversion__),
             "fileVersion": FILE_VERSION,
             "fileRevision": FILE_REVISION,
             "timeStamp": formatTimeStamp(saveTime),
-        })
+        }
 
         # Save Project Meta
         projAttr = {
@@ -507,12 +541,12 @@ class ProjectXMLWriter:
             "editTime": str(editTime),
         }
 
-        xProject = ET.SubElement(xRoot, "project", attrib=projAttr)
+        xProject = ET.Element("project", attrib=projAttr)
         self._packSingleValue(xProject, "name", data.name)
         self._packSingleValue(xProject, "author", data.author)
 
         # Save Project Settings
-        xSettings = ET.SubElement(xRoot, "settings")
+        xSettings = ET.Element("settings")
         self._packSingleValue(xSettings, "doBackup", yesNo(data.doBackup))
         self._packSingleValue(xSettings, "language", data.language)
         self._packSingleValue(xSettings, "spellChecking", data.spellLang, attrib={
@@ -537,25 +571,33 @@ class ProjectXMLWriter:
             "notesWords": str(data.currCounts[1]),
         }
 
-        xContent = ET.SubElement(xRoot, "content", attrib=contAttr)
-        for item in content:
-            xItem = ET.SubElement(xContent, "item", attrib=item.get("itemAttr", {}))
-            ET.SubElement(xItem, "meta", attrib=item.get("metaAttr", {}))
-            xName = ET.SubElement(xItem, "name", attrib=item.get("nameAttr", {}))
-            xName.text = item["name"]
-
-        # Write the XML tree to file
+        # Stream the XML to file. The sections are written one by one,
+        # and the content items are serialised as they are written, so
+        # the full tree is never built. The output is identical to that
+        # of ElementTree.write on an indented tree.
         tmp = self._path.with_suffix(".tmp")
         try:
-            xml = ET.ElementTree(xRoot)
-            xmlIndent(xml)
-            xml.write(tmp, encoding="utf-8", xml_declaration=True)
+            with open(tmp, mode="w", encoding="utf-8", errors="xmlcharrefreplace") as fObj:
+                fObj.write("<?xml version='1.0' encoding='utf-8'?>\n")
+                fObj.write(f"{self._startTag('novelWriterXML', rootAttr)}\n")
+                self._writeSection(fObj, xProject)
+                self._writeSection(fObj, xSettings)
+                if content:
+                    fObj.write(f"  {self._startTag('content', contAttr)}\n")
+                    for item in content:
+                        fObj.write(f"    {self._serialiseItem(item)}\n")
+                    fObj.write("  </content>\n")
+                else:
+                    self._writeSection(fObj, ET.Element("content", attrib=contAttr))
+                fObj.write("</novelWriterXML>\n")
             tmp.replace(self._path)
         except Exception as exc:
             self._error = exc
             return False
 
-        logger.debug("Project XML saved in %.3f ms", (time() - tStart)*1000)
+        tTotal = time() - tStart
+        METRICS.addTime("project.xml.write", tTotal)
+        logger.debug("Project XML saved in %.3f ms", tTotal*1000)
 
         return True
 
@@ -563,6 +605,30 @@ class ProjectXMLWriter:
     #  Internal Functions
     ##
 
+    def _startTag(self, tag: str, attrib: dict) -> str:
+        """Serialise the start tag of an element with attributes."""
+        return ET.tostring(ET.Element(tag, attrib=attrib), encoding="unicode")[:-3] + ">"
+
+    def _writeSection(self, fObj: TextIO, xSection: ET.Element) -> None:
+        """Indent and write a complete section of the root element."""
+        xmlIndent(xSection, level=1)
+        xSection.tail = None
+        fObj.write(f"  {ET.tostring(xSection, encoding='unicode')}\n")
+        return
+
+    def _serialiseItem(self, item: dict) -> str:
+        """Serialise a single content item with its indentation set
+        for the third level of the document.
+        """
+        xItem = ET.Element("item", attrib=item.get("itemAttr", {}))
+        xItem.text = "\n      "
+        xMeta = ET.SubElement(xItem, "meta", attrib=item.get("metaAttr", {}))
+        xMeta.tail = "\n      "
+        xName = ET.SubElement(xItem, "name", attrib=item.get("nameAttr", {}))
+        xName.text = item["name"]
+        xName.tail = "\n    "
+        return ET.tostring(xItem, encoding="unicode")
+
     def _packSingleValue(
         self, xParent: ET.Element, name: str, value: str | None, attrib: dict | None = None
     ) -> None:
@@ -23,16 +23,19 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
+import gzip
 import json
 import logging
+import struct
 
-from time import time
+from datetime import datetime
+from time import localtime, time
 from typing import TYPE_CHECKING
 from pathlib import Path
 from collections.abc import Iterable
 
 from novelwriter.error import logException
-from novelwriter.common import formatTimeStamp
+from novelwriter.common import checkInt, formatTimeStamp
 from novelwriter.constants import nwFiles
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -40,12 +43,26 @@ if TYPE_CHECKING:  # pragma: no cover
 
 logger = logging.getLogger(__name__)
 
+SEGMENT_MAGIC = b"NWSL"
+SEGMENT_FORMAT = 1
+SEGMENT_HEADER = struct.Struct("<4sH")
+SEGMENT_RECORD = struct.Struct("<Bqqiii")  # Type, start, end, novel, notes, idle
+
+REC_INITIAL = 0
+REC_SESSION = 1
+
 
 class NWSessionLog:
-    """Core: Session JSON Lines Log File
+    """Core: Session Log
+
+    The class that wraps the session log, which is stored in one segment
+    file per year. Each segment is a short header followed by fixed
+    width binary records. The segments of past years are closed and
+    compressed, and only the current year's segment is appended to.
 
-    The class that wraps the session log file, which is in JSON Lines
-    format. That is, one JSON object per line.
+    Projects from earlier versions have the log in a JSON Lines file.
+    It is migrated to segments the first time the log is used. The JSON
+    Lines records are still used as the exchange format of the class.
     """
 
     def __init__(self, project: NWProject) -> None:
@@ -77,6 +94,9 @@ class NWSessionLog:
         if not isinstance(sessFile, Path):
             return False
 
+        metaPath = sessFile.parent
+        self._migrateJsonLines(sessFile)
+
         now = time()
         iNovel, iNotes = self._project.data.initCounts
         cNovel, cNotes = self._project.data.currCounts
@@ -90,18 +110,14 @@ class NWSessionLog:
             return False
 
         try:
-            if not sessFile.exists():
-                with open(sessFile, mode="w", encoding="utf-8") as fObj:
-                    fObj.write(self.createInitial(iTotal))
-
-            with open(sessFile, mode="a+", encoding="utf-8") as fObj:
-                fObj.write(self.createRecord(
-                    start=formatTimeStamp(self._start),
-                    end=formatTimeStamp(now),
-                    novel=cNovel,
-                    notes=cNotes,
-                    idle=round(idleTime)
-                ))
+            records = []
+            if not self._listSegments(metaPath):
+                records.append(SEGMENT_RECORD.pack(REC_INITIAL, int(now), int(now), iTotal, 0, 0))
+            records.append(SEGMENT_RECORD.pack(
+                REC_SESSION, int(self._start), int(now), cNovel, cNotes, round(idleTime)
+            ))
+            self._appendRecords(metaPath, localtime(self._start).tm_year, records)
+            self._closeSegments(metaPath)
 
         except Exception:
             logger.error("Failed to write to session stats file")
@@ -113,14 +129,17 @@ class NWSessionLog:
     def iterRecords(self) -> Iterable[dict]:
         """Iterate through all records in the log."""
         sessFile = self._project.storage.getMetaFile(nwFiles.SESS_FILE)
-        if isinstance(sessFile, Path) and sessFile.is_file():
-            try:
-                with open(sessFile, mode="r", encoding="utf-8") as fObj:
-                    for line in fObj:
-                        yield json.loads(line)
-            except Exception:
-                logger.error("Failed to process session stats file")
-                logException()
+        if isinstance(sessFile, Path):
+            self._migrateJsonLines(sessFile)
+            for _, path in self._listSegments(sessFile.parent):
+                # A damaged segment is skipped, and the rest still read
+                try:
+                    records = list(self._readSegment(path))
+                except Exception:
+                    logger.error("Failed to process session log segment: %s", path.name)
+                    logException()
+                    continue
+                yield from records
         return
 
     def createInitial(self, total: int) -> str:
@@ -136,4 +155,188 @@ class NWSessionLog:
         })
         return f"{data}\n"
 
+    ##
+    #  Internal Functions
+    ##
+
+    def _listSegments(self, metaPath: Path) -> list[tuple[int, Path]]:
+        """List the segment files with their year, oldest first."""
+        segments = []
+        for path in metaPath.glob(f"{nwFiles.SESS_PREFIX}*{nwFiles.SESS_EXT}*"):
+            year, _, ext = path.name.removeprefix(nwFiles.SESS_PREFIX).partition(".")
+            if year.isdigit() and f".{ext}" in (nwFiles.SESS_EXT, f"{nwFiles.SESS_EXT}.gz"):
+                segments.append((int(year), path))
+        return sorted(segments)
+
+    def _segmentPath(self, metaPath: Path, year: int) -> Path:
+        """Return the path of the open segment of a given year."""
+        return metaPath / f"{nwFiles.SESS_PREFIX}{year}{nwFiles.SESS_EXT}"
+
+    def _readSegment(self, path: Path) -> Iterable[dict]:
+        """Read the records of a segment file."""
+        with open(path, mode="rb") as fObj:
+            data = fObj.read()
+        if path.suffix == ".gz":
+            data = gzip.decompress(data)
+
+        if len(data) < SEGMENT_HEADER.size:
+            logger.error("Session log segment is too short: %s", path.name)
+            return
+
+        magic, version = SEGMENT_HEADER.unpack_from(data)
+        if magic != SEGMENT_MAGIC or version > SEGMENT_FORMAT:
+            logger.error("Unknown session log segment format: %s", path.name)
+            return
+
+        size = SEGMENT_RECORD.size
+        body = data[SEGMENT_HEADER.size:]
+        if len(body) % size:
+            logger.warning("Session log segment has an incomplete record: %s", path.name)
+            body = body[:len(body) - len(body) % size]
+
+        for rType, start, end, novel, notes, idle in SEGMENT_RECORD.iter_unpack(body):
+            if rType == REC_INITIAL:
+                yield {"type": "initial", "offset": novel}
+            elif rType == REC_SESSION:
+                yield {
+                    "type": "record", "start": formatTimeStamp(start),
+                    "end": formatTimeStamp(end), "novel": novel, "notes": notes, "idle": idle,
+                }
+        return
+
+    def _segmentData(self, metaPath: Path, year: int) -> bytes:
+        """Return the uncompressed content of the segment of a given
+        year, open or closed. If there is none, only a header is
+        returned.
+        """
+        path = self._segmentPath(metaPath, year)
+        packed = path.with_name(f"{path.name}.gz")
+        data = b""
+        if path.exists():
+            data = path.read_bytes()
+        elif packed.exists():
+            data = gzip.decompress(packed.read_bytes())
+        return data or SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_FORMAT)
+
+    def _appendRecords(self, metaPath: Path, year: int, records: list[bytes]) -> None:
+        """Append packed records to the segment of a given year. If the
+        segment is already closed, it is re-opened.
+        """
+        path = self._segmentPath(metaPath, year)
+        packed = path.with_name(f"{path.name}.gz")
+        if not path.exists() and packed.exists():
+            with open(packed, mode="rb") as fObj:
+                data = gzip.decompress(fObj.read())
+            with open(path, mode="wb") as fObj:
+                fObj.write(data)
+            packed.unlink()
+
+        with open(path, mode="ab") as fObj:
+            if fObj.tell() == 0:
+                fObj.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_FORMAT))
+            fObj.write(b"".join(records))
+
+        return
+
+    def _closeSegments(self, metaPath: Path) -> None:
+        """Compress the open segments of past years."""
+        thisYear = localtime().tm_year
+        for year, path in self._listSegments(metaPath):
+            if year < thisYear and path.suffix == nwFiles.SESS_EXT:
+                packed = path.with_name(f"{path.name}.gz")
+                with open(path, mode="rb") as fObj:
+                    data = gzip.compress(fObj.read())
+                with open(packed, mode="wb") as fObj:
+                    fObj.write(data)
+                path.unlink()
+                logger.info("Closed session log segment for %d", year)
+        return
+
+    def _migrateJsonLines(self, sessFile: Path) -> None:
+        """Move the records of a JSON Lines log into the segments. The
+        initial record is placed first in the oldest segment, and it is
+        skipped if segments already exist. Missing or invalid values
+        are read as zero, like the stats tool does.
+
+        The new segments are written to temporary files, and only put
+        in place when all of them have been written, so a failed
+        migration can be run again. If any line could not be read, the
+        old file is kept as a backup.
+        """
+        if not sessFile.is_file():
+            return
+
+        metaPath = sessFile.parent
+        hasInitial = bool(self._listSegments(metaPath))
+        initial = None
+        skipped = 0
+        years: dict[int, list[bytes]] = {}
+        pending: list[tuple[Path, Path]] = []
+        try:
+            logger.info("Converting: %s", sessFile)
+            with open(sessFile, mode="r", encoding="utf-8") as fObj:
+                for line in fObj:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        if record.get("type") == "initial":
+                            if not hasInitial:
+                                initial = checkInt(record.get("offset"), 0)
+                                hasInitial = True
+                        elif record.get("type") == "record":
+                            start = datetime.fromisoformat(str(record.get("start"))).timestamp()
+                            end = datetime.fromisoformat(str(record.get("end"))).timestamp()
+                            years.setdefault(localtime(start).tm_year, []).append(
+                                SEGMENT_RECORD.pack(
+                                    REC_SESSION, int(start), int(end),
+                                    max(checkInt(record.get("novel"), 0), 0),
+                                    max(checkInt(record.get("notes"), 0), 0),
+                                    max(checkInt(record.get("idle"), 0), 0),
+                                )
+                            )
+                        else:
+                            raise ValueError("Unknown record type")
+                    except Exception:
+                        logger.warning("Skipping invalid session log record: %s", line.strip())
+                        skipped += 1
+
+            if initial is not None:
+                stamp = int(time())
+                first = min(years) if years else localtime(stamp).tm_year
+                years.setdefault(first, []).insert(
+                    0, SEGMENT_RECORD.pack(REC_INITIAL, stamp, stamp, initial, 0, 0)
+                )
+
+            for year, records in sorted(years.items()):
+                path = self._segmentPath(metaPath, year)
+                temp = path.with_name(f"{path.name}.tmp")
+                with open(temp, mode="wb") as fObj:
+                    fObj.write(self._segmentData(metaPath, year))
+                    fObj.write(b"".join(records))
+                pending.append((temp, path))
+
+            for temp, path in pending:
+                temp.replace(path)
+                path.with_name(f"{path.name}.gz").unlink(missing_ok=True)
+            pending = []
+            self._closeSegments(metaPath)
+
+            # If we're here, we remove the old file, or keep a backup
+            # of it if some of its records could not be read
+            if skipped:
+                backup = sessFile.with_name(f"{sessFile.name}.bak")
+                sessFile.replace(backup)
+                logger.warning("Skipped %d session log records, kept: %s", skipped, backup.name)
+            else:
+                sessFile.unlink()
+
+        except Exception:
+            logger.error("Failed to convert session stats file")
+            logException()
+            for temp, _ in pending:
+                temp.unlink(missing_ok=True)
+
+        return
+
 # END Class NWSessionLog
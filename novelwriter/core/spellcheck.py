@@ -5,6 +5,7 @@ novelWriter – Spell Check Classes
 File History:
 Created: 2019-06-11 [0.1.5] NWSpellEnchant
 Created: 2023-06-13 [2.1b1] UserDictionary
+Created: 2024-05-16 [2.5a3] MisspelledWord
 
 This file is a part of novelWriter
 Copyright 2018–2024, Veronica Berglyd Olsen
@@ -24,23 +25,47 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
+import dataclasses
 import json
 import logging
+import multiprocessing
+import os
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from pathlib import Path
 from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 
-from PyQt5.QtCore import QLocale
+from PyQt5.QtCore import QLocale, QRegularExpression
 
 from novelwriter.error import logException
-from novelwriter.constants import nwFiles
+from novelwriter.constants import nwFiles, nwRegEx
+from novelwriter.enum import nwComment
+from novelwriter.types import QRegExUnicode
 
 if TYPE_CHECKING:  # pragma: no cover
     from novelwriter.core.project import NWProject
 
 logger = logging.getLogger(__name__)
 
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+BATCH_SIZE = 250000      # Characters of text per worker process job
+MIN_PARALLEL = 1000000   # Characters of text before worker processes are used
+
+T_Location = tuple[str, int, int]  # Handle, line and column
+
+
+@dataclasses.dataclass
+class MisspelledWord:
+
+    word: str
+    locations: list[T_Location]
+
+    @property
+    def count(self) -> int:
+        """The number of times the word occurs."""
+        return len(self.locations)
+
 
 class NWSpellEnchant:
     """Core: Enchant Spell Checking Wrapper
@@ -55,6 +80,7 @@ class NWSpellEnchant:
         self._userDict = UserDictionary(project)
         self._language = None
         self._broker = None
+        self._version = 0
         logger.debug("Ready: NWSpellEnchant")
         return
 
@@ -70,6 +96,11 @@ class NWSpellEnchant:
     def spellLanguage(self) -> str | None:
         return self._language
 
+    @property
+    def version(self) -> int:
+        """Increases every time the dictionary changes."""
+        return self._version
+
     ##
     #  Setters
     ##
@@ -83,6 +114,7 @@ class NWSpellEnchant:
         self._enchant = FakeEnchant()
         self._broker = None
         self._language = None
+        self._version += 1
 
         try:
             import enchant
@@ -135,12 +167,73 @@ class NWSpellEnchant:
         except Exception:
             return False
 
+        self._version += 1
         added = self._userDict.add(word)
         if added:
             self._userDict.save()
 
         return added
 
+    def newDictionary(self) -> Any:
+        """Create a new dictionary for the current language, with the
+        project dictionary words added. Enchant dictionaries must not be
+        shared between threads, so a background checker needs its own.
+        """
+        return _openDictionary(self._language, list(self._userDict))
+
+    def checkDocuments(self, docs: list[tuple[str, str]]) -> list[MisspelledWord]:
+        """Spell check a list of documents given as handle and text, and
+        return the misspelled words, the most frequent first. Large
+        projects are split into batches that are checked in worker
+        processes, each with its own dictionary.
+        """
+        batches = []
+        batch = []
+        size = 0
+        total = 0
+        for tHandle, text in docs:
+            batch.append((tHandle, text))
+            size += len(text)
+            if size >= BATCH_SIZE:
+                batches.append(batch)
+                total += size
+                batch = []
+                size = 0
+        if batch:
+            batches.append(batch)
+            total += size
+
+        results = None
+        if self._language and MAX_WORKERS > 1 and len(batches) > 1 and total >= MIN_PARALLEL:
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=min(MAX_WORKERS, len(batches)),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initWorker,
+                    initargs=(self._language, list(self._userDict)),
+                ) as executor:
+                    results = list(executor.map(_checkWorkerBatch, batches))
+            except Exception:
+                logger.error("Failed to spell check in worker processes")
+                logException()
+                results = None
+
+        if results is None:
+            checker = _BatchChecker(self.newDictionary())
+            results = [checker.checkBatch(batch) for batch in batches]
+
+        found: dict[str, list[T_Location]] = {}
+        for result in results:
+            for word, locations in result.items():
+                found.setdefault(word, []).extend(locations)
+
+        logger.debug("Found %d misspelled words in %d documents", len(found), len(docs))
+
+        return sorted(
+            (MisspelledWord(w, l) for w, l in found.items()),
+            key=lambda e: (-e.count, e.word.lower())
+        )
+
     def listDictionaries(self) -> list[tuple[str, str]]:
         """List available dictionaries."""
         lang = []
@@ -167,6 +260,121 @@ class NWSpellEnchant:
 # END Class NWSpellEnchant
 
 
+class _BatchChecker:
+    """Spell checks batches of documents following the same rules as
+    the editor. Each word is only looked up in the dictionary once.
+    """
+
+    def __init__(self, handle: Any) -> None:
+        self._dict = handle
+        self._cache: dict[str, bool] = {}
+        self._rxWord = QRegularExpression(nwRegEx.SPELL_WORD)
+        self._rxWord.setPatternOptions(QRegExUnicode)
+        self._rxCodes = [QRegularExpression(nwRegEx.FMT_SC), QRegularExpression(nwRegEx.FMT_SV)]
+        for rX in self._rxCodes:
+            rX.setPatternOptions(QRegExUnicode)
+        return
+
+    def checkBatch(self, batch: list[tuple[str, str]]) -> dict[str, list[T_Location]]:
+        """Check a batch of documents, and return the misspelled words
+        with their locations.
+        """
+        from novelwriter.core.index import processComment
+
+        found: dict[str, list[T_Location]] = {}
+        for tHandle, text in batch:
+            for n, line in enumerate(text.splitlines(), 1):
+                offset = 0
+                if not line or line.startswith("@"):
+                    continue
+                elif line.startswith("%"):
+                    cStyle, _, _, _, offset = processComment(line)
+                    if cStyle == nwComment.IGNORE:
+                        continue
+                elif line.startswith("["):
+                    sLine = line.rstrip().lower()
+                    if sLine in ("[newpage]", "[new page]", "[vspace]") or (
+                        sLine.startswith("[vspace:") and sLine.endswith("]")
+                    ):
+                        continue
+                for word, xPos in self._checkLine(line, offset):
+                    found.setdefault(word, []).append((tHandle, n, xPos))
+        return found
+
+    def _checkLine(self, text: str, offset: int) -> list[tuple[str, int]]:
+        """Return all misspelled words with their positions. The
+        positions are in UTF-16 code units, like in the editor.
+        """
+        if "[" in text:
+            # Strip shortcodes. The match positions are in UTF-16 code
+            # units, so the text is edited in that encoding.
+            for rX in self._rxCodes:
+                rxItt = rX.globalMatch(text, offset)
+                while rxItt.hasNext():
+                    rxMatch = rxItt.next()
+                    xPos = 2*rxMatch.capturedStart(0)
+                    xEnd = 2*rxMatch.capturedEnd(0)
+                    data = text.encode("utf-16-le")
+                    text = (data[:xPos] + b" \0"*(rxMatch.capturedLength(0)) + data[xEnd:]).decode(
+                        "utf-16-le"
+                    )
+
+        errors = []
+        rxSpell = self._rxWord.globalMatch(text.replace("_", " "), offset)
+        while rxSpell.hasNext():
+            rxMatch = rxSpell.next()
+            word = rxMatch.captured(0)
+            if (isGood := self._cache.get(word)) is None:
+                try:
+                    isGood = bool(self._dict.check(word)) or word.isnumeric() or word.isupper()
+                except Exception:
+                    isGood = True
+                self._cache[word] = isGood
+            if not isGood:
+                errors.append((word, rxMatch.capturedStart(0)))
+
+        return errors
+
+# END Class _BatchChecker
+
+
+##
+#  Worker Processes
+##
+
+_worker: _BatchChecker | None = None
+
+
+def _openDictionary(language: str | None, words: list[str]) -> Any:
+    """Create a dictionary for a language with a list of extra words,
+    or a fake dictionary if the language cannot be loaded.
+    """
+    if language:
+        try:
+            import enchant
+            handle = enchant.Broker().request_dict(language)
+            for word in words:
+                handle.add_to_session(word)
+            return handle
+        except Exception:
+            logger.error("Failed to create dictionary for language '%s'", language)
+    return FakeEnchant()
+
+
+def _initWorker(language: str | None, words: list[str]) -> None:
+    """Set up the spell checker of a worker process."""
+    global _worker
+    _worker = _BatchChecker(_openDictionary(language, words))
+    return
+
+
+def _checkWorkerBatch(batch: list[tuple[str, str]]) -> dict[str, list[T_Location]]:
+    """Check a batch of documents in a worker process."""
+    if _worker is None:
+        return {}
+    return _worker.checkBatch(batch)
+
+
 class FakeEnchant:
     """Fallback for when Enchant is selected, but not installed."""
     def __init__(self) -> None:
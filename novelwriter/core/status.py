@@ -148,10 +148,10 @@ class NWStatus:
             entry.count = 0
         return
 
-    def increment(self, key: str | None) -> None:
+    def increment(self, key: str | None, value: int = 1) -> None:
         """Increment the counter for a given entry."""
         if key and key in self._store:
-            self._store[key].count += 1
+            self._store[key].count += value
         return
 
     def pack(self) -> Iterable[tuple[str, dict]]:
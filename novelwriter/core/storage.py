@@ -30,11 +30,11 @@ from enum import Enum
 from pathlib import Path
 from time import time
 from typing import TYPE_CHECKING
-from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 from novelwriter import CONFIG
-from novelwriter.common import isHandle, minmax
+from novelwriter.common import isHandle
 from novelwriter.constants import nwFiles
+from novelwriter.core.backup import zipFiles
 from novelwriter.core.document import NWDocument
 from novelwriter.core.projectxml import ProjectXMLReader, ProjectXMLWriter
 from novelwriter.core.spellcheck import UserDictionary
@@ -303,15 +303,15 @@ class NWStorage:
             if item.suffix == ".nwd" and isHandle(item.stem)
         ] if contentPath else []
 
-    def zipIt(self, target: str | Path, compression: int | None = None) -> bool:
-        """Zip the content of the project at its runtime location into a
-        zip file. This process will only grab files that are supposed to
-        be in the project. All non-project files will be left out.
+    def listProjectFiles(self) -> list[tuple[Path, str]]:
+        """Return the files that make up the project at its runtime
+        location, with their paths relative to the project folder. Any
+        files that don't belong to the project are left out.
         """
         basePath = self._runtimePath
         if not isinstance(basePath, Path):
             logger.error("No path set")
-            return False
+            return []
 
         baseMeta = basePath / "meta"
         baseCont = basePath / "content"
@@ -323,26 +323,28 @@ class NWStorage:
             (baseMeta / nwFiles.DICT_FILE,   f"meta/{nwFiles.DICT_FILE}"),
             (baseMeta / nwFiles.SESS_FILE,   f"meta/{nwFiles.SESS_FILE}"),
         ]
-        for contItem in baseCont.iterdir():
-            name = contItem.name
-            if contItem.is_file() and len(name) == 17 and name.endswith(".nwd"):
-                files.append((contItem, f"content/{name}"))
+        if baseMeta.is_dir():
+            for metaItem in sorted(baseMeta.glob(f"{nwFiles.SESS_PREFIX}*{nwFiles.SESS_EXT}*")):
+                files.append((metaItem, f"meta/{metaItem.name}"))
+        if baseCont.is_dir():
+            for contItem in baseCont.iterdir():
+                name = contItem.name
+                if contItem.is_file() and len(name) == 17 and name.endswith(".nwd"):
+                    files.append((contItem, f"content/{name}"))
 
-        comp = ZIP_STORED if compression is None else ZIP_DEFLATED
-        level = minmax(compression, 0, 9) if isinstance(compression, int) else None
-        try:
-            with ZipFile(target, mode="w", compression=comp, compresslevel=level) as zipObj:
-                logger.info("Creating archive: %s", target)
-                for srcPath, zipPath in files:
-                    if srcPath.is_file():
-                        zipObj.write(srcPath, zipPath)
-                        logger.debug("Added: %s", zipPath)
-        except Exception:
-            logger.error("Failed to create archive")
-            logException()
+        return [(srcPath, relPath) for srcPath, relPath in files if srcPath.is_file()]
+
+    def zipIt(self, target: str | Path, compression: int | None = None) -> bool:
+        """Zip the content of the project at its runtime location into a
+        zip file. This process will only grab files that are supposed to
+        be in the project. All non-project files will be left out.
+        """
+        if not isinstance(self._runtimePath, Path):
+            logger.error("No path set")
             return False
 
-        return True
+        files = self.listProjectFiles()
+        return zipFiles(files, target, compression=compression)
 
     ##
     #  Internal Functions
@@ -33,7 +33,7 @@ from novelwriter import CONFIG
 from novelwriter.common import formatTimeStamp
 from novelwriter.constants import nwHeadFmt, nwHtmlUnicode, nwKeyWords, nwLabels
 from novelwriter.core.project import NWProject
-from novelwriter.core.tokenizer import T_Formats, Tokenizer, stripEscape
+from novelwriter.core.tokenizer import T_Comment, T_Formats, Tokenizer, stripEscape
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +107,11 @@ class ToHtml(Tokenizer):
     def fullHTML(self) -> list[str]:
         return self._fullHTML
 
+    @property
+    def buildState(self) -> list:
+        """The builder state, including the footnote counter."""
+        return super().buildState + [len(self._usedNotes)]
+
     ##
     #  Setters
     ##
@@ -325,6 +330,27 @@ class ToHtml(Tokenizer):
 
         return
 
+    def getFootnoteData(self, tHandle: str, nUsed: int) -> tuple[dict[str, T_Comment], list[str]]:
+        """Return the footnotes defined in a given document, and the
+        keys of the footnotes referenced after the first nUsed.
+        """
+        prefix = f"{tHandle}:"
+        notes = {k: v for k, v in self._footnotes.items() if k.startswith(prefix)}
+        used = list(self._usedNotes)[nUsed:]
+        return notes, used
+
+    def appendFragment(self, html: str, notes: dict[str, T_Comment], used: list[str]) -> None:
+        """Append a previously converted document to the result. The
+        footnotes it defines and references are registered as if the
+        document had been converted again.
+        """
+        self._footnotes.update(notes)
+        for key in used:
+            self._usedNotes[key] = len(self._usedNotes) + 1
+        self._result = html
+        self._fullHTML.append(html)
+        return
+
     def saveHtml5(self, path: str | Path) -> None:
         """Save the data to an HTML file."""
         with open(path, mode="w", encoding="utf-8") as fObj:
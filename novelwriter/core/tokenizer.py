@@ -5,6 +5,7 @@ novelWriter – Text Tokenizer
 File History:
 Created: 2019-05-05 [0.0.1] Tokenizer
 Created: 2023-05-23 [2.1b1] HeadingFormatter
+Created: 2024-05-12 [2.5a3] TokenStore
 
 This file is a part of novelWriter
 Copyright 2018–2024, Veronica Berglyd Olsen
@@ -29,6 +30,8 @@ import logging
 import re
 
 from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Iterator
 from functools import partial
 from pathlib import Path
 from time import time
@@ -50,6 +53,7 @@ RX_ESC = re.compile("|".join([re.escape(k) for k in ESCAPES.keys()]), flags=re.D
 
 T_Formats = list[tuple[int, int, str]]
 T_Comment = tuple[str, T_Formats]
+T_Token = tuple[int, int, str, T_Formats, int]
 
 
 def stripEscape(text: str) -> str:
@@ -128,7 +132,7 @@ class Tokenizer(ABC):
         self._keepMD = False  # Whether to keep the markdown text
 
         # Tokens and Meta Data (Per Document)
-        self._tokens: list[tuple[int, int, str, T_Formats, int]] = []
+        self._tokens = TokenStore()
         self._footnotes: dict[str, T_Comment] = {}
 
         # Tokens and Meta Data (Per Instance)
@@ -249,6 +253,15 @@ class Tokenizer(ABC):
         """The error data."""
         return self._errData
 
+    @property
+    def buildState(self) -> list:
+        """The part of the builder state that is carried over from one
+        document to the next. If this state is the same when a document
+        is processed again, and the document itself has not changed,
+        the result will also be the same.
+        """
+        return [self._isFirst, self._noSep, *self._hFormatter.counters]
+
     ##
     #  Setters
     ##
@@ -402,6 +415,13 @@ class Tokenizer(ABC):
         self._keepMD = state
         return
 
+    def setBuildState(self, state: list) -> None:
+        """Restore a builder state previously returned by buildState."""
+        self._isFirst = bool(state[0])
+        self._noSep = bool(state[1])
+        self._hFormatter.setCounters(state[2:5])
+        return
+
     ##
     #  Class Methods
     ##
@@ -425,7 +445,7 @@ class Tokenizer(ABC):
 
             trNotes = self._localLookup("Notes")
             title = f"{trNotes}: {tItem.itemName}"
-            self._tokens = []
+            self._tokens = TokenStore()
             self._tokens.append((
                 self.T_TITLE, 1, title, [], textAlign
             ))
@@ -470,15 +490,15 @@ class Tokenizer(ABC):
         same RegExes that the syntax highlighter uses and save the
         locations of these formatting tags into the token array.
 
-        The format of the token list is an entry with a five-tuple for
-        each line in the file. The tuple is as follows:
+        The tokens are stored in a TokenStore, which returns a five-tuple
+        for each line in the file. The tuple is as follows:
           1: The type of the block, self.T_*
           2: The heading number under which the text is placed
           3: The text content of the block, without leading tags
           4: The internal formatting map of the text, self.FMT_*
           5: The style of the block, self.A_*
         """
-        self._tokens = []
+        self._tokens = TokenStore()
         if self._isNovel:
             self._hFormatter.setHandle(self._handle)
 
@@ -531,10 +551,10 @@ class Tokenizer(ABC):
                         self._tokens.append(
                             (self.T_SKIP, nHead, "", [], sAlign)
                         )
-                    if nSkip > 1:
-                        self._tokens += (nSkip - 1) * [
+                    for _ in range(nSkip - 1):
+                        self._tokens.append(
                             (self.T_SKIP, nHead, "", [], self.A_NONE)
-                        ]
+                        )
                     continue
 
             if aLine.startswith("%"):
@@ -784,11 +804,8 @@ class Tokenizer(ABC):
 
             # Make sure the token array doesn't start with a page break
             # on the very first page, adding a blank first page.
-            if self._tokens[0][4] & self.A_PBB:
-                token = self._tokens[0]
-                self._tokens[0] = (
-                    token[0], token[1], token[2], token[3], token[4] & ~self.A_PBB
-                )
+            if (tStyle := self._tokens.tokenStyle(0)) & self.A_PBB:
+                self._tokens.setTokenStyle(0, tStyle & ~self.A_PBB)
 
         # Always add an empty line at the end of the file
         self._tokens.append((
@@ -802,26 +819,34 @@ class Tokenizer(ABC):
         # ===========
         # Some items need a second pass
 
-        pToken = (self.T_EMPTY, 0, "", [], self.A_NONE)
-        nToken = (self.T_EMPTY, 0, "", [], self.A_NONE)
-        tCount = len(self._tokens)
-        for n, token in enumerate(self._tokens):
+        tokens = self._tokens
+        pType = self.T_EMPTY
+        nType = self.T_EMPTY
+        tCount = len(tokens)
+        for n in range(tCount):
 
             if n > 0:
-                pToken = self._tokens[n-1]
+                pType = tokens.tokenType(n-1)
             if n < tCount - 1:
-                nToken = self._tokens[n+1]
+                nType = tokens.tokenType(n+1)
 
-            if token[0] == self.T_KEYWORD:
-                aStyle = token[4]
-                if pToken[0] == self.T_KEYWORD:
+            if tokens.tokenType(n) == self.T_KEYWORD:
+                aStyle = tokens.tokenStyle(n)
+                if pType == self.T_KEYWORD:
                     aStyle |= self.A_Z_TOPMRG
-                if nToken[0] == self.T_KEYWORD:
+                if nType == self.T_KEYWORD:
                     aStyle |= self.A_Z_BTMMRG
-                self._tokens[n] = (
-                    token[0], token[1], token[2], token[3], aStyle
-                )
+                tokens.setTokenStyle(n, aStyle)
+
+        return
 
+    def releaseTokens(self) -> None:
+        """Release the tokens and text of the current document once it
+        has been converted, so they don't stay in memory while the next
+        document is loaded.
+        """
+        self._text = ""
+        self._tokens = TokenStore()
         return
 
     def buildOutline(self) -> None:
@@ -955,6 +980,17 @@ class Tokenizer(ABC):
 
         return
 
+    def addStats(self, counts: dict[str, int]) -> None:
+        """Add a set of previously counted stats to the text stats."""
+        for key, value in counts.items():
+            self._counts[key] = self._counts.get(key, 0) + value
+        return
+
+    def addOutline(self, outline: dict[str, str]) -> None:
+        """Add a set of previously generated outline entries."""
+        self._outline.update(outline)
+        return
+
     def saveRawMarkdown(self, path: str | Path) -> None:
         """Save the raw text to a plain text file."""
         with open(path, mode="w", encoding="utf-8") as outFile:
@@ -1046,6 +1082,16 @@ class HeadingFormatter:
         self._scAbsCount = 0
         return
 
+    @property
+    def counters(self) -> list[int]:
+        """The current chapter and scene counter values."""
+        return [self._chCount, self._scChCount, self._scAbsCount]
+
+    def setCounters(self, values: list[int]) -> None:
+        """Set the chapter and scene counter values."""
+        self._chCount, self._scChCount, self._scAbsCount = (checkInt(v, 0) for v in values)
+        return
+
     def setHandle(self, tHandle: str | None) -> None:
         """Set the handle currently being processed."""
         self._handle = tHandle
@@ -1106,3 +1152,117 @@ class HeadingFormatter:
         return hFormat
 
 # END Class HeadingFormatter
+
+
+class TokenStore:
+    """Core: Compact Token Storage
+
+    Stores the tokens of a document as a struct of arrays rather than a
+    list of tuples. The type, heading number and style of each token are
+    kept in integer arrays, the text of all tokens in a single string
+    buffer, and the format markers in a flat integer array with the
+    format keys interned in a separate list. The tokens are returned as
+    five-tuples when iterated or indexed.
+    """
+
+    __slots__ = (
+        "_types", "_heads", "_styles", "_textPos", "_fmtPos", "_formats",
+        "_keys", "_keyMap", "_buffer", "_pending",
+    )
+
+    def __init__(self) -> None:
+        self._types = array("B")
+        self._heads = array("L")
+        self._styles = array("L")
+        self._textPos = array("Q", [0])
+        self._fmtPos = array("Q", [0])
+        self._formats = array("l")
+        self._keys: list[str] = [""]
+        self._keyMap: dict[str, int] = {"": 0}
+        self._buffer = ""
+        self._pending: list[str] = []
+        return
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def __iter__(self) -> Iterator[T_Token]:
+        self._flush()
+        for n in range(len(self._types)):
+            yield self._token(n)
+
+    def __getitem__(self, index: int) -> T_Token:
+        count = len(self._types)
+        n = index + count if index < 0 else index
+        if not 0 <= n < count:
+            raise IndexError("token index out of range")
+        self._flush()
+        return self._token(n)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TokenStore, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    ##
+    #  Methods
+    ##
+
+    def append(self, token: T_Token) -> None:
+        """Add a token to the end of the store."""
+        tType, nHead, tText, tFormat, tStyle = token
+        self._types.append(tType)
+        self._heads.append(nHead)
+        self._styles.append(tStyle)
+        self._textPos.append(self._textPos[-1] + len(tText))
+        if tText:
+            self._pending.append(tText)
+        if tFormat:
+            keyMap = self._keyMap
+            for pos, fmt, key in tFormat:
+                if (idx := keyMap.get(key)) is None:
+                    idx = keyMap[key] = len(self._keys)
+                    self._keys.append(key)
+                self._formats.extend((pos, fmt, idx))
+        self._fmtPos.append(len(self._formats))
+        return
+
+    def tokenType(self, n: int) -> int:
+        """Return the type of a token."""
+        return self._types[n]
+
+    def tokenStyle(self, n: int) -> int:
+        """Return the style of a token."""
+        return self._styles[n]
+
+    def setTokenStyle(self, n: int, style: int) -> None:
+        """Change the style of a token."""
+        self._styles[n] = style
+        return
+
+    ##
+    #  Internal Functions
+    ##
+
+    def _flush(self) -> None:
+        """Move pending text into the text buffer."""
+        if self._pending:
+            self._buffer += "".join(self._pending)
+            self._pending = []
+        return
+
+    def _token(self, n: int) -> T_Token:
+        """Assemble a token tuple. The buffer must be flushed."""
+        keys = self._keys
+        formats = self._formats
+        fmts = [
+            (formats[i], formats[i+1], keys[formats[i+2]])
+            for i in range(self._fmtPos[n], self._fmtPos[n+1], 3)
+        ]
+        return (
+            self._types[n], self._heads[n],
+            self._buffer[self._textPos[n]:self._textPos[n+1]],
+            fmts, self._styles[n],
+        )
+
+# END Class TokenStore
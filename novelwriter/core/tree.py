@@ -43,6 +43,8 @@ logger = logging.getLogger(__name__)
 
 MAX_DEPTH = 1000  # Cap of tree traversing for loops (recursion limit)
 
+T_Counts = tuple[int, int, bool, "str | None"]
+
 
 class NWTree:
     """Core: Project Tree Data Class
@@ -60,9 +62,22 @@ class NWTree:
     Each item has a handle, which is a random hex string of length 13.
     The handle is the name of the item everywhere in novelWriter, and is
     also used for file names.
+
+    The tree also keeps an index of the children of each item, and the
+    depth of each item, so that sub trees can be iterated without
+    scanning the full item order. The index is updated when items are
+    added, removed, reordered, or moved to a new parent.
+
+    Running totals of the word counts and status usage are updated by
+    the items themselves when their counts, layout, class or status
+    change, so the totals don't require a pass over all items.
     """
 
-    __slots__ = ("_project", "_tree", "_order", "_roots", "_trash", "_changed")
+    __slots__ = (
+        "_project", "_tree", "_order", "_roots", "_trash", "_changed",
+        "_children", "_parents", "_depth",
+        "_counts", "_novelWords", "_noteWords", "_statusCount", "_importCount",
+    )
 
     def __init__(self, project: NWProject) -> None:
 
@@ -72,6 +87,18 @@ class NWTree:
         self._order: list[str] = []          # The order of the tree items in the tree view
         self._roots: dict[str, NWItem] = {}  # The root items of the tree
 
+        # Adjacency Index
+        self._children: dict[str, list[str]] = {}  # The child handles of each item
+        self._parents: dict[str, str | None] = {}  # The parent each item is indexed under
+        self._depth: dict[str, int] = {}           # The depth of each item below its root
+
+        # Running Counts
+        self._counts: dict[str, T_Counts] = {}  # The counts added for each item
+        self._novelWords = 0
+        self._noteWords = 0
+        self._statusCount: dict[str, int] = {}
+        self._importCount: dict[str, int] = {}
+
         self._trash = None     # The handle of the trash root folder
         self._changed = False  # True if tree structure has changed
 
@@ -97,6 +124,14 @@ class NWTree:
         self._roots   = {}
         self._trash   = None
         self._changed = False
+        self._children = {}
+        self._parents  = {}
+        self._depth    = {}
+        self._counts   = {}
+        self._novelWords  = 0
+        self._noteWords   = 0
+        self._statusCount = {}
+        self._importCount = {}
         return
 
     def handles(self) -> list[str]:
@@ -159,6 +194,10 @@ class NWTree:
 
         self._tree[tHandle] = nwItem
         self._order.append(tHandle)
+        self._children.setdefault(tHandle, [])
+        self._indexParent(tHandle, pHandle)
+        nwItem.setTree(self)
+        self.updateItemCounts(nwItem)
         self._setTreeChanged(True)
 
         return True
@@ -190,12 +229,21 @@ class NWTree:
         """
         self.clear()
         for item in data:
-            nwItem = NWItem(self._project, "")  # Handle is set by unpack()
-            if nwItem.unpack(item):
-                self.append(nwItem)
-                nwItem.saveInitialCount()
+            self.unpackItem(item)
         return
 
+    def unpackItem(self, data: dict) -> bool:
+        """Create an item from a packed dictionary and add it to the
+        project tree. The project XML reader calls this for each item
+        as it is read from the project file.
+        """
+        nwItem = NWItem(self._project, "")  # Handle is set by unpack()
+        if nwItem.unpack(data):
+            self.append(nwItem)
+            nwItem.saveInitialCount()
+            return True
+        return False
+
     def checkConsistency(self, prefix: str) -> tuple[int, int]:
         """Check the project tree consistency. Also check the content
         folder and add back files that were discovered but were not
@@ -206,8 +254,17 @@ class NWTree:
         """
         storage = self._project.storage
         files = set(storage.scanContent())
-        for tHandle in self._order:
-            if self.updateItemData(tHandle):
+
+        # All items that can be reached from a root item are valid, and
+        # have their data updated from their root on the way
+        self._rebuildIndex()
+        valid = set()
+        for rHandle in [t for t in self._order if self._tree[t].itemParent is None]:
+            self._depth[rHandle] = 0
+            valid.update(self._updateSubTree(rHandle))
+
+        for tHandle in self._order.copy():
+            if tHandle in valid:
                 logger.debug("Checking item '%s' ... OK", tHandle)
                 files.discard(tHandle)  # Remove it from the record
             else:
@@ -303,6 +360,55 @@ class NWTree:
 
         return True
 
+    def wordTotals(self) -> tuple[int, int]:
+        """Return the running novel and note word totals."""
+        return self._novelWords, self._noteWords
+
+    def statusTotals(self) -> tuple[dict[str, int], dict[str, int]]:
+        """Return the running usage counts of the status and importance
+        labels, by key.
+        """
+        return self._statusCount.copy(), self._importCount.copy()
+
+    def updateItemCounts(self, nwItem: NWItem) -> None:
+        """Update the running counts with the changes to an item. This
+        is called by the item itself.
+        """
+        tHandle = nwItem.itemHandle
+        if self._tree.get(tHandle) is not nwItem:
+            return
+        counts = self._itemCounts(nwItem)
+        previous = self._counts.get(tHandle)
+        if counts != previous:
+            if previous:
+                self._addCounts(previous, -1)
+            self._addCounts(counts, 1)
+            self._counts[tHandle] = counts
+        return
+
+    def checkCounts(self) -> bool:
+        """Recount all items and reset the running counts. This is a
+        consistency check, and returns False if the counts had drifted.
+        """
+        novel, notes = self._novelWords, self._noteWords
+        status, imports = self._statusCount, self._importCount
+
+        self._counts = {}
+        self._novelWords = 0
+        self._noteWords = 0
+        self._statusCount = {}
+        self._importCount = {}
+        for nwItem in self._tree.values():
+            self.updateItemCounts(nwItem)
+
+        if (novel, notes, status, imports) != (
+            self._novelWords, self._noteWords, self._statusCount, self._importCount
+        ):
+            logger.warning("Running project counts were out of sync")
+            return False
+
+        return True
+
     def sumWords(self) -> tuple[int, int]:
         """Loop over all entries and add up the word counts."""
         noteWords = 0
@@ -331,11 +437,14 @@ class NWTree:
         if tItem is None:
             return False
 
+        self._indexParent(tHandle, tItem.itemParent)
+
         iItem = tItem
-        for _ in range(MAX_DEPTH):
+        for depth in range(MAX_DEPTH):
             if iItem.itemParent is None:
                 tItem.setRoot(iItem.itemHandle)
                 tItem.setClassDefaults(iItem.itemClass)
+                self._depth[tHandle] = depth
                 return True
             else:
                 iItem = self.__getitem__(iItem.itemParent)
@@ -344,6 +453,58 @@ class NWTree:
         else:
             raise RecursionError("Critical internal error")
 
+    def updateSubTree(self, tHandle: str) -> bool:
+        """Update the item data of an item and all its descendants, for
+        instance after the item has been moved. Only the top item walks
+        up the tree to its root, the rest inherit from their parent.
+        """
+        if self.updateItemData(tHandle):
+            self._updateSubTree(tHandle)
+            return True
+        return False
+
+    def setItemParent(self, tHandle: str, pHandle: str | None) -> None:
+        """Set the parent of an item and update the children index. The
+        item is added last among its new siblings until the tree order
+        is next updated.
+        """
+        if tItem := self.__getitem__(tHandle):
+            tItem.setParent(pHandle)
+            self._indexParent(tHandle, tItem.itemParent)
+        return
+
+    def children(self, tHandle: str | None) -> list[str]:
+        """Return the handles of the direct children of an item, in tree
+        order. If the handle is None, the root items are returned.
+        """
+        if tHandle is None:
+            return [t for t in self._order if self._parents.get(t) is None]
+        return self._children.get(tHandle, []).copy()
+
+    def iterSubTree(self, tHandle: str) -> Iterator[str]:
+        """Iterate over the handles of an item and all its descendants,
+        depth first, in tree order.
+        """
+        if tHandle not in self._tree:
+            return
+        visited = set()
+        stack = [tHandle]
+        while stack:
+            cHandle = stack.pop()
+            if cHandle in visited:
+                logger.error("Item '%s' is its own ancestor", cHandle)
+                continue
+            visited.add(cHandle)
+            yield cHandle
+            stack.extend(reversed(self._children.get(cHandle, [])))
+        return
+
+    def itemDepth(self, tHandle: str) -> int:
+        """Return the depth of an item below its root item, or -1 if it
+        is not known.
+        """
+        return self._depth.get(tHandle, -1)
+
     def checkType(self, tHandle: str, itemType: nwItemType) -> bool:
         """Check if item exists and is of the specified item type."""
         tItem = self.__getitem__(tHandle)
@@ -438,8 +599,9 @@ class NWTree:
                 if tHandle not in tmpOrder:
                     logger.warning("Handle '%s' in old tree order is not in new order", tHandle)
 
-        # Save the temp list
+        # Save the temp list, and rebuild the children lists in order
         self._order = tmpOrder
+        self._rebuildIndex()
         self._setTreeChanged(True)
         logger.debug("Project tree order updated")
 
@@ -480,6 +642,13 @@ class NWTree:
         if tHandle == self._trash:
             self._trash = None
 
+        self._indexParent(tHandle, None)
+        self._parents.pop(tHandle, None)
+        self._children.pop(tHandle, None)
+        self._depth.pop(tHandle, None)
+        if counts := self._counts.pop(tHandle, None):
+            self._addCounts(counts, -1)
+
         self._setTreeChanged(True)
 
         return
@@ -509,6 +678,83 @@ class NWTree:
             self._project.setProjectChanged(True)
         return
 
+    def _indexParent(self, tHandle: str, pHandle: str | None) -> None:
+        """Move an item to a new parent in the children index."""
+        oHandle = self._parents.get(tHandle)
+        if tHandle in self._parents and oHandle == pHandle:
+            return
+        if oHandle in self._children and tHandle in self._children[oHandle]:
+            self._children[oHandle].remove(tHandle)
+        if pHandle is not None:
+            self._children.setdefault(pHandle, []).append(tHandle)
+        self._parents[tHandle] = pHandle
+        return
+
+    def _rebuildIndex(self) -> None:
+        """Rebuild the children index from the tree order."""
+        self._children = {tHandle: [] for tHandle in self._order}
+        self._parents = {}
+        for tHandle in self._order:
+            pHandle = self._tree[tHandle].itemParent
+            if pHandle is not None:
+                self._children.setdefault(pHandle, []).append(tHandle)
+            self._parents[tHandle] = pHandle
+        return
+
+    def _updateSubTree(self, tHandle: str) -> set[str]:
+        """Update the root, class defaults and depth of all descendants
+        of an item from the item itself. Returns the updated handles,
+        including the item itself.
+        """
+        updated = set()
+        tItem = self._tree.get(tHandle)
+        if tItem is None:
+            return updated
+
+        rHandle = tItem.itemRoot if tItem.itemParent else tHandle
+        rItem = self._tree.get(rHandle) if rHandle else None
+        rClass = rItem.itemClass if rItem else tItem.itemClass
+        if tItem.itemParent is None:
+            tItem.setRoot(tHandle)
+            tItem.setClassDefaults(rClass)
+
+        base = self._depth.get(tHandle, 0)
+        for cHandle in self.iterSubTree(tHandle):
+            updated.add(cHandle)
+            if cHandle == tHandle:
+                continue
+            cItem = self._tree[cHandle]
+            cItem.setRoot(rHandle)
+            cItem.setClassDefaults(rClass)
+            self._depth[cHandle] = self._depth.get(cItem.itemParent or "", base) + 1
+
+        return updated
+
+    def _itemCounts(self, nwItem: NWItem) -> T_Counts:
+        """Return the counts an item adds to the running totals."""
+        novel = notes = 0
+        if nwItem.itemLayout == nwItemLayout.NOTE:
+            notes = nwItem.wordCount
+        elif nwItem.itemLayout != nwItemLayout.NO_LAYOUT:
+            novel = nwItem.wordCount
+        if nwItem.isNovelLike():
+            return novel, notes, True, nwItem.itemStatus
+        return novel, notes, False, nwItem.itemImport
+
+    def _addCounts(self, counts: T_Counts, sign: int) -> None:
+        """Add or subtract the counts of an item to the totals."""
+        novel, notes, isStatus, key = counts
+        self._novelWords += sign*novel
+        self._noteWords += sign*notes
+        if key:
+            store = self._statusCount if isStatus else self._importCount
+            value = store.get(key, 0) + sign
+            if value:
+                store[key] = value
+            else:
+                store.pop(key, None)
+        return
+
     def _makeHandle(self) -> str:
         """Generate a unique item handle. In the event that the key
         already exists, generate a new one.
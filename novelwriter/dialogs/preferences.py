@@ -344,6 +344,14 @@ class GuiPreferences(QDialog):
             self.tr("If off, backups will run in the background.")
         )
 
+        # Incremental Backup
+        self.incrementalBackup = NSwitch(self)
+        self.incrementalBackup.setChecked(CONFIG.incrementalBackup)
+        self.mainForm.addRow(
+            self.tr("Use incremental backups"), self.incrementalBackup,
+            self.tr("Only store the files that changed since the last backup.")
+        )
+
         # Session Timer
         # =============
 
@@ -902,6 +910,7 @@ class GuiPreferences(QDialog):
         CONFIG.setBackupPath(self.backupPath)
         CONFIG.backupOnClose   = self.backupOnClose.isChecked()
         CONFIG.askBeforeBackup = self.askBeforeBackup.isChecked()
+        CONFIG.incrementalBackup = self.incrementalBackup.isChecked()
 
         # Session Timer
         CONFIG.stopWhenIdle = self.stopWhenIdle.isChecked()
@@ -0,0 +1,128 @@
+"""
+novelWriter – Replace Preview Dialog
+====================================
+
+File History:
+Created: 2024-05-16 [2.5a3] GuiReplacePreview
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import logging
+
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (
+    QDialog, QDialogButtonBox, QHeaderView, QLabel, QTreeWidget,
+    QTreeWidgetItem, QVBoxLayout, QWidget
+)
+
+from novelwriter import CONFIG, SHARED
+from novelwriter.core.coretools import DocReplacement
+from novelwriter.types import QtAlignRight, QtDialogCancel, QtDialogOk
+
+logger = logging.getLogger(__name__)
+
+
+class GuiReplacePreview(QDialog):
+    """GUI Dialog: Replace Preview
+
+    Shows the changed lines of each document affected by a project
+    replace, so the user can confirm before anything is written.
+    """
+
+    C_TEXT  = 0
+    C_COUNT = 1
+
+    def __init__(self, parent: QWidget, replacements: list[DocReplacement]) -> None:
+        super().__init__(parent=parent)
+
+        logger.debug("Create: GuiReplacePreview")
+        self.setObjectName("GuiReplacePreview")
+        self.setWindowTitle(self.tr("Replace Preview"))
+        self.setMinimumWidth(CONFIG.pxInt(500))
+        self.setMinimumHeight(CONFIG.pxInt(400))
+
+        total = sum(entry.count for entry in replacements)
+        self.infoLabel = QLabel(self.tr(
+            "Replace {0} matches in {1} documents?"
+        ).format(total, len(replacements)), self)
+
+        # Changes
+        self.listBox = QTreeWidget(self)
+        self.listBox.setHeaderHidden(True)
+        self.listBox.setColumnCount(2)
+        self.listBox.setUniformRowHeights(True)
+        self.listBox.setFont(SHARED.theme.guiFontFixed)
+
+        treeHeader = self.listBox.header()
+        treeHeader.setStretchLastSection(False)
+        treeHeader.setSectionResizeMode(self.C_TEXT, QHeaderView.ResizeMode.Stretch)
+        treeHeader.setSectionResizeMode(self.C_COUNT, QHeaderView.ResizeMode.ResizeToContents)
+
+        colDel = QColor(200, 60, 60)
+        colAdd = QColor(60, 160, 60)
+        tree = SHARED.project.tree
+        for entry in replacements:
+            nwItem = tree[entry.handle]
+            tItem = QTreeWidgetItem()
+            tItem.setText(self.C_TEXT, nwItem.itemName if nwItem else entry.handle)
+            tItem.setFont(self.C_TEXT, SHARED.theme.guiFontB)
+            tItem.setText(self.C_COUNT, f"({entry.count:n})")
+            tItem.setTextAlignment(self.C_COUNT, QtAlignRight)
+            for line in entry.diffLines():
+                dItem = QTreeWidgetItem()
+                dItem.setText(self.C_TEXT, line)
+                if line.startswith("-"):
+                    dItem.setForeground(self.C_TEXT, colDel)
+                elif line.startswith("+"):
+                    dItem.setForeground(self.C_TEXT, colAdd)
+                tItem.addChild(dItem)
+            self.listBox.addTopLevelItem(tItem)
+            tItem.setExpanded(True)
+
+        # Buttons
+        self.buttonBox = QDialogButtonBox(QtDialogOk | QtDialogCancel, self)
+        self.buttonBox.accepted.connect(self.accept)
+        self.buttonBox.rejected.connect(self.reject)
+
+        # Assemble
+        self.outerBox = QVBoxLayout()
+        self.outerBox.addWidget(self.infoLabel, 0)
+        self.outerBox.addWidget(self.listBox, 1)
+        self.outerBox.addWidget(self.buttonBox, 0)
+
+        self.setLayout(self.outerBox)
+
+        logger.debug("Ready: GuiReplacePreview")
+
+        return
+
+    def __del__(self) -> None:  # pragma: no cover
+        logger.debug("Delete: GuiReplacePreview")
+        return
+
+    @classmethod
+    def confirmReplace(cls, parent: QWidget, replacements: list[DocReplacement]) -> bool:
+        """Pop the dialog and return the result."""
+        cls = GuiReplacePreview(parent, replacements)
+        cls.exec()
+        accepted = cls.result() == QDialog.DialogCode.Accepted
+        cls.deleteLater()
+        return accepted
+
+# END Class GuiReplacePreview
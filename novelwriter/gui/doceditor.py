@@ -4,12 +4,10 @@ novelWriter – GUI Document Editor
 
 File History:
 Created:   2018-09-29 [0.0.1] GuiDocEditor
-Created:   2019-04-22 [0.0.1] BackgroundWordCounter
 Created:   2019-09-29 [0.2.1] GuiDocEditSearch
 Created:   2020-04-25 [0.4.5] GuiDocEditHeader
 Rewritten: 2020-06-15 [0.9]   GuiDocEditSearch
 Created:   2020-06-27 [0.10]  GuiDocEditFooter
-Rewritten: 2020-10-07 [1.0b3] BackgroundWordCounter
 Created:   2023-11-06 [2.2b1] MetaCompleter
 Created:   2023-11-07 [2.2b1] GuiDocToolBar
 
@@ -37,30 +35,28 @@ import logging
 from enum import Enum
 from time import time
 
-from PyQt5.QtCore import (
-    QObject, QPoint, QRegularExpression, QRunnable, Qt, QTimer, pyqtSignal,
-    pyqtSlot
-)
+from PyQt5.QtCore import QPoint, QRegularExpression, Qt, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import (
     QColor, QCursor, QFont, QKeyEvent, QKeySequence, QMouseEvent, QPalette,
     QPixmap, QResizeEvent, QTextBlock, QTextCursor, QTextDocument, QTextOption
 )
 from PyQt5.QtWidgets import (
     QAction, QApplication, QFrame, QGridLayout, QHBoxLayout, QLabel, QLineEdit,
-    QMenu, QPlainTextEdit, QShortcut, QToolBar, QVBoxLayout, QWidget
+    QMenu, QPlainTextEdit, QShortcut, QToolBar, QToolButton, QVBoxLayout,
+    QWidget
 )
 
-from novelwriter import CONFIG, SHARED
+from novelwriter import CONFIG, METRICS, SHARED
 from novelwriter.common import minmax, transferCase
 from novelwriter.constants import nwConst, nwKeyWords, nwShortcode, nwUnicode
+from novelwriter.core.coretools import DocSearch
 from novelwriter.core.document import NWDocument
 from novelwriter.enum import nwComment, nwDocAction, nwDocInsert, nwDocMode, nwItemClass, nwTrinary
 from novelwriter.extensions.eventfilters import WheelEventFilter
 from novelwriter.extensions.modified import NIconToggleButton, NIconToolButton
-from novelwriter.gui.dochighlight import BLOCK_META, BLOCK_TITLE
+from novelwriter.gui.dochighlight import BLOCK_TITLE
 from novelwriter.gui.editordocument import GuiTextDocument
 from novelwriter.gui.theme import STYLES_MIN_TOOLBUTTON
-from novelwriter.text.counting import standardCounter
 from novelwriter.tools.lipsum import GuiLipsum
 from novelwriter.types import (
     QtAlignCenterTop, QtAlignJustify, QtAlignLeft, QtAlignLeftTop,
@@ -192,19 +188,11 @@ class GuiDocEditor(QPlainTextEdit):
         self.timerDoc.timeout.connect(self._runDocumentTasks)
         self.timerDoc.setInterval(5000)
 
-        self.wCounterDoc = BackgroundWordCounter(self)
-        self.wCounterDoc.setAutoDelete(False)
-        self.wCounterDoc.signals.countsReady.connect(self._updateDocCounts)
-
         # Set Up Selection Word Counter
         self.timerSel = QTimer(self)
         self.timerSel.timeout.connect(self._runSelCounter)
         self.timerSel.setInterval(500)
 
-        self.wCounterSel = BackgroundWordCounter(self, forSelection=True)
-        self.wCounterSel.setAutoDelete(False)
-        self.wCounterSel.signals.countsReady.connect(self._updateSelCounts)
-
         # Install Event Filter for Mouse Wheel
         self.wheelEventFilter = WheelEventFilter(self)
         self.installEventFilter(self.wheelEventFilter)
@@ -438,8 +426,10 @@ class GuiDocEditor(QPlainTextEdit):
         return True
 
     def updateTagHighLighting(self) -> None:
-        """Rerun the syntax highlighter on all meta data lines."""
-        self._qDocument.syntaxHighlighter.rehighlightByType(BLOCK_META)
+        """Rerun the syntax highlighter on the meta data lines that
+        reference tags that have changed.
+        """
+        self._qDocument.syntaxHighlighter.rehighlightChangedTags()
         return
 
     def replaceText(self, text: str) -> None:
@@ -453,6 +443,7 @@ class GuiDocEditor(QPlainTextEdit):
         QApplication.restoreOverrideCursor()
         return
 
+    @METRICS.timed("editor.save")
     def saveText(self) -> bool:
         """Save the text currently in the editor to the NWDocument
         object, and update the NWItem meta data.
@@ -469,7 +460,7 @@ class GuiDocEditor(QPlainTextEdit):
             return False
 
         docText = self.getText()
-        cC, wC, pC = standardCounter(docText)
+        cC, wC, pC = self._qDocument.documentCounts()
         self._updateDocCounts(cC, wC, pC)
 
         if not self._nwDocument.writeDocument(docText):
@@ -694,16 +685,18 @@ class GuiDocEditor(QPlainTextEdit):
 
     def spellCheckDocument(self) -> None:
         """Rerun the highlighter to update spell checking status of the
-        currently loaded text. The fastest way to do this, at least as
-        of Qt 5.13, is to clear the text and put it back. This clears
-        the undo stack, so we only do it for big documents.
+        currently loaded text. The words are checked in the background,
+        and each block is updated when its result arrives.
         """
         logger.debug("Running spell checker")
         start = time()
         QApplication.setOverrideCursor(QCursor(Qt.CursorShape.WaitCursor))
+        self._qDocument.syntaxHighlighter.resetSpellCheck()
         self._qDocument.syntaxHighlighter.rehighlight()
         QApplication.restoreOverrideCursor()
-        logger.debug("Document highlighted in %.3f ms", 1000*(time() - start))
+        tTotal = time() - start
+        METRICS.addTime("highlight.spellCheck", tTotal)
+        logger.debug("Document highlighted in %.3f ms", 1000*tTotal)
         self.statusMessage.emit(self.tr("Spell check complete"))
         return
 
@@ -1014,6 +1007,13 @@ class GuiDocEditor(QPlainTextEdit):
             self.updateDocMargins()
         return
 
+    @pyqtSlot(list, list)
+    def updateChangedTags(self, updated: list[str], deleted: list[str]) -> None:
+        """Re-highlight meta data lines affected by changed tags."""
+        if self._docHandle:
+            self.updateTagHighLighting()
+        return
+
     @pyqtSlot(str)
     def insertKeyWord(self, keyword: str) -> bool:
         """Insert a keyword in the text editor, at the cursor position.
@@ -1202,8 +1202,8 @@ class GuiDocEditor(QPlainTextEdit):
 
         if time() - self._lastEdit < 25.0:
             logger.debug("Running document tasks")
-            if not self.wCounterDoc.isRunning():
-                SHARED.runInThreadPool(self.wCounterDoc)
+            cC, wC, pC = self._qDocument.documentCounts()
+            self._updateDocCounts(cC, wC, pC)
 
             self.docHeader.setOutline({
                 block.blockNumber(): block.text()
@@ -1215,9 +1215,8 @@ class GuiDocEditor(QPlainTextEdit):
 
         return
 
-    @pyqtSlot(int, int, int)
     def _updateDocCounts(self, cCount: int, wCount: int, pCount: int) -> None:
-        """Process the word counter's finished signal."""
+        """Update the document counts."""
         if self._docHandle and self._nwItem:
             logger.debug("Updating word count")
             self._nwItem.setCharCount(cCount)
@@ -1246,17 +1245,17 @@ class GuiDocEditor(QPlainTextEdit):
         if self._docHandle is None:
             return
 
-        if self.wCounterSel.isRunning():
-            logger.debug("Selection word counter is busy")
-            return
-
-        SHARED.runInThreadPool(self.wCounterSel)
+        cursor = self.textCursor()
+        if cursor.hasSelection():
+            cC, wC, pC = self._qDocument.rangeCounts(
+                cursor.selectionStart(), cursor.selectionEnd()
+            )
+            self._updateSelCounts(cC, wC, pC)
 
         return
 
-    @pyqtSlot(int, int, int)
     def _updateSelCounts(self, cCount: int, wCount: int, pCount: int) -> None:
-        """Update the counts on the counter's finished signal."""
+        """Update the selection counts."""
         if self._docHandle and self._nwItem:
             logger.debug("User selected %d words", wCount)
             self.docFooter.updateWordCount(wCount, True)
@@ -1459,6 +1458,53 @@ class GuiDocEditor(QPlainTextEdit):
 
         return
 
+    def replaceAll(self) -> int:
+        """Replace all occurrences of the search bar text in the
+        document with the replace text. The matches are found in a
+        single pass over the text, and replaced back to front in one
+        edit block, so the whole operation is a single undo step.
+        Returns the number of replacements.
+        """
+        if not self.docSearch.isVisible():
+            self.beginReplace()
+            return 0
+
+        if not (searchFor := self.docSearch.searchText):
+            return 0
+
+        if CONFIG.searchRegEx:
+            # Only called to flag an invalid expression in the search box
+            self.docSearch.getSearchObject()
+
+        search = DocSearch()
+        search.setCaseSensitive(CONFIG.searchCase)
+        search.setWholeWords(CONFIG.searchWord)
+        search.setUserRegEx(CONFIG.searchRegEx)
+        matches = search.findMatches(self.getText(), searchFor)
+        if not matches:
+            self.docSearch.setResultCount(0, 0)
+            return 0
+
+        replWith = self.docSearch.replaceText
+        matchCap = CONFIG.searchMatchCap
+
+        cursor = self.textCursor()
+        cursor.beginEditBlock()
+        for pos, num, found in reversed(matches):
+            cursor.setPosition(pos, QtMoveAnchor)
+            cursor.setPosition(pos + num, QtKeepAnchor)
+            cursor.insertText(transferCase(found, replWith) if matchCap else replWith)
+        cursor.endEditBlock()
+        self.setTextCursor(cursor)
+
+        self._lastFind = None
+        self.docSearch.setResultCount(None, 0)
+        logger.debug(
+            "Replaced %d occurrences of '%s' with '%s'", len(matches), searchFor, replWith
+        )
+
+        return len(matches)
+
     ##
     #  Internal Functions : Text Manipulation
     ##
@@ -2157,7 +2203,7 @@ class MetaCompleter(QMenu):
             offset = 0
             length = len(kw.rstrip())
             suffix = "" if sep else ":"
-            options = list(filter(
+            options = sorted(filter(
                 lambda x: x.startswith(kw.rstrip()), nwKeyWords.VALID_KEYS
             ))
         else:
@@ -2169,16 +2215,14 @@ class MetaCompleter(QMenu):
             offset = tPos[index] if lookup else pos
             length = len(lookup)
             suffix = ""
-            options = list(filter(
-                lambda x: lookup in x.lower(), SHARED.project.index.getClassTags(
-                    nwKeyWords.KEY_CLASS.get(kw.strip(), nwItemClass.NO_CLASS)
-                )
-            ))[:15]
+            options = SHARED.project.index.completeTags(
+                nwKeyWords.KEY_CLASS.get(kw.strip(), nwItemClass.NO_CLASS), lookup, 15
+            )
 
         if not options:
             return False
 
-        for value in sorted(options):
+        for value in options:
             rep = value + suffix
             action = self.addAction(value)
             action.triggered.connect(lambda _, r=rep: self._emitComplete(offset, length, r))
@@ -2213,56 +2257,6 @@ class MetaCompleter(QMenu):
 # END Class MetaCompleter
 
 
-# =============================================================================================== #
-#  The Off-GUI Thread Word Counter
-#  A runnable for the word counter to be run in the thread pool off the main GUI thread.
-# =============================================================================================== #
-
-class BackgroundWordCounter(QRunnable):
-
-    def __init__(self, docEditor: GuiDocEditor, forSelection: bool = False) -> None:
-        super().__init__()
-
-        self._docEditor = docEditor
-        self._forSelection = forSelection
-        self._isRunning = False
-
-        self.signals = BackgroundWordCounterSignals()
-
-        return
-
-    def isRunning(self) -> bool:
-        return self._isRunning
-
-    @pyqtSlot()
-    def run(self) -> None:
-        """Overloaded run function for the word counter, forwarding the
-        call to the function that does the actual counting.
-        """
-        self._isRunning = True
-        if self._forSelection:
-            text = self._docEditor.getSelectedText()
-        else:
-            text = self._docEditor.getText()
-
-        cC, wC, pC = standardCounter(text)
-        self.signals.countsReady.emit(cC, wC, pC)
-        self._isRunning = False
-
-        return
-
-# END Class BackgroundWordCounter
-
-
-class BackgroundWordCounterSignals(QObject):
-    """The QRunnable cannot emit a signal, so we need a simple QObject
-    to hold the word counter signal.
-    """
-    countsReady = pyqtSignal(int, int, int)
-
-# END Class BackgroundWordCounterSignals
-
-
 # =============================================================================================== #
 #  The Formatting and Options Fold Out Menu
 #  Only used by DocEditor, and is opened by the first button in the header
@@ -2507,6 +2501,12 @@ class GuiDocEditSearch(QFrame):
         self.replaceButton.setToolTip(self.tr("Find and replace in current document"))
         self.replaceButton.clicked.connect(self._doReplace)
 
+        self.replaceAllButton = QToolButton(self)
+        self.replaceAllButton.setFont(self.boxFont)
+        self.replaceAllButton.setText(self.tr("All"))
+        self.replaceAllButton.setToolTip(self.tr("Replace all in current document"))
+        self.replaceAllButton.clicked.connect(self._doReplaceAll)
+
         self.mainBox.addWidget(self.searchLabel,   0, 0, 1, 2, QtAlignLeft)
         self.mainBox.addWidget(self.searchOpt,     0, 2, 1, 3, QtAlignRight)
         self.mainBox.addWidget(self.showReplace,   1, 0, 1, 1)
@@ -2515,6 +2515,7 @@ class GuiDocEditSearch(QFrame):
         self.mainBox.addWidget(self.resultLabel,   1, 4, 1, 1)
         self.mainBox.addWidget(self.replaceBox,    2, 1, 1, 2)
         self.mainBox.addWidget(self.replaceButton, 2, 3, 1, 1)
+        self.mainBox.addWidget(self.replaceAllButton, 2, 4, 1, 1)
 
         self.mainBox.setColumnStretch(0, 0)
         self.mainBox.setColumnStretch(1, 0)
@@ -2530,6 +2531,7 @@ class GuiDocEditSearch(QFrame):
         self.replaceBox.setFixedWidth(boxWidth)
         self.replaceBox.setVisible(False)
         self.replaceButton.setVisible(False)
+        self.replaceAllButton.setVisible(False)
         self.adjustSize()
 
         self.updateTheme()
@@ -2699,11 +2701,18 @@ class GuiDocEditSearch(QFrame):
         self.docEditor.replaceNext()
         return
 
+    @pyqtSlot()
+    def _doReplaceAll(self) -> None:
+        """Call the replace all action function for the document editor."""
+        self.docEditor.replaceAll()
+        return
+
     @pyqtSlot(bool)
     def _doToggleReplace(self, state: bool) -> None:
         """Toggle the show/hide of the replace box."""
         self.replaceBox.setVisible(state)
         self.replaceButton.setVisible(state)
+        self.replaceAllButton.setVisible(state)
         self.adjustSize()
         self.docEditor.updateDocMargins()
         return
@@ -5,6 +5,8 @@ novelWriter – GUI Syntax Highlighter
 File History:
 Created: 2019-04-06 [0.0.1] GuiDocHighlighter
 Created: 2023-09-10 [2.2b1] TextBlockData
+Created: 2024-05-14 [2.5a3] TextBlockRegistry
+Created: 2024-05-15 [2.5a3] BackgroundSpellCheck
 
 This file is a part of novelWriter
 Copyright 2018–2024, Veronica Berglyd Olsen
@@ -26,53 +28,74 @@ from __future__ import annotations
 
 import logging
 
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from itertools import count
+from threading import Lock
 from time import time
+from typing import Any
 
-from PyQt5.QtCore import QRegularExpression, Qt
+from PyQt5.QtCore import QObject, QRegularExpression, QRunnable, Qt, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import (
     QBrush, QColor, QFont, QSyntaxHighlighter, QTextBlockUserData,
-    QTextCharFormat, QTextDocument
+    QTextCharFormat, QTextCursor, QTextDocument
 )
 
-from novelwriter import CONFIG, SHARED
+from novelwriter import CONFIG, METRICS, SHARED
 from novelwriter.common import checkInt
 from novelwriter.constants import nwRegEx, nwUnicode
 from novelwriter.core.index import processComment
+from novelwriter.core.spellcheck import FakeEnchant
 from novelwriter.enum import nwComment
+from novelwriter.text.counting import T_BlockCounts
 from novelwriter.types import QRegExUnicode
 
 logger = logging.getLogger(__name__)
 
-SPELLRX = QRegularExpression(r"\b[^\s\-\+\/–—\[\]:]+\b")
+SPELLRX = QRegularExpression(nwRegEx.SPELL_WORD)
 SPELLRX.setPatternOptions(QRegExUnicode)
 SPELLSC = QRegularExpression(nwRegEx.FMT_SC)
 SPELLSC.setPatternOptions(QRegExUnicode)
 SPELLSV = QRegularExpression(nwRegEx.FMT_SV)
 SPELLSV.setPatternOptions(QRegExUnicode)
 
-BLOCK_NONE  = 0
-BLOCK_TEXT  = 1
-BLOCK_META  = 2
-BLOCK_TITLE = 4
+BLOCK_NONE    = 0
+BLOCK_TEXT    = 1
+BLOCK_META    = 2
+BLOCK_TITLE   = 4
+BLOCK_COMMENT = 8
+
+# Block types kept in the block registry
+BLOCK_TRACKED = (BLOCK_TITLE, BLOCK_META, BLOCK_COMMENT)
 
 
 class GuiDocHighlighter(QSyntaxHighlighter):
 
     __slots__ = (
         "_tHandle", "_isInactive", "_spellCheck", "_spellErr", "_hStyles",
-        "_txtRules", "_cmnRules",
+        "_txtRules", "_cmnRules", "_registry", "_spellGen", "_spellRev",
+        "_dictVersion", "_spellPending", "_spellWorker",
     )
 
-    def __init__(self, document: QTextDocument) -> None:
+    def __init__(self, document: QTextDocument, registry: TextBlockRegistry) -> None:
         super().__init__(document)
 
         logger.debug("Create: GuiDocHighlighter")
 
+        self._registry = registry
         self._tHandle = None
         self._isInactive = False
         self._spellCheck = False
         self._spellErr = QTextCharFormat()
 
+        # Background spell checking
+        self._spellGen = 0
+        self._spellRev = 0
+        self._dictVersion = -1
+        self._spellPending: dict[int, tuple[int, QTextCursor]] = {}
+        self._spellWorker = BackgroundSpellCheck()
+        self._spellWorker.signals.spellChecked.connect(self._applySpellCheck)
+
         self._hStyles: dict[str, QTextCharFormat] = {}
         self._txtRules: list[tuple[QRegularExpression, dict[int, QTextCharFormat]]] = []
         self._cmnRules: list[tuple[QRegularExpression, dict[int, QTextCharFormat]]] = []
@@ -258,6 +281,9 @@ class GuiDocHighlighter(QSyntaxHighlighter):
     def setSpellCheck(self, state: bool) -> None:
         """Enable/disable the real time spell checker."""
         self._spellCheck = state
+        if not state:
+            self._spellPending.clear()
+            self._spellWorker.clearJobs()
         return
 
     def setHandle(self, tHandle: str) -> None:
@@ -273,18 +299,54 @@ class GuiDocHighlighter(QSyntaxHighlighter):
     #  Methods
     ##
 
+    def resetSpellCheck(self) -> None:
+        """Give the background spell checker a new dictionary, and mark
+        all blocks to be checked again the next time they are
+        highlighted.
+        """
+        self._dictVersion = SHARED.spelling.version
+        self._spellGen += 1
+        self._spellPending.clear()
+        self._spellWorker.setDictionary(SHARED.spelling.newDictionary())
+        return
+
     def rehighlightByType(self, cType: int) -> None:
-        """Loop through all blocks and re-highlight those of a given
-        content type.
+        """Re-highlight all blocks of a given content type. Only text
+        blocks require a loop through the whole document.
         """
         qDoc = self.document()
-        nBlocks = qDoc.blockCount()
         tStart = time()
-        for i in range(nBlocks):
+        numbers = self._registry.blockNumbers(cType)
+        for i in range(qDoc.blockCount()) if numbers is None else numbers:
             block = qDoc.findBlockByNumber(i)
             if block.userState() & cType > 0:
                 self.rehighlightBlock(block)
-        logger.debug("Document highlighted in %.3f ms" % (1000*(time() - tStart)))
+        tTotal = time() - tStart
+        METRICS.addTime("highlight.byType", tTotal)
+        logger.debug("Document highlighted in %.3f ms", 1000*tTotal)
+        return
+
+    def rehighlightChangedTags(self) -> None:
+        """Loop through all meta data blocks and re-highlight those that
+        reference tags that have changed since they were last checked.
+        """
+        index = SHARED.project.index
+        qDoc = self.document()
+        tStart = time()
+        count = 0
+        for i in self._registry.blockNumbers(BLOCK_META) or []:
+            block = qDoc.findBlockByNumber(i)
+            if block.userState() & BLOCK_META > 0:
+                data = block.userData()
+                if not (
+                    isinstance(data, TextBlockData)
+                    and not index.tagsChangedSince(data.tagKeys, data.tagVersion)
+                ):
+                    self.rehighlightBlock(block)
+                    count += 1
+        tTotal = time() - tStart
+        METRICS.addTime("highlight.changedTags", tTotal)
+        logger.debug("Re-highlighted %d meta blocks in %.3f ms", count, 1000*tTotal)
         return
 
     ##
@@ -297,17 +359,25 @@ class GuiDocHighlighter(QSyntaxHighlighter):
         is significantly faster than running the regex checks used for
         text paragraphs.
         """
-        self.setCurrentBlockState(BLOCK_NONE)
         if self._tHandle is None or not text:
+            self._setBlockState(BLOCK_NONE)
             return
 
         xOff = 0
         hRules = None
         if text.startswith("@"):  # Keywords and commands
-            self.setCurrentBlockState(BLOCK_META)
+            self._setBlockState(BLOCK_META)
             index = SHARED.project.index
+            version = index.tagsVersion()
             isValid, bits, pos = index.scanThis(text)
             isGood = index.checkThese(bits, self._tHandle)
+
+            data = self.currentBlockUserData()
+            if not isinstance(data, TextBlockData):
+                data = TextBlockData()
+                self.setCurrentBlockUserData(data)
+            data.setTags([index.parseValue(b)[0] for b in bits[1:]], version)
+
             if isValid:
                 for n, bit in enumerate(bits):
                     xPos = pos[n]
@@ -328,7 +398,7 @@ class GuiDocHighlighter(QSyntaxHighlighter):
             return
 
         elif text.startswith(("# ", "#! ", "## ", "##! ", "### ", "###! ", "#### ")):
-            self.setCurrentBlockState(BLOCK_TITLE)
+            self._setBlockState(BLOCK_TITLE)
 
             if text.startswith("# "):  # Heading 1
                 self.setFormat(0, 1, self._hStyles["head1h"])
@@ -359,7 +429,7 @@ class GuiDocHighlighter(QSyntaxHighlighter):
                 self.setFormat(4, len(text), self._hStyles["header3"])
 
         elif text.startswith("%"):  # Comments
-            self.setCurrentBlockState(BLOCK_TEXT)
+            self._setBlockState(BLOCK_TEXT | BLOCK_COMMENT)
             hRules = self._cmnRules
 
             cStyle, cMod, _, cDot, cPos = processComment(text)
@@ -379,7 +449,7 @@ class GuiDocHighlighter(QSyntaxHighlighter):
                 self.setFormat(cPos, cLen, self._hStyles["note"])
 
         elif text.startswith("["):  # Special Command
-            self.setCurrentBlockState(BLOCK_TEXT)
+            self._setBlockState(BLOCK_TEXT)
             hRules = self._txtRules
 
             sText = text.rstrip().lower()
@@ -396,7 +466,7 @@ class GuiDocHighlighter(QSyntaxHighlighter):
                 return
 
         else:  # Text Paragraph
-            self.setCurrentBlockState(BLOCK_TEXT)
+            self._setBlockState(BLOCK_TEXT)
             hRules = self._txtRules
 
         if hRules:
@@ -419,14 +489,46 @@ class GuiDocHighlighter(QSyntaxHighlighter):
             self.setCurrentBlockUserData(data)
 
         if self._spellCheck:
-            for xPos, xLen in data.spellCheck(text, xOff):
-                for x in range(xPos, xPos+xLen):
+            if self._dictVersion != SHARED.spelling.version:
+                self.resetSpellCheck()
+            if not data.isSpellChecked(text, self._spellGen):
+                self._queueSpellCheck(data, text, xOff)
+
+            # Until the new result arrives, the errors of the previous
+            # check of the block are shown
+            for xPos, xLen in data.spellErrors:
+                for x in range(xPos, min(xPos+xLen, len(text))):
                     cFmt = self.format(x)
                     cFmt.merge(self._spellErr)
                     self.setFormat(x, 1, cFmt)
 
         return
 
+    ##
+    #  Private Slots
+    ##
+
+    @pyqtSlot(int, int, list)
+    def _applySpellCheck(self, blockId: int, revision: int, errors: list) -> None:
+        """Apply the result of a background spell check to its block,
+        unless the block has changed since the check was queued.
+        """
+        pending = self._spellPending.get(blockId)
+        if pending is None or pending[0] != revision:
+            return
+
+        del self._spellPending[blockId]
+        block = pending[1].block()
+        data = block.userData()
+        if (
+            block.isValid() and isinstance(data, TextBlockData)
+            and data.blockId == blockId and data.spellRevision == revision
+        ):
+            data.setSpellErrors(errors)
+            self.rehighlightBlock(block)
+
+        return
+
     ##
     #  Internal Functions
     ##
@@ -463,30 +565,241 @@ class GuiDocHighlighter(QSyntaxHighlighter):
 
         return
 
+    def _queueSpellCheck(self, data: TextBlockData, text: str, offset: int) -> None:
+        """Queue a spell check of the current block in the background
+        spell checker. The cursor follows the block if the document is
+        edited before the result arrives.
+        """
+        self._spellRev += 1
+        data.setSpellRequest(text, self._spellGen, self._spellRev)
+        self._spellPending[data.blockId] = (self._spellRev, QTextCursor(self.currentBlock()))
+        if self._spellWorker.addJob(data.blockId, self._spellRev, text, offset):
+            SHARED.runInThreadPool(self._spellWorker)
+        return
+
+    def _setBlockState(self, state: int) -> None:
+        """Set the state of the current block, and record it in the
+        block registry.
+        """
+        self.setCurrentBlockState(state)
+        self._registry.setBlockState(self.currentBlock().blockNumber(), state)
+        return
+
 # END Class GuiDocHighlighter
 
 
 class TextBlockData(QTextBlockUserData):
 
-    __slots__ = ("_spellErrors")
+    __slots__ = (
+        "_blockId", "_spellErrors", "_spellText", "_spellGen", "_spellRev",
+        "_tagKeys", "_tagVersion", "_counts",
+    )
+
+    _nextId = count(1)
 
     def __init__(self) -> None:
         super().__init__()
+        self._blockId = next(TextBlockData._nextId)
         self._spellErrors: list[tuple[int, int]] = []
+        self._spellText: str | None = None
+        self._spellGen = -1
+        self._spellRev = -1
+        self._tagKeys: list[str] = []
+        self._tagVersion = -1
+        self._counts: T_BlockCounts | None = None
         return
 
+    @property
+    def blockId(self) -> int:
+        """Return the unique id of the block data."""
+        return self._blockId
+
     @property
     def spellErrors(self) -> list[tuple[int, int]]:
         """Return spell error data from last check."""
         return self._spellErrors
 
-    def spellCheck(self, text: str, offset: int) -> list[tuple[int, int]]:
-        """Run the spell checker and cache the result, and return the
-        list of spell check errors.
+    @property
+    def spellRevision(self) -> int:
+        """Return the revision of the last queued spell check."""
+        return self._spellRev
+
+    @property
+    def tagKeys(self) -> list[str]:
+        """Return the tag keys referenced by a meta data block."""
+        return self._tagKeys
+
+    @property
+    def tagVersion(self) -> int:
+        """Return the tags index version the block was checked against."""
+        return self._tagVersion
+
+    @property
+    def counts(self) -> T_BlockCounts | None:
+        """Return the cached word counts of the block, if any."""
+        return self._counts
+
+    def setCounts(self, counts: T_BlockCounts | None) -> None:
+        """Cache the word counts of the block, or clear them."""
+        self._counts = counts
+        return
+
+    def setTags(self, tags: list[str], version: int) -> None:
+        """Record the tags of a meta data block, and the version of the
+        tags index they were checked against.
         """
+        self._tagKeys = [t.lower() for t in tags]
+        self._tagVersion = version
+        return
+
+    def isSpellChecked(self, text: str, generation: int) -> bool:
+        """Check if a spell check has been queued for the text."""
+        return self._spellGen == generation and self._spellText == text
+
+    def setSpellRequest(self, text: str, generation: int, revision: int) -> None:
+        """Record the text and revision of a queued spell check."""
+        self._spellText = text
+        self._spellGen = generation
+        self._spellRev = revision
+        return
+
+    def setSpellErrors(self, errors: list[tuple[int, int]]) -> None:
+        """Set the spell check errors from a finished spell check."""
+        self._spellErrors = errors
+        return
+
+# END Class TextBlockData
+
+
+class TextBlockRegistry:
+    """Ordered lists of the numbers of the heading, meta data and
+    comment blocks of a document. The highlighter records the state of
+    each block it processes, and the document shifts the numbers when
+    blocks are added or removed, so blocks of these types can be found
+    without a loop through the whole document.
+    """
+
+    __slots__ = ("_blocks",)
+
+    def __init__(self) -> None:
+        self._blocks: dict[int, list[int]] = {cType: [] for cType in BLOCK_TRACKED}
+        return
+
+    def clear(self) -> None:
+        """Clear the registry."""
+        for numbers in self._blocks.values():
+            numbers.clear()
+        return
+
+    def blockNumbers(self, cType: int) -> list[int] | None:
+        """Return the ordered numbers of the blocks of one or more
+        content types, or None if a type is not in the registry.
+        """
+        lists = []
+        for bType in (1 << i for i in range(cType.bit_length())):
+            if cType & bType:
+                if bType not in self._blocks:
+                    return None
+                lists.append(self._blocks[bType])
+        return list(merge(*lists))
+
+    def setBlockState(self, number: int, state: int) -> None:
+        """Record the state of a block."""
+        for cType, numbers in self._blocks.items():
+            pos = bisect_left(numbers, number)
+            found = pos < len(numbers) and numbers[pos] == number
+            if state & cType and not found:
+                numbers.insert(pos, number)
+            elif found and not state & cType:
+                numbers.pop(pos)
+        return
+
+    def shiftBlocks(self, first: int, last: int, delta: int) -> None:
+        """Remove the blocks from first to last, which have changed, and
+        shift the numbers of the blocks after them by delta.
+        """
+        for numbers in self._blocks.values():
+            start = bisect_left(numbers, first)
+            end = bisect_right(numbers, last)
+            if delta:
+                numbers[start:] = [n + delta for n in numbers[end:]]
+            else:
+                del numbers[start:end]
+        return
+
+# END Class TextBlockRegistry
+
+
+class BackgroundSpellCheck(QRunnable):
+    """A runnable that spell checks text blocks in the thread pool. It
+    has its own dictionary and regular expressions, and only shares the
+    job queue with the GUI thread. A new job for a block replaces a
+    queued job for the same block. Each result is emitted with the
+    block id and revision of its job.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self._lock = Lock()
+        self._jobs: dict[int, tuple[int, str, int]] = {}
+        self._dict: Any = FakeEnchant()
+        self._running = False
+
+        self._rxWord = QRegularExpression(SPELLRX.pattern(), SPELLRX.patternOptions())
+        self._rxCodes = [
+            QRegularExpression(rX.pattern(), rX.patternOptions()) for rX in (SPELLSC, SPELLSV)
+        ]
+
+        self.signals = BackgroundSpellCheckSignals()
+
+        return
+
+    def setDictionary(self, handle: Any) -> None:
+        """Set the dictionary, and drop all queued jobs."""
+        with self._lock:
+            self._dict = handle
+            self._jobs.clear()
+        return
+
+    def addJob(self, blockId: int, revision: int, text: str, offset: int) -> bool:
+        """Queue a job, and return True if the runnable must be
+        started.
+        """
+        with self._lock:
+            self._jobs[blockId] = (revision, text, offset)
+            if self._running:
+                return False
+            self._running = True
+        return True
+
+    def clearJobs(self) -> None:
+        """Drop all queued jobs."""
+        with self._lock:
+            self._jobs.clear()
+        return
+
+    @pyqtSlot()
+    def run(self) -> None:
+        """Process jobs until the queue is empty."""
+        while True:
+            with self._lock:
+                if not self._jobs:
+                    self._running = False
+                    break
+                blockId = next(iter(self._jobs))
+                revision, text, offset = self._jobs.pop(blockId)
+                handle = self._dict
+            errors = self._checkText(text, offset, handle)
+            self.signals.spellChecked.emit(blockId, revision, errors)
+        return
+
+    def _checkText(self, text: str, offset: int, handle: Any) -> list[tuple[int, int]]:
+        """Return the position and length of all misspelled words."""
         if "[" in text:
             # Strip shortcodes
-            for rX in [SPELLSC, SPELLSV]:
+            for rX in self._rxCodes:
                 rxItt = rX.globalMatch(text, offset)
                 while rxItt.hasNext():
                     rxMatch = rxItt.next()
@@ -495,15 +808,27 @@ class TextBlockData(QTextBlockUserData):
                     xEnd = rxMatch.capturedEnd(0)
                     text = text[:xPos] + " "*xLen + text[xEnd:]
 
-        self._spellErrors = []
-        rxSpell = SPELLRX.globalMatch(text.replace("_", " "), offset)
+        errors = []
+        rxSpell = self._rxWord.globalMatch(text.replace("_", " "), offset)
         while rxSpell.hasNext():
             rxMatch = rxSpell.next()
-            if not SHARED.spelling.checkWord(rxMatch.captured(0)):
-                if not rxMatch.captured(0).isnumeric() and not rxMatch.captured(0).isupper():
-                    self._spellErrors.append(
-                        (rxMatch.capturedStart(0), rxMatch.capturedLength(0))
-                    )
-        return self._spellErrors
+            word = rxMatch.captured(0)
+            try:
+                isGood = bool(handle.check(word))
+            except Exception:
+                isGood = True
+            if not (isGood or word.isnumeric() or word.isupper()):
+                errors.append((rxMatch.capturedStart(0), rxMatch.capturedLength(0)))
 
-# END Class TextBlockData
+        return errors
+
+# END Class BackgroundSpellCheck
+
+
+class BackgroundSpellCheckSignals(QObject):
+    """The QRunnable cannot emit a signal, so we need a simple QObject
+    to hold the spell check signal.
+    """
+    spellChecked = pyqtSignal(int, int, list)
+
+# END Class BackgroundSpellCheckSignals
@@ -25,12 +25,18 @@ from __future__ import annotations
 
 import logging
 
+from bisect import bisect_left
 from enum import Enum
+from typing import Any
 
-from PyQt5.QtCore import QModelIndex, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import (
+    QAbstractTableModel, QModelIndex, QObject, QSortFilterProxyModel, Qt,
+    pyqtSignal, pyqtSlot
+)
+from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtWidgets import (
     QAbstractItemView, QFrame, QHeaderView, QMenu, QTabWidget, QToolButton,
-    QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
+    QTreeView, QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
 )
 
 from novelwriter import CONFIG, SHARED
@@ -40,10 +46,14 @@ from novelwriter.core.index import IndexHeading, IndexItem
 from novelwriter.enum import nwDocMode, nwItemClass
 from novelwriter.extensions.modified import NIconToolButton
 from novelwriter.gui.theme import STYLES_FLAT_TABS, STYLES_MIN_TOOLBUTTON
-from novelwriter.types import QtDecoration, QtUserRole
+from novelwriter.types import QtDecoration, QtDisplayRole, QtToolTipRole, QtUserRole
 
 logger = logging.getLogger(__name__)
 
+# Tag, Name, Importance, Importance Icon, Document Icon, Document, Heading
+# Decoration, Heading, Synopsis
+T_KeyWordEntry = tuple[str, str, str, QIcon, QIcon, str, QPixmap, str, str]
+
 
 class GuiDocViewerPanel(QWidget):
 
@@ -155,14 +165,8 @@ class GuiDocViewerPanel(QWidget):
     def projectItemChanged(self, tHandle: str) -> None:
         """Update meta data for project item."""
         self.tabBackRefs.refreshDocument(tHandle)
-        activeOnly = self.aInactive.isChecked()
         for key in SHARED.project.index.getDocumentTags(tHandle):
-            name, tClass, iItem, hItem = SHARED.project.index.getSingleTag(key)
-            if tClass in self.kwTabs and iItem and hItem:
-                if not activeOnly or (iItem and iItem.item.isActive):
-                    self.kwTabs[tClass].addUpdateEntry(key, name, iItem, hItem)
-                else:
-                    self.kwTabs[tClass].removeEntry(key)
+            self._updateEntry(key)
         self._updateTabVisibility()
         return
 
@@ -177,9 +181,7 @@ class GuiDocViewerPanel(QWidget):
     def updateChangedTags(self, updated: list[str], deleted: list[str]) -> None:
         """Forward tags changes to the lists."""
         for key in updated:
-            name, tClass, iItem, hItem = SHARED.project.index.getSingleTag(key)
-            if tClass in self.kwTabs and iItem and hItem:
-                self.kwTabs[tClass].addUpdateEntry(key, name, iItem, hItem)
+            self._updateEntry(key)
         for key in deleted:
             for cTab in self.kwTabs.values():
                 if cTab.removeEntry(key):
@@ -197,8 +199,6 @@ class GuiDocViewerPanel(QWidget):
     def _toggleHideInactive(self, state: bool) -> None:
         """Process toggling of active/inactive visibility."""
         logger.debug("Setting inactive items to %s", "hidden" if state else "visible")
-        for cTab in self.kwTabs.values():
-            cTab.clearContent()
         self._loadAllTags()
         self._updateTabVisibility()
         return
@@ -214,11 +214,32 @@ class GuiDocViewerPanel(QWidget):
         return
 
     def _loadAllTags(self) -> None:
-        """Load all tags into the tabs."""
-        data = SHARED.project.index.getTagsData(activeOnly=self.aInactive.isChecked())
-        for key, name, tClass, iItem, hItem in data:
-            if tClass in self.kwTabs and iItem and hItem:
-                self.kwTabs[tClass].addUpdateEntry(key, name, iItem, hItem)
+        """Load all tags into the tabs. Each tab is filled in a single
+        update.
+        """
+        activeOnly = self.aInactive.isChecked()
+        for cTab in self.kwTabs.values():
+            cTab.setEntries([
+                cTab.makeEntry(key, name, iItem, hItem)
+                for key, name, _, iItem, hItem in SHARED.project.index.getTagsData(
+                    activeOnly=activeOnly, itemClass=cTab.itemClass
+                ) if iItem and hItem
+            ])
+        return
+
+    def _updateEntry(self, key: str) -> None:
+        """Add, update or remove a single tag in the tabs, depending on
+        its current state in the index.
+        """
+        name, tClass, iItem, hItem = SHARED.project.index.getSingleTag(key)
+        show = bool(iItem and hItem) and tClass in self.kwTabs
+        if show and self.aInactive.isChecked():
+            show = bool(iItem and iItem.item.isActive)
+        for cClass, cTab in self.kwTabs.items():
+            if show and cClass == tClass and iItem and hItem:
+                cTab.addUpdateEntry(key, name, iItem, hItem)
+            else:
+                cTab.removeEntry(key)
         return
 
 # END Class GuiDocViewerPanel
@@ -363,7 +384,7 @@ class _ViewPanelBackRefs(QTreeWidget):
 # END Class _ViewPanelBackRefs
 
 
-class _ViewPanelKeyWords(QTreeWidget):
+class _ViewPanelKeyWords(QTreeView):
 
     C_DATA   = 0
     C_NAME   = 0
@@ -381,17 +402,25 @@ class _ViewPanelKeyWords(QTreeWidget):
 
         self._parent = parent
         self._class = itemClass
-        self._treeMap: dict[str, QTreeWidgetItem] = {}
 
         iPx = SHARED.theme.baseIconHeight
         iSz = SHARED.theme.baseIconSize
         cMg = CONFIG.pxInt(6)
 
-        self.setHeaderLabels([
+        self._model = _ViewPanelKeyWordsModel(self, [
             self.tr("Tag"), "", "", self.tr("Importance"), self.tr("Document"),
             self.tr("Heading"), self.tr("Short Description")
         ])
+
+        # The proxy handles sorting by other columns than the tag
+        self._proxy = QSortFilterProxyModel(self)
+        self._proxy.setSourceModel(self._model)
+        self._proxy.setSortCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        self.setModel(self._proxy)
         self.setIndentation(0)
+        self.setRootIsDecorated(False)
+        self.setUniformRowHeights(True)
         self.setIconSize(iSz)
         self.setFrameStyle(QFrame.Shape.NoFrame)
         self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
@@ -414,6 +443,7 @@ class _ViewPanelKeyWords(QTreeWidget):
         self._classIcon = SHARED.theme.getIcon(nwLabels.CLASS_ICON[itemClass])
         self._editIcon = SHARED.theme.getIcon("edit")
         self._viewIcon = SHARED.theme.getIcon("view")
+        self._model.setIcons(self._classIcon, self._editIcon, self._viewIcon)
 
         # Signals
         self.clicked.connect(self._treeItemClicked)
@@ -421,29 +451,53 @@ class _ViewPanelKeyWords(QTreeWidget):
 
         return
 
+    @property
+    def itemClass(self) -> nwItemClass:
+        """The item class of the tags in the list."""
+        return self._class
+
     def updateTheme(self) -> None:
         """Update theme elements."""
         self._classIcon = SHARED.theme.getIcon(nwLabels.CLASS_ICON[self._class])
         self._editIcon = SHARED.theme.getIcon("edit")
         self._viewIcon = SHARED.theme.getIcon("view")
-        for i in range(self.topLevelItemCount()):
-            if item := self.topLevelItem(i):
-                item.setIcon(self.C_EDIT, self._editIcon)
-                item.setIcon(self.C_VIEW, self._viewIcon)
+        self._model.setIcons(self._classIcon, self._editIcon, self._viewIcon)
         return
 
     def countEntries(self) -> int:
         """Return the number of items in the list."""
-        return self.topLevelItemCount()
+        return self._model.rowCount()
+
+    def hasEntry(self, tag: str) -> bool:
+        """Check if a tag is in the list."""
+        return self._model.hasEntry(tag)
+
+    def entryText(self, row: int, column: int) -> str:
+        """Return the text of a cell, in the displayed order."""
+        return str(self._proxy.index(row, column).data() or "")
 
     def clearContent(self) -> None:
         """Clear the list."""
-        self._treeMap = {}
-        self.clear()
+        self._model.setEntries([])
+        return
+
+    def setEntries(self, entries: list[T_KeyWordEntry]) -> None:
+        """Replace the content of the list in a single update."""
+        self._model.setEntries(entries)
         return
 
     def addUpdateEntry(self, tag: str, name: str, iItem: IndexItem, hItem: IndexHeading) -> None:
         """Add a new entry, or update an existing one."""
+        self._model.updateEntry(self.makeEntry(tag, name, iItem, hItem))
+        return
+
+    def removeEntry(self, tag: str) -> bool:
+        """Remove a tag from the list."""
+        return self._model.removeEntry(tag)
+
+    @staticmethod
+    def makeEntry(tag: str, name: str, iItem: IndexItem, hItem: IndexHeading) -> T_KeyWordEntry:
+        """Build the data of a list entry."""
         nwItem = iItem.item
         docIcon = SHARED.theme.getItemIcon(
             nwItem.itemType, nwItem.itemClass,
@@ -452,42 +506,10 @@ class _ViewPanelKeyWords(QTreeWidget):
         impLabel, impIcon = nwItem.getImportStatus()
         iLevel = nwHeaders.H_LEVEL.get(hItem.level, 0) if nwItem.isDocumentLayout() else 5
         hDec = SHARED.theme.getHeaderDecorationNarrow(iLevel)
-
-        # This can not use a get call to the dictionary as that would create an
-        # instance of the QTreeWidgetItem, which has some weird side effects
-        trItem = self._treeMap[tag] if tag in self._treeMap else QTreeWidgetItem()
-
-        trItem.setIcon(self.C_NAME, self._classIcon)
-        trItem.setText(self.C_NAME, name)
-        trItem.setToolTip(self.C_NAME, name)
-        trItem.setIcon(self.C_EDIT, self._editIcon)
-        trItem.setIcon(self.C_VIEW, self._viewIcon)
-        trItem.setIcon(self.C_IMPORT, impIcon)
-        trItem.setText(self.C_IMPORT, impLabel)
-        trItem.setToolTip(self.C_IMPORT, impLabel)
-        trItem.setIcon(self.C_DOC, docIcon)
-        trItem.setText(self.C_DOC, nwItem.itemName)
-        trItem.setToolTip(self.C_DOC, nwItem.itemName)
-        trItem.setData(self.C_TITLE, QtDecoration, hDec)
-        trItem.setText(self.C_TITLE, hItem.title)
-        trItem.setToolTip(self.C_TITLE, hItem.title)
-        trItem.setText(self.C_SHORT, hItem.synopsis)
-        trItem.setToolTip(self.C_SHORT, hItem.synopsis)
-        trItem.setData(self.C_DATA, self.D_TAG, tag)
-
-        if tag not in self._treeMap:
-            self.addTopLevelItem(trItem)
-            self._treeMap[tag] = trItem
-
-        return
-
-    def removeEntry(self, tag: str) -> bool:
-        """Remove a tag from the list."""
-        if tag in self._treeMap:
-            self.takeTopLevelItem(self.indexOfTopLevelItem(self._treeMap[tag]))
-            self._treeMap.pop(tag, None)
-            return True
-        return False
+        return (
+            tag, name, impLabel, impIcon, docIcon, nwItem.itemName,
+            hDec, hItem.title, hItem.synopsis,
+        )
 
     def setColumnWidths(self, widths: list[int]) -> None:
         """Set the column widths."""
@@ -530,3 +552,123 @@ class _ViewPanelKeyWords(QTreeWidget):
         return
 
 # END Class _ViewPanelKeyWords
+
+
+class _ViewPanelKeyWordsModel(QAbstractTableModel):
+    """The model of a tags list. The entries are kept sorted by their
+    tag key, so single entries can be inserted and removed in place,
+    and an update to an unchanged entry does nothing.
+    """
+
+    def __init__(self, parent: QObject, header: list[str]) -> None:
+        super().__init__(parent=parent)
+        self._header = header
+        self._keys: list[str] = []
+        self._entries: dict[str, T_KeyWordEntry] = {}
+        self._icons = (QIcon(), QIcon(), QIcon())
+        return
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of entries."""
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of columns."""
+        return 0 if parent.isValid() else len(self._header)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = 0) -> Any:
+        """Return the column labels."""
+        if orientation == Qt.Orientation.Horizontal and role == QtDisplayRole:
+            if 0 <= section < len(self._header):
+                return self._header[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = 0) -> Any:
+        """Return the data of a cell."""
+        if not index.isValid() or index.row() >= len(self._keys):
+            return None
+
+        tag, name, impLabel, impIcon, docIcon, docName, hDec, title, short = (
+            self._entries[self._keys[index.row()]]
+        )
+        column = index.column()
+        if role in (QtDisplayRole, QtToolTipRole):
+            return {
+                _ViewPanelKeyWords.C_NAME: name,
+                _ViewPanelKeyWords.C_IMPORT: impLabel,
+                _ViewPanelKeyWords.C_DOC: docName,
+                _ViewPanelKeyWords.C_TITLE: title,
+                _ViewPanelKeyWords.C_SHORT: short,
+            }.get(column)
+        elif role == QtDecoration:
+            return {
+                _ViewPanelKeyWords.C_NAME: self._icons[0],
+                _ViewPanelKeyWords.C_EDIT: self._icons[1],
+                _ViewPanelKeyWords.C_VIEW: self._icons[2],
+                _ViewPanelKeyWords.C_IMPORT: impIcon,
+                _ViewPanelKeyWords.C_DOC: docIcon,
+                _ViewPanelKeyWords.C_TITLE: hDec,
+            }.get(column)
+        elif role == _ViewPanelKeyWords.D_TAG and column == _ViewPanelKeyWords.C_DATA:
+            return tag
+
+        return None
+
+    ##
+    #  Methods
+    ##
+
+    def hasEntry(self, tag: str) -> bool:
+        """Check if a tag is in the model."""
+        return tag.lower() in self._entries
+
+    def setIcons(self, classIcon: QIcon, editIcon: QIcon, viewIcon: QIcon) -> None:
+        """Set the icons shared by all entries."""
+        self._icons = (classIcon, editIcon, viewIcon)
+        if self._keys:
+            self.dataChanged.emit(
+                self.index(0, _ViewPanelKeyWords.C_NAME),
+                self.index(len(self._keys) - 1, _ViewPanelKeyWords.C_VIEW),
+            )
+        return
+
+    def setEntries(self, entries: list[T_KeyWordEntry]) -> None:
+        """Replace all entries in one model reset."""
+        self.beginResetModel()
+        self._entries = {e[0].lower(): e for e in entries}
+        self._keys = sorted(self._entries)
+        self.endResetModel()
+        return
+
+    def updateEntry(self, entry: T_KeyWordEntry) -> None:
+        """Insert a new entry, or update an existing one if it has
+        changed.
+        """
+        key = entry[0].lower()
+        pos = bisect_left(self._keys, key)
+        if key in self._entries:
+            if self._entries[key] != entry:
+                self._entries[key] = entry
+                self.dataChanged.emit(
+                    self.index(pos, 0), self.index(pos, len(self._header) - 1)
+                )
+        else:
+            self.beginInsertRows(QModelIndex(), pos, pos)
+            self._keys.insert(pos, key)
+            self._entries[key] = entry
+            self.endInsertRows()
+        return
+
+    def removeEntry(self, tag: str) -> bool:
+        """Remove an entry."""
+        key = tag.lower()
+        if key in self._entries:
+            pos = bisect_left(self._keys, key)
+            self.beginRemoveRows(QModelIndex(), pos, pos)
+            self._keys.pop(pos)
+            del self._entries[key]
+            self.endRemoveRows()
+            return True
+        return False
+
+# END Class _ViewPanelKeyWordsModel
@@ -32,8 +32,9 @@ from PyQt5.QtGui import QTextBlock, QTextCursor, QTextDocument
 from PyQt5.QtCore import QObject, pyqtSlot
 from PyQt5.QtWidgets import QApplication, QPlainTextDocumentLayout
 
-from novelwriter import SHARED
-from novelwriter.gui.dochighlight import GuiDocHighlighter, TextBlockData
+from novelwriter import METRICS, SHARED
+from novelwriter.gui.dochighlight import GuiDocHighlighter, TextBlockData, TextBlockRegistry
+from novelwriter.text.counting import T_BlockCounts, blockCounter, sumBlockCounts
 
 logger = logging.getLogger(__name__)
 
@@ -44,9 +45,18 @@ class GuiTextDocument(QTextDocument):
         super().__init__(parent=parent)
 
         self._handle = None
-        self._syntax = GuiDocHighlighter(self)
+        self._blocks = TextBlockRegistry()
+        self._blockCount = self.blockCount()
+
+        # The registry must be updated before the highlighter processes
+        # the changed blocks, so this slot is connected first
+        self.contentsChange.connect(self._shiftBlockRegistry)
+
+        self._syntax = GuiDocHighlighter(self, self._blocks)
         self.setDocumentLayout(QPlainTextDocumentLayout(self))
 
+        self.contentsChange.connect(self._clearBlockCounts)
+
         logger.debug("Ready: GuiTextDocument")
 
         return
@@ -85,11 +95,16 @@ class GuiTextDocument(QTextDocument):
 
         self.setUndoRedoEnabled(True)
         self.blockSignals(False)
+        self._blocks.clear()
+        self._blockCount = self.blockCount()
         self._syntax.rehighlight()
         QApplication.processEvents()
 
         tEnd = time()
 
+        METRICS.addTime("editor.loadText", tMid - tStart)
+        METRICS.addTime("editor.highlight", tEnd - tMid)
+        METRICS.sample("editor.blocks", count)
         logger.debug("Loaded %d text blocks in %.3f ms", count, 1000*(tMid - tStart))
         logger.debug("Highlighted document in %.3f ms", 1000*(tEnd - tMid))
 
@@ -115,15 +130,53 @@ class GuiTextDocument(QTextDocument):
         return "", -1, -1, []
 
     def iterBlockByType(self, cType: int, maxCount: int = 1000) -> Iterable[QTextBlock]:
-        """Iterate over all text blocks of a given type."""
+        """Iterate over all text blocks of a given type. Headings, meta
+        data and comments are looked up in the block registry.
+        """
         count = 0
-        for i in range(self.blockCount()):
+        numbers = self._blocks.blockNumbers(cType)
+        for i in range(self.blockCount()) if numbers is None else numbers:
+            if count >= maxCount:
+                break
             block = self.findBlockByNumber(i)
-            if count < maxCount and block.isValid() and block.userState() & cType > 0:
+            if block.isValid() and block.userState() & cType > 0:
                 count += 1
                 yield block
         return None
 
+    def documentCounts(self) -> tuple[int, int, int]:
+        """Return the character, word and paragraph counts of the
+        document. Only blocks that have changed since the last call
+        are counted again.
+        """
+        with METRICS.timer("editor.countDocument"):
+            counts = []
+            block = self.firstBlock()
+            while block.isValid():
+                counts.append(self._blockCounts(block))
+                block = block.next()
+            return sumBlockCounts(counts)
+
+    def rangeCounts(self, start: int, end: int) -> tuple[int, int, int]:
+        """Return the character, word and paragraph counts of the text
+        between two positions. The blocks only partially covered by the
+        range are always counted.
+        """
+        first = self.findBlock(start)
+        last = self.findBlock(end)
+        if first.blockNumber() == last.blockNumber():
+            text = first.text()[start - first.position():end - first.position()]
+            return sumBlockCounts([blockCounter(text)])
+
+        counts = [blockCounter(first.text()[start - first.position():])]
+        block = first.next()
+        while block.isValid() and block.blockNumber() < last.blockNumber():
+            counts.append(self._blockCounts(block))
+            block = block.next()
+        counts.append(blockCounter(last.text()[:end - last.position()]))
+
+        return sumBlockCounts(counts)
+
     ##
     #  Public Slots
     ##
@@ -134,4 +187,54 @@ class GuiTextDocument(QTextDocument):
         self._syntax.setSpellCheck(state)
         return
 
+    ##
+    #  Private Slots
+    ##
+
+    @pyqtSlot(int, int, int)
+    def _shiftBlockRegistry(self, pos: int, removed: int, added: int) -> None:
+        """Remove the changed blocks from the block registry, and shift
+        the blocks after them if the number of blocks has changed. The
+        highlighter adds the changed blocks back.
+        """
+        count = self.blockCount()
+        delta = count - self._blockCount
+        self._blockCount = count
+
+        end = self.findBlock(pos + added)
+        first = self.findBlock(pos).blockNumber()
+        last = (end if end.isValid() else self.lastBlock()).blockNumber()
+        self._blocks.shiftBlocks(first, last - delta, delta)
+
+        return
+
+    @pyqtSlot(int, int, int)
+    def _clearBlockCounts(self, pos: int, removed: int, added: int) -> None:
+        """Clear the cached word counts of the changed blocks."""
+        block = self.findBlock(pos)
+        end = self.findBlock(pos + added)
+        last = (end if end.isValid() else self.lastBlock()).blockNumber()
+        while block.isValid() and block.blockNumber() <= last:
+            if isinstance(data := block.userData(), TextBlockData):
+                data.setCounts(None)
+            block = block.next()
+        return
+
+    ##
+    #  Internal Functions
+    ##
+
+    def _blockCounts(self, block: QTextBlock) -> T_BlockCounts:
+        """Return the word counts of a block, and cache them in the
+        block's user data.
+        """
+        data = block.userData()
+        if not isinstance(data, TextBlockData):
+            data = TextBlockData()
+            block.setUserData(data)
+        if (counts := data.counts) is None:
+            counts = blockCounter(block.text())
+            data.setCounts(counts)
+        return counts
+
 # END Class GuiTextDocument
@@ -868,6 +868,10 @@ class GuiMainMenu(QMenuBar):
         self.aReplaceNext.setShortcut("Ctrl+Shift+1")
         self.aReplaceNext.triggered.connect(lambda: self.mainGui.docEditor.replaceNext())
 
+        # Search > Replace All
+        self.aReplaceAll = self.srcMenu.addAction(self.tr("Replace All"))
+        self.aReplaceAll.triggered.connect(lambda: self.mainGui.docEditor.replaceAll())
+
         # Search > Separator
         self.srcMenu.addSeparator()
 
@@ -908,6 +912,10 @@ class GuiMainMenu(QMenuBar):
         self.aEditWordList = self.toolsMenu.addAction(self.tr("Project Word List"))
         self.aEditWordList.triggered.connect(self.mainGui.showProjectWordListDialog)
 
+        # Tools > Project Spelling Report
+        self.aSpellReport = self.toolsMenu.addAction(self.tr("Project Spelling Report"))
+        self.aSpellReport.triggered.connect(self.mainGui.showSpellReportDialog)
+
         # Tools > Add Dictionaries
         if CONFIG.osWindows or CONFIG.isDebug:
             self.aAddDicts = self.toolsMenu.addAction(self.tr("Add Dictionaries"))
@@ -990,6 +998,13 @@ class GuiMainMenu(QMenuBar):
         self.aWebsite = self.helpMenu.addAction(self.tr("The novelWriter Website"))
         self.aWebsite.triggered.connect(lambda: self._openWebsite(nwConst.URL_WEB))
 
+        # Help > Separator
+        self.helpMenu.addSeparator()
+
+        # Help > Save Performance Report
+        self.aPerfReport = self.helpMenu.addAction(self.tr("Save Performance Report"))
+        self.aPerfReport.triggered.connect(self.mainGui.savePerformanceReport)
+
         return
 
 # END Class GuiMainMenu
@@ -38,7 +38,7 @@ from PyQt5.QtWidgets import (
     QWidget
 )
 
-from novelwriter import CONFIG, SHARED
+from novelwriter import CONFIG, METRICS, SHARED
 from novelwriter.common import minmax
 from novelwriter.constants import nwHeaders, nwKeyWords, nwLabels, trConst
 from novelwriter.core.index import IndexHeading
@@ -681,8 +681,9 @@ class GuiNovelTree(QTreeWidget):
 
         self.setActiveHandle(self._actHandle)
 
-        logger.debug("Novel Tree built in %.3f ms", (time() - tStart)*1000)
         self._lastBuild = time()
+        METRICS.addTime("tree.novel.build", self._lastBuild - tStart)
+        logger.debug("Novel Tree built in %.3f ms", (self._lastBuild - tStart)*1000)
 
         return
 
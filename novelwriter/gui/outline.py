@@ -40,7 +40,7 @@ from PyQt5.QtWidgets import (
     QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
 )
 
-from novelwriter import CONFIG, SHARED
+from novelwriter import CONFIG, METRICS, SHARED
 from novelwriter.enum import nwDocMode, nwItemClass, nwItemLayout, nwItemType, nwOutline
 from novelwriter.error import logException
 from novelwriter.common import checkInt, formatFileFilter, makeFileNameSafe
@@ -649,6 +649,7 @@ class GuiOutlineTree(QTreeWidget):
 
         return
 
+    @METRICS.timed("tree.outline.build")
     def _populateTree(self, rootHandle: str | None) -> None:
         """Build the tree based on the project index, and the header
         based on the defined constants, default values and user selected
@@ -39,7 +39,7 @@ from PyQt5.QtWidgets import (
     QWidget
 )
 
-from novelwriter import CONFIG, SHARED
+from novelwriter import CONFIG, METRICS, SHARED
 from novelwriter.common import minmax
 from novelwriter.constants import nwHeaders, nwLabels, nwUnicode, trConst
 from novelwriter.core.coretools import DocDuplicator, DocMerger, DocSplitter
@@ -47,7 +47,6 @@ from novelwriter.core.item import NWItem
 from novelwriter.dialogs.docmerge import GuiDocMerge
 from novelwriter.dialogs.docsplit import GuiDocSplit
 from novelwriter.dialogs.editlabel import GuiEditLabel
-from novelwriter.dialogs.projectsettings import GuiProjectSettings
 from novelwriter.enum import nwDocMode, nwItemClass, nwItemLayout, nwItemType
 from novelwriter.extensions.modified import NIconToolButton
 from novelwriter.gui.theme import STYLES_MIN_TOOLBUTTON
@@ -897,10 +896,11 @@ class GuiProjectTree(QTreeWidget):
             return False
 
         logger.debug("Deleting %d file(s) from Trash", nTrash)
-        for tHandle in reversed(self.getTreeFromHandle(trashHandle)):
-            if tHandle == trashHandle:
-                continue
-            self.permDeleteItem(tHandle, askFirst=False, flush=False)
+        with SHARED.indexBatch():
+            for tHandle in reversed(self.getTreeFromHandle(trashHandle)):
+                if tHandle == trashHandle:
+                    continue
+                self.permDeleteItem(tHandle, askFirst=False, flush=False)
 
         if nTrash > 0:
             self._alertTreeChange(trashHandle, flush=True)
@@ -1095,6 +1095,7 @@ class GuiProjectTree(QTreeWidget):
 
         return
 
+    @METRICS.timed("tree.project.build")
     def buildTree(self) -> None:
         """Build the entire project tree from scratch. This depends on
         the save project item iterator in the project class which will
@@ -1321,10 +1322,11 @@ class GuiProjectTree(QTreeWidget):
 
             super().dropEvent(event)
 
-            for mHandle, (sItem, isExpanded) in mItems.items():
-                self._postItemMove(mHandle)
-                sItem.setExpanded(isExpanded)
-                self._alertTreeChange(mHandle, flush=False)
+            with SHARED.indexBatch():
+                for mHandle, (sItem, isExpanded) in mItems.items():
+                    self._postItemMove(mHandle)
+                    sItem.setExpanded(isExpanded)
+                    self._alertTreeChange(mHandle, flush=False)
 
             self.saveTreeOrder()
 
@@ -1343,22 +1345,28 @@ class GuiProjectTree(QTreeWidget):
             logger.error("Failed to find new parent item of '%s'", tHandle)
             return
 
+        # Record the location of the moved items before the move
+        tree = SHARED.project.tree
+        moved = {
+            mHandle: (mItem.itemRoot, not mItem.isInactiveClass())
+            for mHandle in tree.iterSubTree(tHandle) if (mItem := tree[mHandle])
+        }
+
         # Update item parent handle in the project
         pHandle = trItemP.data(self.C_DATA, self.D_HANDLE)
-        nwItemS.setParent(pHandle)
+        tree.setItemParent(tHandle, pHandle)
+        tree.updateSubTree(tHandle)
         trItemP.setExpanded(True)
         logger.debug("The parent of item '%s' has been changed to '%s'", tHandle, pHandle)
 
-        mHandles = self.getTreeFromHandle(tHandle)
-        logger.debug("A total of %d item(s) were moved", len(mHandles))
-        for mHandle in mHandles:
-            logger.debug("Updating item '%s'", mHandle)
-            SHARED.project.tree.updateItemData(mHandle)
-            if nwItemS.isInactiveClass():
-                SHARED.project.index.deleteHandle(mHandle)
-            else:
-                SHARED.project.index.reIndexHandle(mHandle)
-            self.setTreeItemValues(mHandle)
+        logger.debug("A total of %d item(s) were moved", len(moved))
+        scanned = 0
+        with SHARED.indexBatch():
+            for mHandle, (oldRoot, wasActive) in moved.items():
+                logger.debug("Updating item '%s'", mHandle)
+                scanned += SHARED.project.index.updateMovedHandle(mHandle, oldRoot, wasActive)
+                self.setTreeItemValues(mHandle)
+        logger.debug("A total of %d document(s) were re-scanned", scanned)
 
         # Update word count
         self.propagateCount(tHandle, nwItemS.wordCount, countChildren=True)
@@ -1845,6 +1853,7 @@ class _TreeContextMenu(QMenu):
 
     def _itemStatusImport(self, multi: bool) -> None:
         """Add actions for changing status or importance."""
+        from novelwriter.dialogs.projectsettings import GuiProjectSettings  # Loaded on first use
         if self._item.isNovelLike():
             menu = self.addMenu(self.tr("Set Status to ..."))
             current = self._item.itemStatus
@@ -34,10 +34,11 @@ from PyQt5.QtWidgets import (
     QToolBar, QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
 )
 
-from novelwriter import CONFIG, SHARED
+from novelwriter import CONFIG, METRICS, SHARED
 from novelwriter.common import checkInt, cssCol
 from novelwriter.core.coretools import DocSearch
 from novelwriter.core.item import NWItem
+from novelwriter.dialogs.replacepreview import GuiReplacePreview
 from novelwriter.types import QtAlignMiddle, QtAlignRight, QtUserRole
 
 logger = logging.getLogger(__name__)
@@ -106,6 +107,17 @@ class GuiProjectSearch(QWidget):
         )
         self.searchAction.triggered.connect(self._processSearch)
 
+        # Replace Box
+        self.replaceText = QLineEdit(self)
+        self.replaceText.setPlaceholderText(self.tr("Replace with"))
+        self.replaceText.setClearButtonEnabled(True)
+
+        self.replaceAction = self.replaceText.addAction(
+            SHARED.theme.getIcon("search_replace"), QLineEdit.ActionPosition.TrailingPosition
+        )
+        self.replaceAction.setToolTip(self.tr("Replace All"))
+        self.replaceAction.triggered.connect(self._processReplace)
+
         # Search Result
         self.searchResult = QTreeWidget(self)
         self.searchResult.setHeaderHidden(True)
@@ -137,6 +149,7 @@ class GuiProjectSearch(QWidget):
         self.outerBox = QVBoxLayout()
         self.outerBox.addWidget(self.headerWidget, 0)
         self.outerBox.addWidget(self.searchText, 0)
+        self.outerBox.addWidget(self.replaceText, 0)
         self.outerBox.addWidget(self.searchResult, 1)
         self.outerBox.setContentsMargins(0, 0, 0, 0)
         self.outerBox.setSpacing(mPx)
@@ -171,6 +184,7 @@ class GuiProjectSearch(QWidget):
         )
 
         self.searchAction.setIcon(SHARED.theme.getIcon("search"))
+        self.replaceAction.setIcon(SHARED.theme.getIcon("search_replace"))
         self.toggleCase.setIcon(SHARED.theme.getIcon("search_case"))
         self.toggleWord.setIcon(SHARED.theme.getIcon("search_word"))
         self.toggleRegEx.setIcon(SHARED.theme.getIcon("search_regex"))
@@ -205,6 +219,7 @@ class GuiProjectSearch(QWidget):
         """Run close project tasks."""
         self._map = {}
         self.searchText.clear()
+        self.replaceText.clear()
         self.searchResult.clear()
         return
 
@@ -246,7 +261,9 @@ class GuiProjectSearch(QWidget):
             start = time()
             results, capped = self._search.searchText(SHARED.mainGui.docEditor.getText())
             self._displayResultSet(SHARED.project.tree[tHandle], results, capped)
-            logger.debug("Updated search for '%s' in %.3f ms", tHandle, 1000*(time() - start))
+            tTotal = time() - start
+            METRICS.addTime("search.update", tTotal)
+            logger.debug("Updated search for '%s' in %.3f ms", tHandle, 1000*tTotal)
         return
 
     ##
@@ -264,17 +281,62 @@ class GuiProjectSearch(QWidget):
             self._map = {}
             self.searchResult.clear()
             if text := self.searchText.text():
-                self._search.setUserRegEx(self.toggleRegEx.isChecked())
-                self._search.setCaseSensitive(self.toggleCase.isChecked())
-                self._search.setWholeWords(self.toggleWord.isChecked())
+                self._applySearchOptions()
                 for item, results, capped in self._search.iterSearch(SHARED.project, text):
                     self._displayResultSet(item, results, capped)
-            logger.debug("Search took %.3f ms", 1000*(time() - start))
             self._time = time()
+            METRICS.addTime("search.project", self._time - start)
+            logger.debug("Search took %.3f ms", 1000*(self._time - start))
             QApplication.restoreOverrideCursor()
         self._blocked = False
         return
 
+    @pyqtSlot()
+    def _processReplace(self) -> None:
+        """Replace all matches in the project. The new text is built in
+        memory and shown for review before the changed documents are
+        written in one batch.
+        """
+        if self._blocked or not (text := self.searchText.text()):
+            return
+
+        QApplication.setOverrideCursor(QCursor(Qt.CursorShape.WaitCursor))
+        start = time()
+        SHARED.saveDocument()
+        self._applySearchOptions()
+        self._search.setMatchCap(CONFIG.searchMatchCap)
+        project = SHARED.project
+        replacements = list(self._search.iterReplace(project, text, self.replaceText.text()))
+        METRICS.addTime("search.replace.preview", time() - start)
+        QApplication.restoreOverrideCursor()
+
+        if not replacements:
+            SHARED.info(self.tr("No matches found."))
+            return
+        if not GuiReplacePreview.confirmReplace(self, replacements):
+            return
+
+        QApplication.setOverrideCursor(QCursor(Qt.CursorShape.WaitCursor))
+        start = time()
+        written = self._search.writeReplacements(project, replacements)
+        docEditor = SHARED.mainGui.docEditor
+        if docEditor.docHandle in written:
+            docEditor.loadText(docEditor.docHandle)
+        tTotal = time() - start
+        METRICS.addTime("search.replace.write", tTotal)
+        logger.debug("Replace in %d documents took %.3f ms", len(written), 1000*tTotal)
+        QApplication.restoreOverrideCursor()
+
+        if len(written) < len(replacements):
+            SHARED.error(self.tr(
+                "Could not replace text in {0} documents. They may have been "
+                "changed or could not be saved."
+            ).format(len(replacements) - len(written)))
+
+        self._processSearch()
+
+        return
+
     @pyqtSlot()
     def _searchResultSelected(self) -> None:
         """Process search result selection."""
@@ -316,6 +378,13 @@ class GuiProjectSearch(QWidget):
     #  Internal Functions
     ##
 
+    def _applySearchOptions(self) -> None:
+        """Pass the toolbar options to the search object."""
+        self._search.setUserRegEx(self.toggleRegEx.isChecked())
+        self._search.setCaseSensitive(self.toggleCase.isChecked())
+        self._search.setWholeWords(self.toggleWord.isChecked())
+        return
+
     def _displayResultSet(
         self, nwItem: NWItem | None, results: list[tuple[int, int, str]], capped: bool
     ) -> None:
@@ -30,20 +30,16 @@ from datetime import datetime
 from pathlib import Path
 from time import time
 
-from PyQt5.QtCore import Qt, QTimer, pyqtSlot
+from PyQt5.QtCore import Qt, QThreadPool, QTimer, pyqtSlot
 from PyQt5.QtGui import QCloseEvent, QCursor, QIcon
 from PyQt5.QtWidgets import (
     QApplication, QFileDialog, QHBoxLayout, QMainWindow, QMessageBox,
     QShortcut, QSplitter, QStackedWidget, QVBoxLayout, QWidget
 )
 
-from novelwriter import CONFIG, SHARED, __hexversion__, __version__
+from novelwriter import CONFIG, METRICS, SHARED, __hexversion__, __version__
 from novelwriter.common import formatFileFilter, formatVersion, hexToInt
 from novelwriter.constants import nwConst
-from novelwriter.dialogs.about import GuiAbout
-from novelwriter.dialogs.preferences import GuiPreferences
-from novelwriter.dialogs.projectsettings import GuiProjectSettings
-from novelwriter.dialogs.wordlist import GuiWordList
 from novelwriter.enum import nwDocAction, nwDocInsert, nwDocMode, nwItemType, nwView, nwWidget
 from novelwriter.gui.doceditor import GuiDocEditor
 from novelwriter.gui.docviewer import GuiDocViewer
@@ -57,11 +53,6 @@ from novelwriter.gui.search import GuiProjectSearch
 from novelwriter.gui.sidebar import GuiSideBar
 from novelwriter.gui.statusbar import GuiMainStatus
 from novelwriter.gui.theme import GuiTheme
-from novelwriter.tools.dictionaries import GuiDictionaries
-from novelwriter.tools.manuscript import GuiManuscript
-from novelwriter.tools.noveldetails import GuiNovelDetails
-from novelwriter.tools.welcome import GuiWelcome
-from novelwriter.tools.writingstats import GuiWritingStats
 
 logger = logging.getLogger(__name__)
 
@@ -215,6 +206,7 @@ class GuiMain(QMainWindow):
         SHARED.spellLanguageChanged.connect(self.mainStatus.setLanguage)
         SHARED.focusModeChanged.connect(self._focusModeChanged)
         SHARED.indexChangedTags.connect(self.docViewerPanel.updateChangedTags)
+        SHARED.indexChangedTags.connect(self.docEditor.updateChangedTags)
         SHARED.indexScannedText.connect(self.docViewerPanel.projectItemChanged)
         SHARED.indexScannedText.connect(self.projView.updateItemValues)
         SHARED.indexScannedText.connect(self.itemDetails.updateViewBox)
@@ -761,9 +753,14 @@ class GuiMain(QMainWindow):
     #  Main Dialogs
     ##
 
+    # The dialog and tool modules are imported on first use, as they
+    # are not needed to start the application, and some of them pull
+    # in large dependencies like the document builders
+
     @pyqtSlot()
     def showWelcomeDialog(self) -> None:
         """Open the welcome dialog."""
+        from novelwriter.tools.welcome import GuiWelcome
         dialog = GuiWelcome(self)
         dialog.openProjectRequest.connect(self._openProjectFromWelcome)
         dialog.exec()
@@ -772,6 +769,7 @@ class GuiMain(QMainWindow):
     @pyqtSlot()
     def showPreferencesDialog(self) -> None:
         """Open the preferences dialog."""
+        from novelwriter.dialogs.preferences import GuiPreferences
         dialog = GuiPreferences(self)
         dialog.newPreferencesReady.connect(self._processConfigChanges)
         dialog.exec()
@@ -779,9 +777,12 @@ class GuiMain(QMainWindow):
 
     @pyqtSlot()
     @pyqtSlot(int)
-    def showProjectSettingsDialog(self, focusTab: int = GuiProjectSettings.PAGE_SETTINGS) -> None:
-        """Open the project settings dialog."""
+    def showProjectSettingsDialog(self, focusTab: int = 0) -> None:
+        """Open the project settings dialog. The focus tab is one of
+        the GuiProjectSettings.PAGE_* values.
+        """
         if SHARED.hasProject:
+            from novelwriter.dialogs.projectsettings import GuiProjectSettings
             dialog = GuiProjectSettings(self, gotoPage=focusTab)
             dialog.newProjectSettingsReady.connect(self._processProjectSettingsChanges)
             dialog.exec()
@@ -791,6 +792,7 @@ class GuiMain(QMainWindow):
     def showNovelDetailsDialog(self) -> None:
         """Open the novel details dialog."""
         if SHARED.hasProject:
+            from novelwriter.tools.noveldetails import GuiNovelDetails
             dialog = GuiNovelDetails(self)
             dialog.activateDialog()
             dialog.updateValues()
@@ -800,6 +802,7 @@ class GuiMain(QMainWindow):
     def showBuildManuscriptDialog(self) -> None:
         """Open the build manuscript dialog."""
         if SHARED.hasProject:
+            from novelwriter.tools.manuscript import GuiManuscript
             if (dialog := SHARED.findTopLevelWidget(GuiManuscript)) is None:
                 dialog = GuiManuscript(self)
             dialog.activateDialog()
@@ -810,15 +813,28 @@ class GuiMain(QMainWindow):
     def showProjectWordListDialog(self) -> None:
         """Open the project word list dialog."""
         if SHARED.hasProject:
+            from novelwriter.dialogs.wordlist import GuiWordList
             dialog = GuiWordList(self)
             dialog.newWordListReady.connect(self._processWordListChanges)
             dialog.exec()
         return
 
+    @pyqtSlot()
+    def showSpellReportDialog(self) -> None:
+        """Open the project spelling report tool."""
+        if SHARED.hasProject:
+            from novelwriter.tools.spellreport import GuiSpellReport
+            if (dialog := SHARED.findTopLevelWidget(GuiSpellReport)) is None:
+                dialog = GuiSpellReport(self)
+            dialog.activateDialog()
+            dialog.runSpellCheck()
+        return
+
     @pyqtSlot()
     def showWritingStatsDialog(self) -> None:
         """Open the session stats dialog."""
         if SHARED.hasProject:
+            from novelwriter.tools.writingstats import GuiWritingStats
             if (dialog := SHARED.findTopLevelWidget(GuiWritingStats)) is None:
                 dialog = GuiWritingStats(self)
             dialog.activateDialog()
@@ -828,6 +844,7 @@ class GuiMain(QMainWindow):
     @pyqtSlot()
     def showAboutNWDialog(self) -> None:
         """Show the novelWriter about dialog."""
+        from novelwriter.dialogs.about import GuiAbout
         dialog = GuiAbout(self)
         dialog.activateDialog()
         dialog.populateGUI()
@@ -843,6 +860,7 @@ class GuiMain(QMainWindow):
     @pyqtSlot()
     def showDictionariesDialog(self) -> None:
         """Show the download dictionaries dialog."""
+        from novelwriter.tools.dictionaries import GuiDictionaries
         dialog = GuiDictionaries(self)
         dialog.activateDialog()
         if not dialog.initDialog():
@@ -850,6 +868,20 @@ class GuiMain(QMainWindow):
             SHARED.error(self.tr("Could not initialise the dialog."))
         return
 
+    @pyqtSlot()
+    def savePerformanceReport(self) -> None:
+        """Save the collected performance metrics to a JSON file."""
+        path = CONFIG.lastPath() / "novelWriter-performance.json"
+        path, _ = QFileDialog.getSaveFileName(
+            self, self.tr("Save Performance Report"), str(path),
+            formatFileFilter(["*.json", "*"])
+        )
+        if path:
+            CONFIG.setLastPath(path)
+            if not METRICS.saveReport(path):
+                SHARED.error(self.tr("Could not save the performance report."))
+        return
+
     def reportConfErr(self) -> None:
         """Checks if the Config module has any errors to report, and let
         the user know if this is the case. The Config module caches
@@ -893,6 +925,9 @@ class GuiMain(QMainWindow):
         CONFIG.saveConfig()
         self.reportConfErr()
 
+        # Let any background backup finish before exiting
+        QThreadPool.globalInstance().waitForDone()
+
         QApplication.quit()
 
         return True
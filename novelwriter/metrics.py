@@ -0,0 +1,384 @@
+"""
+novelWriter – Performance Metrics
+=================================
+
+File History:
+Created: 2024-05-02 [2.5a3] Metrics, MetricsTimer
+Created: 2024-05-11 [2.5a3] ImportTracker
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import builtins
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import tracemalloc
+
+from bisect import bisect_left
+from collections.abc import Callable
+from functools import wraps
+from pathlib import Path
+from time import perf_counter, time
+from typing import Any, TypeVar
+
+from novelwriter.common import formatTimeStamp
+
+logger = logging.getLogger(__name__)
+
+T_Func = TypeVar("T_Func", bound=Callable[..., Any])
+
+# Histogram bucket upper bounds in a 1-2-5 sequence from 0.01 to 1e6
+BUCKETS = tuple(m*10.0**e for e in range(-2, 7) for m in (1, 2, 5))
+
+REPORT_LINES = 50  # Number of entries in profiling reports
+
+
+class _Stats:
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0]*(len(BUCKETS) + 1)
+        return
+
+    def add(self, value: float) -> None:
+        """Add a value to the statistics."""
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.buckets[bisect_left(BUCKETS, value)] += 1
+        return
+
+    def pack(self) -> dict:
+        """Pack the statistics into a dictionary."""
+        histogram = {}
+        for i, n in enumerate(self.buckets):
+            if n > 0:
+                histogram[f"<={BUCKETS[i]:g}" if i < len(BUCKETS) else "inf"] = n
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.total/self.count, 6) if self.count else 0.0,
+            "min": round(self.min, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            "histogram": histogram,
+        }
+
+# END Class _Stats
+
+
+class MetricsTimer:
+    """Context manager that records the time spent in its block. The
+    elapsed time in seconds is available after the block exits.
+    """
+
+    __slots__ = ("_metrics", "_name", "_start", "elapsed")
+
+    def __init__(self, metrics: Metrics, name: str) -> None:
+        self._metrics = metrics
+        self._name = name
+        self._start = 0.0
+        self.elapsed = 0.0
+        return
+
+    def __enter__(self) -> MetricsTimer:
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.elapsed = perf_counter() - self._start
+        self._metrics.addTime(self._name, self.elapsed)
+        return
+
+# END Class MetricsTimer
+
+
+class ImportTracker:
+    """Context manager that records the import time of each module
+    imported for the first time in its block. The recorded times are
+    cumulative, that is, they include the modules imported by the
+    module itself.
+    """
+
+    __slots__ = ("_metrics", "_import", "modules")
+
+    def __init__(self, metrics: Metrics) -> None:
+        self._metrics = metrics
+        self._import = builtins.__import__
+        self.modules: dict[str, float] = {}
+        return
+
+    def __enter__(self) -> ImportTracker:
+        self._import = builtins.__import__
+        builtins.__import__ = self._trackImport
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        builtins.__import__ = self._import
+        return
+
+    def _trackImport(
+        self, name: str, globals: Any = None, locals: Any = None,
+        fromlist: Any = (), level: int = 0
+    ) -> Any:
+        """Time the import, if the module is not already loaded."""
+        if level or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        start = perf_counter()
+        module = self._import(name, globals, locals, fromlist, level)
+        elapsed = perf_counter() - start
+        self.modules[name] = elapsed
+        self._metrics.addTime(f"startup.import.{name}", elapsed)
+        return module
+
+# END Class ImportTracker
+
+
+class Metrics:
+    """Performance Metrics
+
+    A lightweight collection of named timers, counters and histograms
+    for the hot paths of the application. Timers are recorded in
+    milliseconds. The collected data can be written to a JSON report.
+
+    The class also handles the opt-in profiling modes from the command
+    line, which record cProfile stats for the session and tracemalloc
+    snapshots at key points.
+    """
+
+    def __init__(self) -> None:
+        self._timers: dict[str, _Stats] = {}
+        self._counters: dict[str, int] = {}
+        self._histograms: dict[str, _Stats] = {}
+        self._started = time()
+        self._launched = perf_counter()
+
+        # Profiling
+        self._profPath: Path | None = None
+        self._profiler: cProfile.Profile | None = None
+        self._lastSnap: tracemalloc.Snapshot | None = None
+        self._snapCount = 0
+
+        return
+
+    @property
+    def profilePath(self) -> Path | None:
+        """The folder profiling reports are written to, if active."""
+        return self._profPath
+
+    ##
+    #  Methods
+    ##
+
+    def timer(self, name: str) -> MetricsTimer:
+        """Return a context manager that times its block."""
+        return MetricsTimer(self, name)
+
+    def trackImports(self) -> ImportTracker:
+        """Return a context manager that records the import time of
+        each module first imported in its block.
+        """
+        return ImportTracker(self)
+
+    def markStartup(self, label: str) -> float:
+        """Record the time since the application was launched under a
+        startup label, and return it in seconds.
+        """
+        elapsed = perf_counter() - self._launched
+        self.addTime(f"startup.{label}", elapsed)
+        logger.info("Startup: %s after %.1f ms", label, 1000.0*elapsed)
+        return elapsed
+
+    def timed(self, name: str) -> Callable[[T_Func], T_Func]:
+        """Decorator that times every call to a function."""
+        def decorator(func: T_Func) -> T_Func:
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.addTime(name, perf_counter() - start)
+            return wrapper  # type: ignore
+        return decorator
+
+    def addTime(self, name: str, seconds: float) -> None:
+        """Add a time measurement in seconds to a timer."""
+        if (stats := self._timers.get(name)) is None:
+            stats = self._timers[name] = _Stats()
+        stats.add(1000.0*seconds)
+        return
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increment a counter."""
+        self._counters[name] = self._counters.get(name, 0) + value
+        return
+
+    def sample(self, name: str, value: float) -> None:
+        """Add a value to a histogram."""
+        if (stats := self._histograms.get(name)) is None:
+            stats = self._histograms[name] = _Stats()
+        stats.add(value)
+        return
+
+    def clear(self) -> None:
+        """Clear all recorded data."""
+        self._timers.clear()
+        self._counters.clear()
+        self._histograms.clear()
+        self._started = time()
+        return
+
+    def report(self) -> dict:
+        """Return all recorded data as a dictionary."""
+        return {
+            "started": formatTimeStamp(self._started),
+            "duration": round(time() - self._started, 3),
+            "timers": {k: v.pack() for k, v in sorted(self._timers.items())},
+            "counters": dict(sorted(self._counters.items())),
+            "histograms": {k: v.pack() for k, v in sorted(self._histograms.items())},
+        }
+
+    def saveReport(self, path: str | Path) -> bool:
+        """Write the report to a JSON file."""
+        try:
+            with open(path, mode="w", encoding="utf-8") as fObj:
+                json.dump(self.report(), fObj, indent=2)
+            logger.info("Wrote performance report: %s", path)
+        except Exception:
+            logger.error("Failed to write performance report: %s", path)
+            return False
+        return True
+
+    ##
+    #  Profiling
+    ##
+
+    def startProfiling(self, path: str | Path, profile: bool = False, trace: bool = False) -> bool:
+        """Start profiling the session. The reports are written to a
+        new sub-folder of path named after the session start time.
+        """
+        if self._profPath is not None:
+            logger.warning("Profiling is already running")
+            return False
+
+        sessPath = Path(path) / formatTimeStamp(time(), fileSafe=True)
+        try:
+            sessPath.mkdir(parents=True, exist_ok=True)
+        except Exception:
+            logger.error("Could not create profiling folder: %s", sessPath)
+            return False
+
+        self._profPath = sessPath
+        self._lastSnap = None
+        self._snapCount = 0
+        if profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            logger.info("Started cProfile recording")
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            logger.info("Started tracemalloc recording")
+
+        logger.info("Profiling reports will be written to: %s", sessPath)
+
+        return True
+
+    def memorySnapshot(self, label: str) -> None:
+        """Write the top allocation sites to a report file, if the
+        tracemalloc mode is active. The report also lists the largest
+        changes since the previous snapshot.
+        """
+        if self._profPath is None or not tracemalloc.is_tracing():
+            return
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines = [
+            f"Snapshot: {label}",
+            f"Time: {formatTimeStamp(time())}",
+            f"Traced Memory: {current/1024:.1f} KiB (peak {peak/1024:.1f} KiB)",
+            "",
+            "Top Allocation Sites",
+            "",
+        ]
+        lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:REPORT_LINES])
+        if self._lastSnap is not None:
+            lines.extend(["", "Largest Changes Since Last Snapshot", ""])
+            lines.extend(
+                str(stat) for stat in snapshot.compare_to(self._lastSnap, "lineno")[:REPORT_LINES]
+            )
+
+        self._lastSnap = snapshot
+        self._snapCount += 1
+        self._writeProfileFile(f"memory-{self._snapCount:03d}-{label}.txt", "\n".join(lines))
+
+        return
+
+    def stopProfiling(self) -> None:
+        """Stop profiling and write the session reports."""
+        if self._profPath is None:
+            return
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            try:
+                self._profiler.dump_stats(self._profPath / "profile.prof")
+            except Exception:
+                logger.error("Failed to write cProfile stats")
+            for sort in ("cumulative", "tottime"):
+                stream = io.StringIO()
+                stats = pstats.Stats(self._profiler, stream=stream)
+                stats.sort_stats(sort).print_stats(REPORT_LINES)
+                self._writeProfileFile(f"profile-{sort}.txt", stream.getvalue())
+            self._profiler = None
+
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._lastSnap = None
+
+        self.saveReport(self._profPath / "metrics.json")
+        logger.info("Profiling reports written to: %s", self._profPath)
+        self._profPath = None
+
+        return
+
+    ##
+    #  Internal Functions
+    ##
+
+    def _writeProfileFile(self, name: str, text: str) -> None:
+        """Write a text file to the profiling folder."""
+        if self._profPath is not None:
+            try:
+                (self._profPath / name).write_text(text, encoding="utf-8")
+            except Exception:
+                logger.error("Failed to write profiling report: %s", name)
+        return
+
+# END Class Metrics
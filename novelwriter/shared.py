@@ -5,6 +5,7 @@ novelWriter – Shared Data Class
 File History:
 Created: 2023-08-10 [2.1rc1] SharedData
 Created: 2023-08-14 [2.1rc1] _GuiAlert
+Created: 2024-05-13 [2.5a3] _IndexChanges
 
 This file is a part of novelWriter
 Copyright 2018–2024, Veronica Berglyd Olsen
@@ -26,6 +27,8 @@ from __future__ import annotations
 
 import logging
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from time import time
 from typing import TYPE_CHECKING, TypeVar
@@ -51,7 +54,7 @@ class SharedData(QObject):
 
     __slots__ = (
         "_gui", "_theme", "_project", "_spelling", "_lockedBy", "_lastAlert",
-        "_idleTime", "_idleRefTime",
+        "_idleTime", "_idleRefTime", "_indexDepth", "_indexChanges",
     )
 
     projectStatusChanged = pyqtSignal(bool)
@@ -84,6 +87,10 @@ class SharedData(QObject):
         self._clock.setInterval(1000)
         self._clock.timeout.connect(lambda: self.mainClockTick.emit())
 
+        # Index Events
+        self._indexDepth = 0
+        self._indexChanges = _IndexChanges()
+
         return
 
     ##
@@ -279,17 +286,37 @@ class SharedData(QObject):
     ##
 
     def indexSignalProxy(self, data: dict) -> None:
-        """Emit signals on behalf of the index."""
+        """Emit signals on behalf of the index. Inside an index batch,
+        the events are collected and emitted when the batch ends.
+        """
         event = data.get("event")
         logger.debug("Received '%s' event from the index", event)
+        changes = self._indexChanges
         if event == "updateTags":
-            self.indexChangedTags.emit(data.get("updated", []), data.get("deleted", []))
+            changes.addTags(data.get("updated", []), data.get("deleted", []))
         elif event == "scanText":
-            self.indexScannedText.emit(data.get("handle", ""))
+            changes.scanned[data.get("handle", "")] = None
         elif event == "clearIndex":
-            self.indexCleared.emit()
+            changes.clear()
+            changes.cleared = True
         elif event == "buildIndex":
-            self.indexAvailable.emit()
+            changes.available = True
+        if self._indexDepth == 0:
+            self._emitIndexChanges()
+        return
+
+    @contextmanager
+    def indexBatch(self) -> Iterator[None]:
+        """Collect the index events inside the block, and emit them as
+        one merged change set when the outermost batch ends.
+        """
+        self._indexDepth += 1
+        try:
+            yield
+        finally:
+            self._indexDepth -= 1
+            if self._indexDepth == 0:
+                self._emitIndexChanges()
         return
 
     ##
@@ -350,6 +377,20 @@ class SharedData(QObject):
     #  Internal Functions
     ##
 
+    def _emitIndexChanges(self) -> None:
+        """Emit the collected index events."""
+        changes = self._indexChanges
+        self._indexChanges = _IndexChanges()
+        if changes.cleared:
+            self.indexCleared.emit()
+        if changes.updated or changes.deleted:
+            self.indexChangedTags.emit(list(changes.updated), list(changes.deleted))
+        for tHandle in changes.scanned:
+            self.indexScannedText.emit(tHandle)
+        if changes.available:
+            self.indexAvailable.emit()
+        return
+
     def _resetProject(self) -> None:
         """Create a new project and spell checking instance."""
         from novelwriter.core.project import NWProject
@@ -379,6 +420,40 @@ class SharedData(QObject):
 # END Class SharedData
 
 
+class _IndexChanges:
+    """A merged set of index events. A tag that is deleted and then
+    updated again is only listed as updated, and vice versa. Clearing
+    the index drops the changes recorded before it.
+    """
+
+    __slots__ = ("cleared", "available", "updated", "deleted", "scanned")
+
+    def __init__(self) -> None:
+        self.clear()
+        self.cleared = False
+        self.available = False
+        return
+
+    def clear(self) -> None:
+        """Drop all tag and text changes."""
+        self.updated: dict[str, None] = {}
+        self.deleted: dict[str, None] = {}
+        self.scanned: dict[str, None] = {}
+        return
+
+    def addTags(self, updated: list[str], deleted: list[str]) -> None:
+        """Merge a set of tag changes."""
+        for tag in deleted:
+            self.updated.pop(tag, None)
+            self.deleted[tag] = None
+        for tag in updated:
+            self.deleted.pop(tag, None)
+            self.updated[tag] = None
+        return
+
+# END Class _IndexChanges
+
+
 class _GuiAlert(QMessageBox):
 
     INFO = 0
@@ -6,6 +6,7 @@ File History:
 Created:   2019-04-22 [0.0.1] standardCounter
 Rewritten: 2024-02-27 [2.4b1] preProcessText, standardCounter
 Created:   2024-02-27 [2.4b1] bodyTextCounter
+Created:   2024-05-14 [2.5a3] blockCounter, sumBlockCounts
 
 This file is a part of novelWriter
 Copyright 2018–2024, Veronica Berglyd Olsen
@@ -27,11 +28,17 @@ from __future__ import annotations
 
 import re
 
+from collections.abc import Iterable
+
 from novelwriter.constants import nwRegEx, nwUnicode
 
 RX_SC = re.compile(nwRegEx.FMT_SC)
 RX_LO = re.compile(r"(?i)(?<!\\)(\[(?:vspace|newpage|new page)(:\d+)?)(?<!\\)(\])")
 
+HEADINGS = ("#### ", "### ", "## ", "# ", "#! ", "##! ", "###! ")
+
+T_BlockCounts = tuple[int, int, int, int, int]
+
 
 def preProcessText(text: str, keepHeaders: bool = True) -> list[str]:
     """Strip formatting codes from the text and split into lines."""
@@ -89,27 +96,7 @@ def standardCounter(text: str) -> tuple[int, int, int]:
             continue
 
         if line[0] == "#":
-            if line[:5] == "#### ":
-                line = line[5:]
-                countPara = False
-            elif line[:4] == "### ":
-                line = line[4:]
-                countPara = False
-            elif line[:3] == "## ":
-                line = line[3:]
-                countPara = False
-            elif line[:2] == "# ":
-                line = line[2:]
-                countPara = False
-            elif line[:3] == "#! ":
-                line = line[3:]
-                countPara = False
-            elif line[:4] == "##! ":
-                line = line[4:]
-                countPara = False
-            elif line[:5] == "###! ":
-                line = line[5:]
-                countPara = False
+            line, countPara = _stripHeading(line)
 
         wCount += len(line.split())
         cCount += len(line)
@@ -121,6 +108,63 @@ def standardCounter(text: str) -> tuple[int, int, int]:
     return cCount, wCount, pCount
 
 
+def blockCounter(text: str) -> T_BlockCounts:
+    """Count a single text block for the standard counter. The counts
+    of consecutive blocks are added up by sumBlockCounts.
+
+    The paragraph count assumes that the block follows a non-empty
+    line. The fourth value is 1 if the block starts a paragraph when
+    it follows an empty line. The last value is 1 if the block ends
+    like an empty line, 0 if not, and -1 if it has no counted lines.
+    """
+    cCount = 0
+    wCount = 0
+    pCount = 0
+    pLead = 0
+    state = -1
+
+    for line in preProcessText(text) if text else [""]:
+
+        countPara = True
+        if not line:
+            state = 1
+            continue
+
+        if line[0] == "#":
+            line, countPara = _stripHeading(line)
+
+        wCount += len(line.split())
+        cCount += len(line)
+        if countPara:
+            if state < 0:
+                pLead = 1
+            elif state > 0:
+                pCount += 1
+
+        state = 0 if countPara else 1
+
+    return cCount, wCount, pCount, pLead, state
+
+
+def sumBlockCounts(counts: Iterable[T_BlockCounts]) -> tuple[int, int, int]:
+    """Add up the counts of consecutive text blocks. The result is the
+    same as the standardCounter of the full text.
+    """
+    cCount = 0
+    wCount = 0
+    pCount = 0
+    prevEmpty = True
+
+    for cC, wC, pC, pLead, state in counts:
+        cCount += cC
+        wCount += wC
+        pCount += pC + pLead if prevEmpty else pC
+        if state >= 0:
+            prevEmpty = state > 0
+
+    return cCount, wCount, pCount
+
+
 def bodyTextCounter(text: str) -> tuple[int, int, int]:
     """A counter that counts body text words, characters, and characters
     without white spaces.
@@ -136,3 +180,13 @@ def bodyTextCounter(text: str) -> tuple[int, int, int]:
         sCount += len("".join(words))
 
     return wCount, cCount, sCount
+
+
+def _stripHeading(line: str) -> tuple[str, bool]:
+    """Strip the heading markup from a line, and return the line and
+    whether it counts as a paragraph.
+    """
+    for prefix in HEADINGS:
+        if line.startswith(prefix):
+            return line[len(prefix):], False
+    return line, True
@@ -26,12 +26,16 @@ from __future__ import annotations
 import json
 import logging
 
+from bisect import bisect_right
 from datetime import datetime
+from pathlib import Path
 from time import time
 from typing import TYPE_CHECKING
 
-from PyQt5.QtCore import Qt, QTimer, QUrl, pyqtSignal, pyqtSlot
-from PyQt5.QtGui import QCloseEvent, QColor, QCursor, QFont, QPalette, QResizeEvent
+from PyQt5.QtCore import QPoint, Qt, QTimer, QUrl, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import (
+    QCloseEvent, QColor, QCursor, QFont, QPalette, QResizeEvent, QTextCursor
+)
 from PyQt5.QtPrintSupport import QPrinter, QPrintPreviewDialog
 from PyQt5.QtWidgets import (
     QAbstractItemView, QApplication, QFormLayout, QGridLayout, QHBoxLayout,
@@ -250,19 +254,10 @@ class GuiManuscript(NToolDialog):
         if selected in self._buildMap:
             self.buildList.setCurrentItem(self._buildMap[selected])
 
-        logger.debug("Loading build cache")
-        cache = CONFIG.dataPath("cache") / f"build_{SHARED.project.data.uuid}.json"
-        if cache.is_file():
-            try:
-                with open(cache, mode="r", encoding="utf-8") as fObj:
-                    data = json.load(fObj)
-                build = self._builds.getBuild(data.get("uuid", ""))
-                if isinstance(build, BuildSettings):
-                    self._updatePreview(data, build)
-            except Exception:
-                logger.error("Failed to load build cache")
-                logException()
-                return
+        data = self._loadBuildCache()
+        build = self._builds.getBuild(data.get("uuid", ""))
+        if isinstance(build, BuildSettings):
+            self._updatePreview(data, build)
 
         return
 
@@ -345,6 +340,11 @@ class GuiManuscript(NToolDialog):
         docBuild.setPreviewMode(True)
         docBuild.queueAll()
 
+        previous = self._loadBuildCache()
+        if previous.get("uuid") == build.buildID:
+            docBuild.setPreviewCache(previous)
+        del previous
+
         self.docPreview.beginNewBuild(len(docBuild))
         for step, _ in docBuild.iterBuildHTML(None):
             self.docPreview.buildStep(step + 1)
@@ -359,15 +359,15 @@ class GuiManuscript(NToolDialog):
             "outline": buildObj.textOutline,
             "styles": buildObj.getStyleSheet(),
             "html": buildObj.fullHTML,
+            "fragments": docBuild.previewCache,
         }
 
         self._updatePreview(result, build)
 
         logger.debug("Saving build cache")
-        cache = CONFIG.dataPath("cache") / f"build_{SHARED.project.data.uuid}.json"
         try:
-            with open(cache, mode="w+", encoding="utf-8") as outFile:
-                outFile.write(json.dumps(result, indent=2))
+            with open(self._buildCachePath(), mode="w+", encoding="utf-8") as outFile:
+                outFile.write(json.dumps(result, separators=(",", ":")))
         except Exception:
             logger.error("Failed to save build cache")
             logException()
@@ -415,6 +415,25 @@ class GuiManuscript(NToolDialog):
         self.buildOutline.updateOutline(data.get("outline", {}))
         return
 
+    def _buildCachePath(self) -> Path:
+        """Return the path to the preview build cache file."""
+        return CONFIG.dataPath("cache") / f"build_{SHARED.project.data.uuid}.json"
+
+    def _loadBuildCache(self) -> dict:
+        """Load the result of the last preview build, if it exists."""
+        cache = self._buildCachePath()
+        if cache.is_file():
+            logger.debug("Loading build cache")
+            try:
+                with open(cache, mode="r", encoding="utf-8") as fObj:
+                    data = json.load(fObj)
+                if isinstance(data, dict):
+                    return data
+            except Exception:
+                logger.error("Failed to load build cache")
+                logException()
+        return {}
+
     def _getSelectedBuild(self) -> BuildSettings | None:
         """Get the currently selected build. If none are selected,
         automatically select the first one.
@@ -739,12 +758,20 @@ class _OutlineWidget(QWidget):
 
 class _PreviewWidget(QTextBrowser):
 
+    CHUNK_SIZE = 250000  # Approximate size of each chunk of HTML loaded
+
     def __init__(self, parent: QWidget) -> None:
         super().__init__(parent=parent)
 
         self._docTime = 0
         self._buildName = ""
         self._scrollPos = 0
+        self._scrollIndex = 0
+        self._restoreScroll = False
+        self._html: list[str] = []
+        self._loaded = 0
+        self._chunks: list[int] = []  # Document position of each chunk
+        self._chunkEnds: list[int] = []  # Fragment index after each chunk
 
         # Document Setup
         dPalette = self.palette()
@@ -763,6 +790,8 @@ class _PreviewWidget(QTextBrowser):
         ))
 
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        self.verticalScrollBar().valueChanged.connect(self._checkLoadMore)
+        self.verticalScrollBar().rangeChanged.connect(self._checkLoadMore)
 
         # Document Age
         aPalette = self.palette()
@@ -842,6 +871,12 @@ class _PreviewWidget(QTextBrowser):
         self.buildProgress.setCentreText(None)
         self.buildProgress.setVisible(True)
         self._scrollPos = self.verticalScrollBar().value()
+        self._scrollIndex = self._fragmentAt(QPoint(0, self.viewport().height()))
+        self._restoreScroll = False
+        self._html = []
+        self._loaded = 0
+        self._chunks = []
+        self._chunkEnds = []
         self.setPlaceholderText("")
         self.clear()
         return
@@ -862,13 +897,15 @@ class _PreviewWidget(QTextBrowser):
         styles = "\n".join(data.get("styles", []))
         self.document().setDefaultStyleSheet(styles)
 
-        html = "".join(data.get("html", []))
-        html = html.replace("\t", "!!tab!!")
-        self.setHtml(html)
-        QApplication.processEvents()
-        while self.find("!!tab!!"):
-            cursor = self.textCursor()
-            cursor.insertText("\t")
+        # Only the first chunk of the document is loaded here, extended
+        # to cover the previous scroll position. The rest is loaded when
+        # it is scrolled into view, navigated to, or when the document
+        # is printed.
+        self._html = [str(x) for x in data.get("html", [])]
+        self._loaded = 0
+        self._chunks = []
+        self._chunkEnds = []
+        self._loadChunks(self._scrollIndex)
 
         self._docTime = checkInt(data.get("time"), 0)
         self._updateBuildAge()
@@ -902,6 +939,7 @@ class _PreviewWidget(QTextBrowser):
     def printPreview(self, printer: QPrinter) -> None:
         """Connect the print preview painter to the document viewer."""
         QApplication.setOverrideCursor(QCursor(Qt.CursorShape.WaitCursor))
+        self._loadChunks(len(self._html) - 1)
         printer.setOrientation(QPrinter.Orientation.Portrait)
         self.document().print(printer)
         QApplication.restoreOverrideCursor()
@@ -911,6 +949,11 @@ class _PreviewWidget(QTextBrowser):
     def navigateTo(self, anchor: str) -> None:
         """Go to a specific #link in the document."""
         logger.debug("Moving to anchor '#%s'", anchor)
+        target = f"name='{anchor}'"
+        for i in range(self._loaded, len(self._html)):
+            if target in self._html[i]:
+                self._loadChunks(i)
+                break
         self.setSource(QUrl(f"#{anchor}"))
         return
 
@@ -938,13 +981,80 @@ class _PreviewWidget(QTextBrowser):
     def _postUpdate(self) -> None:
         """Run tasks after content update."""
         self.buildProgress.setVisible(False)
-        self.verticalScrollBar().setValue(self._scrollPos)
+        self._restoreScroll = True
+        self._checkLoadMore()
+        return
+
+    @pyqtSlot()
+    def _checkLoadMore(self) -> None:
+        """Load more of the document when the end of the loaded content
+        is getting close to the viewport. After a rebuild, the previous
+        scroll position is restored once the layout has grown to reach
+        it, unless the user has scrolled in the meantime.
+        """
+        vBar = self.verticalScrollBar()
+        if self._restoreScroll:
+            if vBar.maximum() >= self._scrollPos:
+                self._restoreScroll = False
+                vBar.setValue(self._scrollPos)
+            elif vBar.value() > 0:
+                self._restoreScroll = False
+        if self._loaded < len(self._html) and vBar.value() >= vBar.maximum() - 2*vBar.pageStep():
+            self._loadChunks()
         return
 
     ##
     #  Internal Functions
     ##
 
+    def _loadChunks(self, index: int = 0) -> None:
+        """Append the next chunk of HTML fragments to the document. The
+        chunk is extended to include the fragment at index, if needed.
+        """
+        total = len(self._html)
+        if self._loaded >= total:
+            return
+
+        size = 0
+        first = self._loaded
+        last = first
+        while last < total and (size < self.CHUNK_SIZE or last <= index):
+            size += len(self._html[last])
+            last += 1
+
+        html = "".join(self._html[first:last]).replace("\t", "!!tab!!")
+        if first == 0:
+            self.setHtml(html)
+            start = 0
+        else:
+            cursor = QTextCursor(self.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertBlock()
+            start = cursor.position()
+            cursor.insertHtml(html)
+
+        document = self.document()
+        cursor = document.find("!!tab!!", start)
+        while not cursor.isNull():
+            cursor.insertText("\t")
+            cursor = document.find("!!tab!!", cursor)
+
+        self._loaded = last
+        self._chunks.append(start)
+        self._chunkEnds.append(last)
+        logger.debug("Loaded preview fragments %d to %d of %d", first + 1, last, total)
+
+        return
+
+    def _fragmentAt(self, point: QPoint) -> int:
+        """Return the index of the last fragment of the chunk shown at a
+        point in the viewport.
+        """
+        if not self._chunks:
+            return 0
+        position = self.cursorForPosition(point).position()
+        return self._chunkEnds[max(bisect_right(self._chunks, position) - 1, 0)] - 1
+
     def _updateDocMargins(self) -> None:
         """Automatically adjust the header to fill the top of the
         document within the viewport.
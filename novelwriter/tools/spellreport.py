@@ -0,0 +1,300 @@
+"""
+novelWriter – Project Spelling Report Tool
+==========================================
+
+File History:
+Created: 2024-05-16 [2.5a3] GuiSpellReport
+Created: 2024-05-16 [2.5a3] BackgroundSpellReport
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import logging
+
+from time import time
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QCloseEvent
+from PyQt5.QtWidgets import (
+    QDialogButtonBox, QLabel, QTreeWidget, QTreeWidgetItem, QVBoxLayout
+)
+
+from novelwriter import CONFIG, SHARED
+from novelwriter.core.spellcheck import MisspelledWord, NWSpellEnchant
+from novelwriter.error import logException
+from novelwriter.extensions.modified import NToolDialog
+from novelwriter.types import QtAlignRight, QtDialogClose, QtRoleAction, QtUserRole
+
+if TYPE_CHECKING:  # pragma: no cover
+    from novelwriter.guimain import GuiMain
+
+logger = logging.getLogger(__name__)
+
+
+class GuiSpellReport(NToolDialog):
+    """GUI Tools: Project Spelling Report
+
+    Lists the misspelled words of all documents in the project, with
+    the lines they occur on. A word can be added to the project word
+    list, and a location can be opened in the editor. The check runs
+    in the thread pool.
+    """
+
+    C_WORD  = 0
+    C_COUNT = 1
+
+    D_WORD     = QtUserRole
+    D_LOCATION = QtUserRole + 1
+
+    def __init__(self, parent: GuiMain) -> None:
+        super().__init__(parent=parent)
+
+        logger.debug("Create: GuiSpellReport")
+        self.setObjectName("GuiSpellReport")
+
+        self._running = False
+
+        pOptions = SHARED.project.options
+
+        self.setWindowTitle(self.tr("Project Spelling Report"))
+        self.setMinimumWidth(CONFIG.pxInt(360))
+        self.setMinimumHeight(CONFIG.pxInt(360))
+        self.resize(
+            CONFIG.pxInt(pOptions.getInt("GuiSpellReport", "winWidth", 450)),
+            CONFIG.pxInt(pOptions.getInt("GuiSpellReport", "winHeight", 500))
+        )
+
+        # Word List
+        self.listBox = QTreeWidget(self)
+        self.listBox.setHeaderLabels([self.tr("Word"), self.tr("Count")])
+        self.listBox.setColumnWidth(
+            self.C_WORD, CONFIG.pxInt(pOptions.getInt("GuiSpellReport", "widthCol0", 300))
+        )
+        self.listBox.itemDoubleClicked.connect(self._openLocation)
+        self.listBox.itemSelectionChanged.connect(self._updateButtons)
+
+        hHeader = self.listBox.headerItem()
+        if hHeader is not None:
+            hHeader.setTextAlignment(self.C_COUNT, QtAlignRight)
+
+        self.infoLabel = QLabel(self)
+
+        # Buttons
+        self.buttonBox = QDialogButtonBox(self)
+        self.buttonBox.rejected.connect(self._doClose)
+
+        self.btnClose = self.buttonBox.addButton(QtDialogClose)
+        self.btnClose.setAutoDefault(False)
+
+        self.btnAdd = self.buttonBox.addButton(self.tr("Add to Dictionary"), QtRoleAction)
+        self.btnAdd.setAutoDefault(False)
+        self.btnAdd.setEnabled(False)
+        self.btnAdd.clicked.connect(self._addWord)
+
+        self.btnCheck = self.buttonBox.addButton(self.tr("Check Project"), QtRoleAction)
+        self.btnCheck.setAutoDefault(False)
+        self.btnCheck.clicked.connect(self.runSpellCheck)
+
+        # Assemble
+        self.outerBox = QVBoxLayout()
+        self.outerBox.addWidget(self.listBox, 1)
+        self.outerBox.addWidget(self.infoLabel, 0)
+        self.outerBox.addWidget(self.buttonBox, 0)
+
+        self.setLayout(self.outerBox)
+
+        logger.debug("Ready: GuiSpellReport")
+
+        return
+
+    def __del__(self) -> None:  # pragma: no cover
+        logger.debug("Delete: GuiSpellReport")
+        return
+
+    def runSpellCheck(self) -> None:
+        """Check the spelling of all documents outside the trash. The
+        text of the document open in the editor is used instead of the
+        saved text.
+        """
+        if self._running:
+            return
+
+        docEditor = SHARED.mainGui.docEditor
+        project = SHARED.project
+        docs = []
+        for nwItem in project.tree:
+            tHandle = nwItem.itemHandle
+            if nwItem.isFileType() and not project.tree.isTrash(tHandle):
+                if tHandle == docEditor.docHandle:
+                    docs.append((tHandle, docEditor.getText()))
+                else:
+                    docs.append((tHandle, project.storage.getDocumentText(tHandle)))
+
+        self._running = True
+        self.btnCheck.setEnabled(False)
+        self.infoLabel.setText(self.tr("Checking {0} documents ...").format(len(docs)))
+
+        runner = BackgroundSpellReport(SHARED.spelling, docs)
+        runner.signals.reportReady.connect(self._populateReport)
+        SHARED.runInThreadPool(runner)
+
+        return
+
+    ##
+    #  Events
+    ##
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Capture the user closing the window."""
+        event.accept()
+        self.deleteLater()
+        return
+
+    ##
+    #  Private Slots
+    ##
+
+    @pyqtSlot()
+    def _doClose(self) -> None:
+        """Save the state of the window, and close."""
+        logger.debug("Saving State: GuiSpellReport")
+        pOptions = SHARED.project.options
+        pOptions.setValue("GuiSpellReport", "winWidth", CONFIG.rpxInt(self.width()))
+        pOptions.setValue("GuiSpellReport", "winHeight", CONFIG.rpxInt(self.height()))
+        pOptions.setValue(
+            "GuiSpellReport", "widthCol0", CONFIG.rpxInt(self.listBox.columnWidth(self.C_WORD))
+        )
+        pOptions.saveSettings()
+        self.close()
+        return
+
+    @pyqtSlot(list, float)
+    def _populateReport(self, errors: list[MisspelledWord], elapsed: float) -> None:
+        """Fill the list box with the result of a check."""
+        self.listBox.clear()
+        tree = SHARED.project.tree
+        for error in errors:
+            wItem = QTreeWidgetItem()
+            wItem.setText(self.C_WORD, error.word)
+            wItem.setText(self.C_COUNT, str(error.count))
+            wItem.setTextAlignment(self.C_COUNT, QtAlignRight)
+            wItem.setData(self.C_WORD, self.D_WORD, error.word)
+            for tHandle, line, column in error.locations:
+                nwItem = tree[tHandle]
+                name = nwItem.itemName if nwItem else tHandle
+                lItem = QTreeWidgetItem()
+                lItem.setText(self.C_WORD, self.tr("{0}, line {1}").format(name, line))
+                lItem.setData(self.C_WORD, self.D_WORD, error.word)
+                lItem.setData(self.C_WORD, self.D_LOCATION, (tHandle, line, column))
+                wItem.addChild(lItem)
+            self.listBox.addTopLevelItem(wItem)
+
+        self.infoLabel.setText(self.tr(
+            "Found {0} misspelled words in {1} seconds"
+        ).format(len(errors), f"{elapsed:.2f}"))
+        self.btnCheck.setEnabled(True)
+        self._running = False
+        self._updateButtons()
+
+        return
+
+    @pyqtSlot()
+    def _updateButtons(self) -> None:
+        """Only enable the add button when a word is selected."""
+        self.btnAdd.setEnabled(self._selectedWord() is not None)
+        return
+
+    @pyqtSlot()
+    def _addWord(self) -> None:
+        """Add the selected word to the project word list, and remove
+        it from the report.
+        """
+        if (word := self._selectedWord()) is not None:
+            SHARED.spelling.addWord(word)
+            for i in range(self.listBox.topLevelItemCount()):
+                wItem = self.listBox.topLevelItem(i)
+                if wItem and wItem.data(self.C_WORD, self.D_WORD) == word:
+                    self.listBox.takeTopLevelItem(i)
+                    break
+            SHARED.mainGui.docEditor.spellCheckDocument()
+        return
+
+    @pyqtSlot("QTreeWidgetItem*", int)
+    def _openLocation(self, item: QTreeWidgetItem, column: int) -> None:
+        """Open the document of a location, and select the word."""
+        location = item.data(self.C_WORD, self.D_LOCATION)
+        if isinstance(location, tuple):
+            tHandle, line, pos = location
+            mainGui = SHARED.mainGui
+            if mainGui.openDocument(tHandle, tLine=line, changeFocus=False):
+                docEditor = mainGui.docEditor
+                block = docEditor.document().findBlockByNumber(line - 1)
+                if block.isValid():
+                    word = item.data(self.C_WORD, self.D_WORD)
+                    docEditor.setCursorSelection(block.position() + pos, len(word))
+        return
+
+    ##
+    #  Internal Functions
+    ##
+
+    def _selectedWord(self) -> str | None:
+        """Return the word of the selected item."""
+        if items := self.listBox.selectedItems():
+            return items[0].data(self.C_WORD, self.D_WORD)
+        return None
+
+# END Class GuiSpellReport
+
+
+class BackgroundSpellReport(QRunnable):
+    """A runnable that checks the spelling of a list of documents in
+    the thread pool.
+    """
+
+    def __init__(self, spelling: NWSpellEnchant, docs: list[tuple[str, str]]) -> None:
+        super().__init__()
+        self._spelling = spelling
+        self._docs = docs
+        self.signals = BackgroundSpellReportSignals()
+        return
+
+    @pyqtSlot()
+    def run(self) -> None:
+        """Run the spell check and emit the result."""
+        start = time()
+        try:
+            errors = self._spelling.checkDocuments(self._docs)
+        except Exception:
+            logger.error("Project spell check failed")
+            logException()
+            errors = []
+        self.signals.reportReady.emit(errors, time() - start)
+        return
+
+# END Class BackgroundSpellReport
+
+
+class BackgroundSpellReportSignals(QObject):
+    """The QRunnable cannot emit a signal, so we need a simple QObject
+    to hold the report signal.
+    """
+    reportReady = pyqtSignal(list, float)
+
+# END Class BackgroundSpellReportSignals
@@ -58,6 +58,8 @@ QtSelected = QStyle.StateFlag.State_Selected
 # Qt Tree and Table Types
 
 QtDecoration = Qt.ItemDataRole.DecorationRole
+QtDisplayRole = Qt.ItemDataRole.DisplayRole
+QtToolTipRole = Qt.ItemDataRole.ToolTipRole
 QtUserRole = Qt.ItemDataRole.UserRole
 
 # Keyboard and Mouse Buttons
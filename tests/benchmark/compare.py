@@ -0,0 +1,137 @@
+"""
+novelWriter – Benchmark Compare Tool
+====================================
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from pathlib import Path
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def loadRun(path: Path) -> dict[str, dict]:
+    """Load a pytest-benchmark JSON file or a stored baseline and
+    return the stats of each benchmark by name.
+    """
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if "benchmarks" in data and isinstance(data["benchmarks"], list):
+        return {b["name"]: b["stats"] for b in data["benchmarks"]}
+    return data.get("stats", {})
+
+
+def saveBaseline(run: Path, baseline: Path) -> None:
+    """Store the stats of a run as the new baseline."""
+    data = json.loads(run.read_text(encoding="utf-8"))
+    stats = {}
+    for bench in data.get("benchmarks", []):
+        stats[bench["name"]] = {
+            key: bench["stats"][key]
+            for key in ("min", "max", "mean", "stddev", "median", "rounds")
+        }
+    baseline.write_text(json.dumps({
+        "machine": data.get("machine_info", {}).get("node", ""),
+        "python": data.get("machine_info", {}).get("python_version", ""),
+        "commit": data.get("commit_info", {}).get("id", ""),
+        "datetime": data.get("datetime", ""),
+        "stats": stats,
+    }, indent=2), encoding="utf-8")
+    print(f"Saved {len(stats)} benchmarks to: {baseline}")
+    return
+
+
+def compareRuns(old: dict[str, dict], new: dict[str, dict], threshold: float) -> int:
+    """Print a comparison of two runs and return the number of
+    benchmarks where the median time increased by more than threshold
+    percent.
+    """
+    width = max([len(n) for n in new] + [9])
+    print(f"{'Benchmark':<{width}}  {'Base [ms]':>10}  {'New [ms]':>10}  {'Change':>8}")
+    print("-"*(width + 34))
+
+    failed = 0
+    for name, stats in new.items():
+        newTime = stats["median"]*1000.0
+        if name not in old:
+            print(f"{name:<{width}}  {'-':>10}  {newTime:10.3f}  {'new':>8}")
+            continue
+        oldTime = old[name]["median"]*1000.0
+        change = 100.0*(newTime - oldTime)/oldTime if oldTime > 0.0 else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- slower"
+            failed += 1
+        print(f"{name:<{width}}  {oldTime:10.3f}  {newTime:10.3f}  {change:+7.1f}%{flag}")
+
+    for name in old:
+        if name not in new:
+            print(f"{name:<{width}}  {old[name]['median']*1000.0:10.3f}  {'-':>10}  {'gone':>8}")
+
+    return failed
+
+
+def main(sysArgs: list[str]) -> int:
+    """Parse the command line and run the requested command."""
+    parser = argparse.ArgumentParser(
+        prog="compare.py",
+        description=(
+            "Compare benchmark results written by 'pytest tests/benchmark "
+            "--benchmark-json=<file>' against a baseline or another run."
+        ),
+    )
+    parser.add_argument("run", type=Path, help="a benchmark JSON file")
+    parser.add_argument(
+        "other", type=Path, nargs="?", default=None,
+        help="an earlier run to compare against instead of the baseline",
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=BASELINE, help="the baseline file to use",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="store the run as the new baseline",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=10.0,
+        help="the median time increase in percent to report as slower (default: 10)",
+    )
+    args = parser.parse_args(sysArgs)
+
+    if args.save:
+        saveBaseline(args.run, args.baseline)
+        return 0
+
+    reference = args.other or args.baseline
+    if not reference.is_file():
+        print(f"No baseline found at: {reference}")
+        print("Store one with: compare.py <run.json> --save")
+        return 2
+
+    failed = compareRuns(loadRun(reference), loadRun(args.run), args.threshold)
+    if failed:
+        print(f"\n{failed} benchmark(s) slower than the {args.threshold:.0f}% threshold")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
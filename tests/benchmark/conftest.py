@@ -0,0 +1,79 @@
+"""
+novelWriter – Benchmark Suite Configuration
+===========================================
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import pytest
+import shutil
+
+from pathlib import Path
+
+from novelwriter.core.project import NWProject
+
+from tests.benchmark.generator import BENCH_SIZES, BenchProject
+
+_BENCH_ROOT = Path(__file__).parent.parent / "temp" / "benchmark"
+
+
+def pytest_addoption(parser):
+    """Add the benchmark project size option."""
+    parser.addoption(
+        "--bench-size", action="store", default="small", choices=list(BENCH_SIZES),
+        help="The size of the synthetic benchmark project.",
+    )
+    return
+
+
+@pytest.fixture(scope="session")
+def benchPath(request, sessionFixture):
+    """The path of the synthetic benchmark project for this session.
+    The project itself is generated by the first benchProject fixture,
+    as it needs the mocked GUI.
+    """
+    size = request.config.getoption("--bench-size")
+    path = _BENCH_ROOT / size
+    if path.exists():
+        shutil.rmtree(path)
+    return path
+
+
+@pytest.fixture(scope="function")
+def benchProject(mockGUI, benchPath, request):
+    """Open the synthetic benchmark project."""
+    if not benchPath.exists():
+        size = request.config.getoption("--bench-size")
+        benchPath.mkdir(parents=True)
+        BenchProject(**BENCH_SIZES[size]).build(benchPath)
+
+    project = NWProject()
+    project.openProject(benchPath)
+    yield project
+    project.closeProject()
+    return
+
+
+@pytest.fixture(scope="function")
+def benchTexts(benchProject):
+    """Return the text of all documents in the benchmark project."""
+    storage = benchProject.storage
+    return {
+        item.itemHandle: storage.getDocumentText(item.itemHandle)
+        for item in benchProject.tree if item.isFileType()
+    }
@@ -0,0 +1,191 @@
+"""
+novelWriter – Benchmark Project Generator
+=========================================
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import random
+
+from pathlib import Path
+
+from novelwriter.core.coretools import ProjectBuilder
+from novelwriter.core.project import NWProject
+from novelwriter.enum import nwItemClass
+
+SCENES_PER_CHAPTER = 10
+
+# Predefined project sizes selectable with the --bench-size option
+BENCH_SIZES = {
+    "small":  {"documents": 20,   "words": 1000, "tags": 20,  "references": 3},
+    "medium": {"documents": 200,  "words": 2000, "tags": 100, "references": 5},
+    "large":  {"documents": 1000, "words": 3000, "tags": 400, "references": 8},
+}
+
+VOCABULARY = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit nunc maximus justo non dictum "
+    "commodo curabitur lacinia tempor orci vel luctus phasellus porta metus eu massa euismod "
+    "risus rhoncus vestibulum sed arcu nisi maecenas pretium facilisis velit semper lacus "
+    "aliquam vulputate neque ligula blandit turpis consequat id mauris sagittis vehicula "
+    "imperdiet duis ornare purus sodales augue suscipit quisque volutpat eleifend est "
+    "ullamcorper fermentum donec et tortor laoreet nam vivamus erat felis vitae scelerisque"
+).split()
+
+
+class BenchProject:
+    """Generate a synthetic project of a given size. The content is
+    fully determined by the size parameters and the seed, including
+    the item handles, so repeated runs produce identical projects.
+    """
+
+    def __init__(
+        self, documents: int = 20, words: int = 1000, tags: int = 20,
+        references: int = 3, seed: int = 42
+    ) -> None:
+        self.documents = max(1, documents)
+        self.words = max(1, words)
+        self.tags = max(2, tags)
+        self.references = max(0, references)
+        self.seed = seed
+        self._rnd = random.Random(seed)
+        self._charTags: list[str] = []
+        self._worldTags: list[str] = []
+        return
+
+    def build(self, path: Path) -> Path:
+        """Build the project in the given folder and return the path."""
+        chapters = -(-self.documents // SCENES_PER_CHAPTER)
+
+        # Handles are generated by the random module, so we seed it
+        # and restore its state when we're done
+        state = random.getstate()
+        random.seed(self.seed)
+        try:
+            builder = ProjectBuilder()
+            builder.buildProject({
+                "name": "Benchmark Project",
+                "author": "Jane Doe",
+                "path": path,
+                "chapters": chapters,
+                "scenes": 0,
+                "roots": [nwItemClass.PLOT, nwItemClass.CHARACTER, nwItemClass.WORLD],
+                "notes": False,
+            })
+            self._populate(path)
+        finally:
+            random.setstate(state)
+
+        return path
+
+    ##
+    #  Internal Functions
+    ##
+
+    def _populate(self, path: Path) -> None:
+        """Add notes and scenes to the skeleton project."""
+        project = NWProject()
+        project.openProject(path)
+
+        nHandle = project.tree.findRoot(nwItemClass.NOVEL)
+        cHandle = project.tree.findRoot(nwItemClass.CHARACTER)
+        wHandle = project.tree.findRoot(nwItemClass.WORLD)
+        chapters = [
+            item.itemHandle for item in project.tree
+            if item.itemParent == nHandle and item.itemName.startswith("Chapter")
+        ]
+
+        nChars = self.tags // 2
+        for i in range(self.tags):
+            if i < nChars:
+                name = f"Character{i+1:04d}"
+                self._charTags.append(name)
+                self._writeNote(project, cHandle, name)
+            else:
+                name = f"Location{i+1:04d}"
+                self._worldTags.append(name)
+                self._writeNote(project, wHandle, name)
+
+        for i in range(self.documents):
+            chapter = chapters[i // SCENES_PER_CHAPTER]
+            label = f"Scene {i+1:d}"
+            if sHandle := project.newFile(label, chapter):
+                project.writeNewFile(sHandle, 3, True, self._sceneText())
+
+        project.saveProject()
+        project.closeProject()
+
+        return
+
+    def _writeNote(self, project: NWProject, parent: str | None, name: str) -> None:
+        """Write a single tagged project note."""
+        if parent and (tHandle := project.newFile(name, parent)):
+            text = (
+                f"@tag: {name}\n\n%Short: {self._sentence(8)}\n\n"
+                f"{self._paragraph(self.words // 10)}\n\n"
+            )
+            project.writeNewFile(tHandle, 1, False, text)
+        return
+
+    def _sceneText(self) -> str:
+        """Generate the text of a single scene document."""
+        rnd = self._rnd
+        refs = [f"@pov: {rnd.choice(self._charTags)}"]
+        if self.references > 0:
+            chars = rnd.sample(self._charTags, min(self.references, len(self._charTags)))
+            where = rnd.sample(self._worldTags, min(self.references, len(self._worldTags)))
+            refs.append(f"@char: {', '.join(chars)}")
+            refs.append(f"@location: {', '.join(where)}")
+
+        paras = []
+        count = 0
+        while count < self.words:
+            size = min(rnd.randint(40, 120), self.words - count)
+            paras.append(self._paragraph(size))
+            count += size
+
+        return (
+            f"%Synopsis: {self._sentence(12)}\n\n"
+            + "\n".join(refs) + "\n\n"
+            + "\n\n".join(paras) + "\n\n"
+        )
+
+    def _paragraph(self, words: int) -> str:
+        """Generate a paragraph of sentences with some formatting."""
+        rnd = self._rnd
+        result = []
+        count = 0
+        while count < words:
+            size = min(rnd.randint(5, 15), words - count)
+            sentence = self._sentence(size)
+            style = rnd.random()
+            if style < 0.1:
+                sentence = f"**{sentence}**"
+            elif style < 0.2:
+                sentence = f"_{sentence}_"
+            elif style < 0.3:
+                sentence = f"“{sentence}”"
+            result.append(sentence)
+            count += size
+        return " ".join(result)
+
+    def _sentence(self, words: int) -> str:
+        """Generate a single sentence."""
+        text = " ".join(self._rnd.choices(VOCABULARY, k=max(1, words)))
+        return f"{text[:1].upper()}{text[1:]}."
+
+# END Class BenchProject
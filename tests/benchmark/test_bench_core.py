@@ -0,0 +1,150 @@
+"""
+novelWriter – Core Benchmarks
+=============================
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import pytest
+
+from novelwriter.core.coretools import DocSearch
+from novelwriter.core.projectdata import NWProjectData
+from novelwriter.core.projectxml import ProjectXMLReader
+from novelwriter.core.tohtml import ToHtml
+from novelwriter.core.tomd import ToMarkdown
+from novelwriter.core.toodt import ToOdt
+from novelwriter.core.tokenizer import Tokenizer
+from novelwriter.enum import nwItemLayout
+from novelwriter.text.counting import standardCounter
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _novelTexts(project, texts):
+    """Return the texts of the novel documents only."""
+    return [
+        (tHandle, text) for tHandle, text in texts.items()
+        if project.tree[tHandle].itemLayout == nwItemLayout.DOCUMENT
+    ]
+
+
+def _convertAll(obj: Tokenizer, texts: list[tuple[str, str]]) -> None:
+    """Run the full conversion pipeline on a list of documents."""
+    for tHandle, text in texts:
+        obj.setText(tHandle, text)
+        obj.doPreProcessing()
+        obj.tokenizeText()
+        obj.doConvert()
+    return
+
+
+@pytest.mark.core
+def testBenchCounting_StandardCounter(benchmark, benchTexts):
+    """Benchmark the standard word counter on all documents."""
+    texts = list(benchTexts.values())
+    benchmark(lambda: [standardCounter(text) for text in texts])
+
+# END Test testBenchCounting_StandardCounter
+
+
+@pytest.mark.core
+def testBenchIndex_ScanText(benchmark, benchProject, benchTexts):
+    """Benchmark scanning all documents into the index."""
+    index = benchProject.index
+
+    def scanAll():
+        for tHandle, text in benchTexts.items():
+            index.scanText(tHandle, text, blockSignal=True)
+
+    benchmark(scanAll)
+
+# END Test testBenchIndex_ScanText
+
+
+@pytest.mark.core
+def testBenchTokenizer_TokenizeText(benchmark, benchProject, benchTexts):
+    """Benchmark tokenizing all novel documents."""
+    texts = _novelTexts(benchProject, benchTexts)
+    tokens = ToHtml(benchProject)
+
+    def tokenizeAll():
+        for tHandle, text in texts:
+            tokens.setText(tHandle, text)
+            tokens.doPreProcessing()
+            tokens.tokenizeText()
+
+    benchmark(tokenizeAll)
+
+# END Test testBenchTokenizer_TokenizeText
+
+
+@pytest.mark.core
+def testBenchConvert_ToHtml(benchmark, benchProject, benchTexts):
+    """Benchmark converting the novel to HTML."""
+    texts = _novelTexts(benchProject, benchTexts)
+    benchmark(lambda: _convertAll(ToHtml(benchProject), texts))
+
+# END Test testBenchConvert_ToHtml
+
+
+@pytest.mark.core
+def testBenchConvert_ToOdt(benchmark, benchProject, benchTexts):
+    """Benchmark converting the novel to Open Document."""
+    texts = _novelTexts(benchProject, benchTexts)
+
+    def convert():
+        odt = ToOdt(benchProject, isFlat=True)
+        odt.initDocument()
+        _convertAll(odt, texts)
+        odt.closeDocument()
+
+    benchmark(convert)
+
+# END Test testBenchConvert_ToOdt
+
+
+@pytest.mark.core
+def testBenchConvert_ToMarkdown(benchmark, benchProject, benchTexts):
+    """Benchmark converting the novel to Markdown."""
+    texts = _novelTexts(benchProject, benchTexts)
+    benchmark(lambda: _convertAll(ToMarkdown(benchProject), texts))
+
+# END Test testBenchConvert_ToMarkdown
+
+
+@pytest.mark.core
+@pytest.mark.parametrize("regEx", [False, True])
+def testBenchSearch_IterSearch(benchmark, benchProject, regEx):
+    """Benchmark a project wide search."""
+    search = DocSearch()
+    search.setUserRegEx(regEx)
+    pattern = r"\blorem\s+\w+" if regEx else "lorem ipsum"
+    benchmark(lambda: list(search.iterSearch(benchProject, pattern)))
+
+# END Test testBenchSearch_IterSearch
+
+
+@pytest.mark.core
+def testBenchProjectXML_Read(benchmark, benchProject, benchPath):
+    """Benchmark reading the project XML file."""
+    def read():
+        ProjectXMLReader(benchPath / "nwProject.nwx").read(NWProjectData(benchProject), [])
+
+    benchmark(read)
+
+# END Test testBenchProjectXML_Read
@@ -23,10 +23,11 @@ from __future__ import annotations
 import sys
 import pytest
 import logging
+import tracemalloc
 
 from mocked import MockGuiMain
 
-from novelwriter import CONFIG, main, logger
+from novelwriter import CONFIG, METRICS, main, logger
 
 
 @pytest.mark.base
@@ -136,6 +137,25 @@ def testBaseInit_Options(monkeypatch, fncPath):
     )
     assert nwGUI.closeMain() == "closeMain"
 
+    # Profiling
+    nwGUI = main(
+        ["--testmode", f"--config={fncPath}", f"--data={fncPath}", f"--profile={fncPath}"]
+    )
+    assert METRICS.profilePath is not None
+    assert METRICS.profilePath.parent == fncPath
+    METRICS.stopProfiling()
+    assert nwGUI.closeMain() == "closeMain"
+
+    nwGUI = main(
+        ["--testmode", f"--config={fncPath}", f"--data={fncPath}", "--tracemalloc"]
+    )
+    assert METRICS.profilePath is not None
+    assert METRICS.profilePath.parent == fncPath / "profiling"
+    assert tracemalloc.is_tracing()
+    METRICS.stopProfiling()
+    assert not tracemalloc.is_tracing()
+    assert nwGUI.closeMain() == "closeMain"
+
 # END Test testBaseInit_Options
 
 
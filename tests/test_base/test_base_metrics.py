@@ -0,0 +1,199 @@
+"""
+novelWriter – Metrics Class Tester
+==================================
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import json
+import tracemalloc
+
+import pytest
+
+from novelwriter import METRICS
+from novelwriter.metrics import Metrics
+
+from tests.mocked import causeOSError
+
+
+@pytest.mark.base
+def testBaseMetrics_Collect(monkeypatch, fncPath):
+    """Test collecting timers, counters and histograms."""
+    metrics = Metrics()
+
+    # Timers
+    with metrics.timer("test.block") as timer:
+        pass
+    assert timer.elapsed >= 0.0
+    metrics.addTime("test.block", 0.002)
+
+    @metrics.timed("test.func")
+    def func(value):
+        return 2*value
+
+    assert func(2) == 4
+    assert func.__name__ == "func"
+
+    # Counters and histograms
+    metrics.count("test.count")
+    metrics.count("test.count", 4)
+    metrics.sample("test.hist", 3)
+    metrics.sample("test.hist", 300)
+    metrics.sample("test.hist", 1e9)
+
+    report = metrics.report()
+    assert report["counters"] == {"test.count": 5}
+
+    block = report["timers"]["test.block"]
+    assert block["count"] == 2
+    assert block["max"] == pytest.approx(2.0)
+    assert block["histogram"]["<=2"] == 1
+    assert report["timers"]["test.func"]["count"] == 1
+
+    hist = report["histograms"]["test.hist"]
+    assert hist["count"] == 3
+    assert hist["min"] == 3.0
+    assert hist["max"] == 1e9
+    assert hist["mean"] == pytest.approx((3 + 300 + 1e9)/3)
+    assert hist["histogram"] == {"<=5": 1, "<=500": 1, "inf": 1}
+
+    # Save report
+    path = fncPath / "report.json"
+    assert metrics.saveReport(path) is True
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["timers"] == json.loads(json.dumps(report["timers"]))
+    assert saved["counters"] == report["counters"]
+
+    with monkeypatch.context() as mp:
+        mp.setattr("builtins.open", causeOSError)
+        assert metrics.saveReport(path) is False
+
+    # Clear
+    metrics.clear()
+    report = metrics.report()
+    assert report["timers"] == {}
+    assert report["counters"] == {}
+    assert report["histograms"] == {}
+
+# END Test testBaseMetrics_Collect
+
+
+@pytest.mark.base
+def testBaseMetrics_Wiring(mockGUI, prjLipsum):
+    """Test that the global metrics object collects data from the core
+    classes.
+    """
+    from novelwriter.core.project import NWProject
+
+    METRICS.clear()
+    project = NWProject()
+    project.openProject(prjLipsum)
+    project.index.rebuildIndex()
+    project.saveProject()
+    project.closeProject()
+
+    report = METRICS.report()
+    timers = report["timers"]
+    assert timers["project.open"]["count"] == 1
+    assert timers["project.save"]["count"] == 1
+    assert timers["project.close"]["count"] == 1
+    assert timers["project.xml.read"]["count"] == 1
+    assert timers["index.rebuild"]["count"] == 1
+    assert timers["index.scanText"]["count"] > 1
+    assert timers["index.save"]["count"] == 1
+    assert report["histograms"]["index.scanText.words"]["count"] > 1
+
+# END Test testBaseMetrics_Wiring
+
+
+@pytest.mark.base
+def testBaseMetrics_Profiling(monkeypatch, mockGUI, prjLipsum, fncPath):
+    """Test the cProfile and tracemalloc profiling modes."""
+    from novelwriter.core.project import NWProject
+
+    metrics = Metrics()
+    monkeypatch.setattr("novelwriter.core.project.METRICS", metrics)
+
+    # Not running, so nothing happens
+    metrics.memorySnapshot("none")
+    metrics.stopProfiling()
+    assert metrics.profilePath is None
+
+    # Cannot create folder
+    with monkeypatch.context() as mp:
+        mp.setattr("pathlib.Path.mkdir", causeOSError)
+        assert metrics.startProfiling(fncPath, profile=True, trace=True) is False
+        assert metrics.profilePath is None
+
+    # Start profiling
+    assert metrics.startProfiling(fncPath, profile=True, trace=True) is True
+    assert metrics.startProfiling(fncPath, profile=True, trace=True) is False
+    path = metrics.profilePath
+    assert path is not None
+    assert path.parent == fncPath
+
+    project = NWProject()
+    project.openProject(prjLipsum)
+    project.closeProject()
+    metrics.stopProfiling()
+    assert metrics.profilePath is None
+    assert not tracemalloc.is_tracing()
+
+    assert (path / "profile.prof").is_file()
+    assert "openProject" in (path / "profile-cumulative.txt").read_text(encoding="utf-8")
+    assert (path / "profile-tottime.txt").is_file()
+    assert (path / "metrics.json").is_file()
+
+    memOpen = (path / "memory-001-open.txt").read_text(encoding="utf-8")
+    memClose = (path / "memory-002-close.txt").read_text(encoding="utf-8")
+    assert memOpen.startswith("Snapshot: open")
+    assert "Top Allocation Sites" in memOpen
+    assert "Largest Changes Since Last Snapshot" not in memOpen
+    assert memClose.startswith("Snapshot: close")
+    assert "Largest Changes Since Last Snapshot" in memClose
+
+# END Test testBaseMetrics_Profiling
+
+
+@pytest.mark.base
+def testBaseMetrics_Startup(monkeypatch):
+    """Test the startup timing methods."""
+    import builtins
+    import sys
+
+    metrics = Metrics()
+
+    # Only modules imported for the first time are recorded
+    monkeypatch.delitem(sys.modules, "novelwriter.tools.lipsum", raising=False)
+    original = builtins.__import__
+    with metrics.trackImports() as tracker:
+        assert builtins.__import__ is not original
+        import json  # noqa: F401
+        from novelwriter.tools.lipsum import GuiLipsum  # noqa: F401
+    assert builtins.__import__ is original
+
+    assert "json" not in tracker.modules
+    assert "novelwriter.tools.lipsum" in tracker.modules
+    timers = metrics.report()["timers"]
+    assert timers["startup.import.novelwriter.tools.lipsum"]["count"] == 1
+
+    # Mark startup events
+    assert metrics.markStartup("firstPaint") > 0.0
+    assert metrics.report()["timers"]["startup.firstPaint"]["count"] == 1
+
+# END Test testBaseMetrics_Startup
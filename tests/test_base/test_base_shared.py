@@ -173,3 +173,56 @@ def testBaseSharedData_Alerts(qtbot, monkeypatch, caplog):
     assert shared.lastAlert == "Why?"
 
 # END Test testBaseSharedData_Alerts
+
+
+@pytest.mark.base
+def testBaseSharedData_IndexEvents():
+    """Test the index signal proxy and index batches."""
+    shared = SharedData()
+    received = []
+    shared.indexCleared.connect(lambda: received.append(("cleared",)))
+    shared.indexChangedTags.connect(lambda u, d: received.append(("tags", u, d)))
+    shared.indexScannedText.connect(lambda h: received.append(("scanned", h)))
+    shared.indexAvailable.connect(lambda: received.append(("available",)))
+
+    # Outside a batch, events are emitted directly
+    shared.indexSignalProxy({"event": "updateTags", "updated": ["a"], "deleted": ["b"]})
+    shared.indexSignalProxy({"event": "scanText", "handle": "h1"})
+    assert received == [("tags", ["a"], ["b"]), ("scanned", "h1")]
+
+    # Empty tag changes are not emitted
+    received.clear()
+    shared.indexSignalProxy({"event": "updateTags", "deleted": []})
+    assert received == []
+
+    # Inside a batch, events are merged
+    with shared.indexBatch():
+        shared.indexSignalProxy({"event": "updateTags", "updated": ["a", "b"], "deleted": []})
+        shared.indexSignalProxy({"event": "scanText", "handle": "h1"})
+        with shared.indexBatch():
+            shared.indexSignalProxy({"event": "updateTags", "updated": ["c"], "deleted": ["b"]})
+            shared.indexSignalProxy({"event": "scanText", "handle": "h2"})
+            shared.indexSignalProxy({"event": "scanText", "handle": "h1"})
+        assert received == []
+    assert received == [
+        ("tags", ["a", "c"], ["b"]), ("scanned", "h1"), ("scanned", "h2"),
+    ]
+
+    # Clearing the index drops earlier changes
+    received.clear()
+    with shared.indexBatch():
+        shared.indexSignalProxy({"event": "updateTags", "updated": ["a"], "deleted": []})
+        shared.indexSignalProxy({"event": "clearIndex"})
+        shared.indexSignalProxy({"event": "scanText", "handle": "h3"})
+        shared.indexSignalProxy({"event": "buildIndex"})
+    assert received == [("cleared",), ("scanned", "h3"), ("available",)]
+
+    # Events are emitted also when the batch fails
+    received.clear()
+    with pytest.raises(ValueError):
+        with shared.indexBatch():
+            shared.indexSignalProxy({"event": "scanText", "handle": "h4"})
+            raise ValueError
+    assert received == [("scanned", "h4")]
+
+# END Test testBaseSharedData_IndexEvents
@@ -0,0 +1,204 @@
+"""
+novelWriter – NWBackup Class Tester
+===================================
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import json
+import pytest
+
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+
+from mocked import causeOSError
+from tools import C, buildTestProject
+
+from novelwriter import CONFIG, SHARED
+from novelwriter.core.backup import NWBackup
+from novelwriter.core.project import NWProject
+
+
+@pytest.mark.core
+def testCoreBackup_Snapshots(monkeypatch, mockGUI, fncPath, mockRnd):
+    """Test creating snapshots, and that unchanged files are shared
+    between snapshots.
+    """
+    project = NWProject()
+    mockRnd.reset()
+    buildTestProject(project, fncPath / "project")
+    project.saveProject()
+    files = project.storage.listProjectFiles()
+    assert len(files) > 5
+
+    backup = NWBackup(fncPath / "backup")
+    assert backup.path == fncPath / "backup"
+    assert backup.listSnapshots() == []
+
+    # Fail to write
+    with monkeypatch.context() as mp:
+        mp.setattr("pathlib.Path.write_bytes", causeOSError)
+        assert backup.createSnapshot(files, "snap-0") is None
+    assert backup.listSnapshots() == []
+
+    # First snapshot stores all files
+    assert backup.createSnapshot(files, "snap-1", {"name": "Test"}) == "snap-1"
+    assert backup.listSnapshots() == ["snap-1"]
+    assert backup.newFiles == len(set(p.read_bytes() for p, _ in files))
+    assert backup.newBytes > 0
+
+    manifest = backup.readManifest("snap-1")
+    assert isinstance(manifest, dict)
+    assert manifest["meta"] == {"name": "Test"}
+    assert sorted(manifest["files"]) == sorted(r for _, r in files)
+
+    # A second snapshot with no changes stores nothing, and does not
+    # read the files again
+    with monkeypatch.context() as mp:
+        mp.setattr("pathlib.Path.read_bytes", causeOSError)
+        assert backup.createSnapshot(files, "snap-2") == "snap-2"
+    assert backup.newFiles == 0
+    assert backup.newBytes == 0
+
+    # Changing one document stores only that document
+    assert project.storage.getDocument(C.hSceneDoc).writeDocument("### Changed Scene\n\n")
+    files = project.storage.listProjectFiles()
+    assert backup.createSnapshot(files, "snap-3") == "snap-3"
+    assert backup.newFiles == 1
+    assert backup.listSnapshots() == ["snap-1", "snap-2", "snap-3"]
+
+    entries1 = backup.readManifest("snap-1")["files"]  # type: ignore
+    entries3 = backup.readManifest("snap-3")["files"]  # type: ignore
+    sceneDoc = f"content/{C.hSceneDoc}.nwd"
+    chapterDoc = f"content/{C.hChapterDoc}.nwd"
+    assert entries1[sceneDoc]["hash"] != entries3[sceneDoc]["hash"]
+    assert entries1[chapterDoc]["hash"] == entries3[chapterDoc]["hash"]
+
+    # Invalid manifests
+    assert backup.readManifest("nope") is None
+    (fncPath / "backup" / "snapshots" / "bad.json").write_text("[]", encoding="utf-8")
+    assert backup.readManifest("bad") is None
+
+    project.closeProject()
+
+# END Test testCoreBackup_Snapshots
+
+
+@pytest.mark.core
+def testCoreBackup_Restore(mockGUI, fncPath, mockRnd):
+    """Test restoring a full project from a snapshot."""
+    project = NWProject()
+    mockRnd.reset()
+    buildTestProject(project, fncPath / "project")
+    project.saveProject()
+
+    backup = NWBackup(fncPath / "backup")
+    files = project.storage.listProjectFiles()
+    assert backup.createSnapshot(files, "snap-1")
+    original = {r: p.read_bytes() for p, r in files}
+
+    assert project.storage.getDocument(C.hSceneDoc).writeDocument("### Changed Scene\n\n")
+    assert backup.createSnapshot(project.storage.listProjectFiles(), "snap-2")
+    project.closeProject()
+
+    # Restore the first snapshot
+    target = fncPath / "restored"
+    assert backup.restoreSnapshot("snap-1", target) is True
+    for relPath, data in original.items():
+        assert (target / relPath).read_bytes() == data
+
+    # The restored project can be opened
+    restored = NWProject()
+    assert restored.openProject(target) is True
+    assert restored.data.name == "New Project"
+    assert len(restored.tree) == len(project.tree)
+    restored.closeProject()
+
+    # Restoring to a non-empty folder fails
+    assert backup.restoreSnapshot("snap-2", target) is False
+
+    # Unknown snapshot
+    assert backup.restoreSnapshot("nope", fncPath / "other") is False
+
+    # Corrupted object
+    entry = backup.readManifest("snap-2")["files"][f"content/{C.hSceneDoc}.nwd"]  # type: ignore
+    objPath = fncPath / "backup" / "objects" / entry["hash"][:2] / entry["hash"][2:]
+    objPath.write_bytes(objPath.read_bytes()[:-4])
+    assert backup.restoreSnapshot("snap-2", fncPath / "corrupt") is False
+
+    # Paths outside the target are rejected
+    snapPath = fncPath / "backup" / "snapshots" / "snap-1.json"
+    manifest = json.loads(snapPath.read_text(encoding="utf-8"))
+    manifest["files"] = {"../escape.txt": next(iter(manifest["files"].values()))}
+    snapPath.write_text(json.dumps(manifest), encoding="utf-8")
+    assert backup.restoreSnapshot("snap-1", fncPath / "escape") is False
+    assert not (fncPath / "escape.txt").exists()
+
+# END Test testCoreBackup_Restore
+
+
+@pytest.mark.core
+def testCoreBackup_Project(monkeypatch, mockGUI, fncPath, mockRnd):
+    """Test the incremental backup mode of the project class."""
+    project = NWProject()
+    mockRnd.reset()
+    buildTestProject(project, fncPath)
+    project.data.setName("Test Minimal")
+
+    backupPath = fncPath / "backups"
+    backupPath.mkdir()
+    monkeypatch.setattr(CONFIG, "_backupPath", backupPath)
+    monkeypatch.setattr(CONFIG, "incrementalBackup", True)
+    snapPath = backupPath / "Test Minimal" / "Snapshots"
+
+    def waitForBackup():
+        QThreadPool.globalInstance().waitForDone()
+        QCoreApplication.processEvents()
+        assert not project._backups
+
+    # Can't read files
+    with monkeypatch.context() as mp:
+        mp.setattr("pathlib.Path.read_bytes", causeOSError)
+        assert project.backupProject(doNotify=False) is False
+    assert SHARED.lastAlert.startswith("Could not prepare the project backup.")
+
+    # Can't write snapshot
+    SHARED._lastAlert = ""
+    with monkeypatch.context() as mp:
+        mp.setattr("novelwriter.core.backup.NWBackup.writeSnapshot", lambda *a, **k: None)
+        assert project.backupProject(doNotify=False) is True
+        waitForBackup()
+    assert SHARED.lastAlert == "Could not write backup archive."
+
+    # Successful backup with progress
+    progress = []
+    with monkeypatch.context() as mp:
+        mp.setattr(project, "_backupProgress", lambda *a: progress.append(a))
+        assert project.backupProject(doNotify=True) is True
+        waitForBackup()
+
+    backup = NWBackup(snapPath)
+    snapshots = backup.listSnapshots()
+    assert len(snapshots) == 1
+    assert backup.readManifest(snapshots[0])["meta"]["name"] == "Test Minimal"  # type: ignore
+
+    files = project.storage.listProjectFiles()
+    assert progress[-1] == (len(files), len(files))
+
+    project.closeProject()
+
+# END Test testCoreBackup_Project
@@ -0,0 +1,49 @@
+"""
+novelWriter – Benchmark Project Generator Tester
+================================================
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import pytest
+
+from tests.benchmark.generator import BenchProject
+from tests.tools import NWD_IGNORE, cmpFiles
+
+
+@pytest.mark.core
+def testBenchProject_Generator(fncPath, mockGUI):
+    """Check that the benchmark project generator is deterministic and
+    produces a project of the requested size.
+    """
+    pathA = BenchProject(documents=12, words=200, tags=6, references=2).build(fncPath / "a")
+    pathB = BenchProject(documents=12, words=200, tags=6, references=2).build(fncPath / "b")
+
+    docsA = sorted(p.name for p in (pathA / "content").iterdir())
+    docsB = sorted(p.name for p in (pathB / "content").iterdir())
+    assert docsA == docsB
+    assert len(docsA) == 1 + 2 + 6 + 12  # Title, chapters, notes, scenes
+    for name in docsA:
+        assert cmpFiles(pathA / "content" / name, pathB / "content" / name, ignoreStart=NWD_IGNORE)
+
+    # A different seed gives different content
+    pathC = BenchProject(documents=12, words=200, tags=6, seed=1).build(fncPath / "c")
+    docsC = sorted(p.name for p in (pathC / "content").iterdir())
+    assert docsC != docsA
+
+# END Test testBenchProject_Generator
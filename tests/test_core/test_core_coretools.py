@@ -482,6 +482,172 @@ def testCoreTools_DocSearch(monkeypatch, mockGUI, fncPath, mockRnd, ipsumText):
 # END Test testCoreTools_DocSearch
 
 
+@pytest.mark.core
+def testCoreTools_DocSearchTrigrams(monkeypatch, mockGUI, fncPath, mockRnd):
+    """Test the trigram filter of the DocSearch utility."""
+    project = NWProject()
+    mockRnd.reset()
+    buildTestProject(project, fncPath)
+    project.storage.getDocument(C.hSceneDoc).writeDocument("### Scene\n\nAlice met Bob.\n")
+    project.index.rebuildIndex()
+
+    search = DocSearch()
+
+    # Plain Text
+    assert search._requiredTrigrams("Al") == set()
+    assert search._requiredTrigrams("Alice") == {"ali", "lic", "ice"}
+
+    # RegEx
+    search.setUserRegEx(True)
+    literals = search._regExLiterals
+    assert literals(r"Alice\b") == ["Alice"]
+    assert literals(r"Alice\.met+") == ["Alice.met"]
+    assert literals(r"Alic?e") == ["Ali", "e"]
+    assert literals(r"A*lice") == ["lice"]
+    assert literals(r"Al{1,2}ice") == ["A", "ice"]
+    assert literals(r"A.ice\s[bB]ob") == ["A", "ice", "ob"]
+    assert literals(r"[]a\]]bcd[[:alpha:]]efg") == ["bcd", "efg"]
+    assert literals(r"^Alice(?: met)? Bob$") == ["Alice", " Bob"]
+    assert literals(r"(?i)Alice") == ["Alice"]
+    assert literals(r"(?x:a b)cde") == ["cde"]
+
+    # Constructs that are not handled give no literals
+    assert literals(r"Alice|Bob") == []
+    assert literals(r"(?x)Alice") == []
+    assert literals(r"(?#comment)Alice") == []
+    assert literals(r"\QAlice\E") == []
+    assert literals(r"\p{Lu}lice") == []
+    assert literals("Alice\\") == []
+    assert literals(r"Alice)") == []
+    assert literals(r"Alice[abc") == []
+    assert literals(r"[[:alpha:Alice") == []
+    assert literals(r"Alice{2") == []
+
+    assert search._requiredTrigrams(r"Alice|Bob") == set()
+    assert search._requiredTrigrams(r"\bAlice\s+Met") == {"ali", "lic", "ice", "met"}
+
+    # Searching skips documents without the trigrams
+    read = []
+    getText = project.storage.getDocumentText
+    with monkeypatch.context() as mp:
+        mp.setattr(project.storage, "getDocumentText", lambda h: read.append(h) or getText(h))
+        search.setUserRegEx(False)
+        result = [(i.itemHandle, r) for i, r, _ in search.iterSearch(project, "Alice")]
+        assert result[0] == (C.hTitlePage, [])
+        assert result[2] == (C.hSceneDoc, [(11, 5, "Alice met Bob.")])
+        assert read == [C.hSceneDoc]
+
+        # Case insensitive trigrams also match case sensitive searches
+        read.clear()
+        search.setCaseSensitive(True)
+        assert [r for _, r, _ in search.iterSearch(project, "alice")][2] == []
+        assert read == [C.hSceneDoc]
+        search.setCaseSensitive(False)
+
+        # Without literals, all documents are searched
+        read.clear()
+        search.setUserRegEx(True)
+        result = [(i.itemHandle, r) for i, r, _ in search.iterSearch(project, "Alice|Bob")]
+        assert result[2] == (C.hSceneDoc, [(11, 5, "Alice met Bob."), (21, 3, "Bob.")])
+        assert len(read) == len(result)
+
+        # Replace skips them too
+        read.clear()
+        search.setUserRegEx(False)
+        result = list(search.iterReplace(project, "Alice", "Mary"))
+        assert [r.handle for r in result] == [C.hSceneDoc]
+        assert read == [C.hSceneDoc]
+
+# END Test testCoreTools_DocSearchTrigrams
+
+
+@pytest.mark.core
+def testCoreTools_DocReplace(monkeypatch, caplog, mockGUI, fncPath, mockRnd):
+    """Test the replace functions of the DocSearch utility."""
+    project = NWProject()
+    mockRnd.reset()
+    buildTestProject(project, fncPath)
+    storage = project.storage
+    storage.getDocument(C.hChapterDoc).writeDocument("## Chapter\n\nAlice met alice.\n")
+    storage.getDocument(C.hSceneDoc).writeDocument("### Scene\n\nALICE \U0001f600 Alice!\n")
+
+    search = DocSearch()
+
+    # Replace Text
+    # ============
+
+    search._regEx.setPattern(search._buildPattern("jane"))
+    assert search.replaceText("Jane and jane", "Mary") == ("Mary and Mary", 2)
+    assert search.replaceText("No match", "Mary") == ("No match", 0)
+
+    # Positions after astral characters are mapped correctly
+    assert search.replaceText("\U0001f600 Jane \U0001f600 jane", "Mary") == (
+        "\U0001f600 Mary \U0001f600 Mary", 2
+    )
+
+    # Transfer case
+    search.setMatchCap(True)
+    assert search.replaceText("Jane, jane, JANE", "mary") == ("Mary, mary, MARY", 3)
+    search.setMatchCap(False)
+
+    # Empty matches are skipped
+    search.setUserRegEx(True)
+    search._regEx.setPattern(search._buildPattern("x*"))
+    assert search.replaceText("abc", "y") == ("abc", 0)
+    search.setUserRegEx(False)
+
+    # Iterate Replace
+    # ===============
+
+    search.setCaseSensitive(True)
+    result = list(search.iterReplace(project, "Alice", "Mary"))
+    assert [(r.handle, r.count) for r in result] == [(C.hChapterDoc, 1), (C.hSceneDoc, 1)]
+    assert result[0].newText == "## Chapter\n\nMary met alice.\n"
+    assert result[0].diffLines() == ["@@ -3 +3 @@", "-Alice met alice.", "+Mary met alice."]
+
+    search.setCaseSensitive(False)
+    result = list(search.iterReplace(project, "Alice", "Mary"))
+    assert [(r.handle, r.count) for r in result] == [(C.hChapterDoc, 2), (C.hSceneDoc, 2)]
+
+    # Nothing has been written yet
+    assert storage.getDocumentText(C.hChapterDoc) == "## Chapter\n\nAlice met alice.\n"
+
+    # Write Replacements
+    # ==================
+
+    # A document changed after the preview is skipped
+    storage.getDocument(C.hSceneDoc).writeDocument("### Scene\n\nAlice was here.\n")
+
+    caplog.clear()
+    scanned = []
+    with monkeypatch.context() as mp:
+        mp.setattr(project.index, "scanText", lambda h, t, **k: scanned.append(h))
+        assert search.writeReplacements(project, result) == [C.hChapterDoc]
+    assert "changed before replace" in caplog.text
+    assert scanned == [C.hChapterDoc]
+
+    assert storage.getDocumentText(C.hChapterDoc) == "## Chapter\n\nMary met Mary.\n"
+    assert storage.getDocumentText(C.hSceneDoc) == "### Scene\n\nAlice was here.\n"
+
+    # Failing to write is reported
+    result = list(search.iterReplace(project, "Alice", "Mary"))
+    caplog.clear()
+    with monkeypatch.context() as mp:
+        mp.setattr("novelwriter.core.document.NWDocument.writeDocument", lambda *a: False)
+        assert search.writeReplacements(project, result) == []
+    assert "Failed to write document" in caplog.text
+
+    assert search.writeReplacements(project, result) == [C.hSceneDoc]
+    assert storage.getDocumentText(C.hSceneDoc) == "### Scene\n\nMary was here.\n"
+
+    # The index is updated
+    result = list(search.iterReplace(project, "Scene", "Part"))
+    assert search.writeReplacements(project, result) == [C.hSceneDoc]
+    assert project.index.getItemHeading(C.hSceneDoc, "T0001").title == "Part"
+
+# END Test testCoreTools_DocReplace
+
+
 @pytest.mark.core
 def testCoreTools_ProjectBuilderWrapper(monkeypatch, caplog, fncPath, mockGUI):
     """Test the wrapper function of the project builder."""
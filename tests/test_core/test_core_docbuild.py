@@ -601,3 +601,86 @@ def testCoreDocBuild_IterBuild(mockGUI, fncPath: Path, mockRnd):
     docFile.unlink()
 
 # END Test testCoreDocBuild_IterBuild
+
+
+@pytest.mark.core
+def testCoreDocBuild_PreviewCache(monkeypatch, mockGUI, prjLipsum):
+    """Test incremental preview builds using the fragment cache."""
+    project = NWProject()
+    project.openProject(prjLipsum)
+
+    build = BuildSettings()
+    build.unpack(BUILD_CONF)
+    build.setValue("headings.fmtChapter", "Chapter {Chapter}: {Title}")
+
+    def runPreview(previous: dict | None = None) -> tuple[dict, list[str]]:
+        built = []
+        doBuild = NWBuildDocument._doBuild
+
+        def mockBuild(self, bldObj, tHandle, *args, **kwargs):
+            built.append(tHandle)
+            return doBuild(self, bldObj, tHandle, *args, **kwargs)
+
+        docBuild = NWBuildDocument(project, build)
+        docBuild.setPreviewMode(True)
+        docBuild.queueAll()
+        if previous:
+            docBuild.setPreviewCache(previous)
+        with monkeypatch.context() as mp:
+            mp.setattr(NWBuildDocument, "_doBuild", mockBuild)
+            for _ in docBuild.iterBuildHTML(None):
+                pass
+        buildObj = docBuild.lastBuild
+        assert isinstance(buildObj, ToHtml)
+        result = json.loads(json.dumps({
+            "stats": buildObj.textStats,
+            "outline": buildObj.textOutline,
+            "html": buildObj.fullHTML,
+            "fragments": docBuild.previewCache,
+        }))
+        return result, built
+
+    # Add a footnote to a scene
+    hScene = "88d59a277361b"
+    text = project.storage.getDocumentText(hScene)
+    text += "\n\nText with a footnote[footnote:a1b2].\n\n%Footnote.a1b2: The note.\n"
+    project.storage.getDocument(hScene).writeDocument(text)
+    project.index.reIndexHandle(hScene)
+
+    # First build processes everything
+    first, built = runPreview()
+    assert len(built) == 19
+    assert len(first["fragments"]["docs"]) == 19
+    assert "<li id='footnote_2'><p>The note.</p></li>" in first["html"][-1]
+
+    # Second build re-uses everything
+    second, built = runPreview(first)
+    assert built == []
+    assert second["html"] == first["html"]
+    assert second["stats"] == first["stats"]
+    assert second["outline"] == first["outline"]
+
+    # Changing a document only rebuilds that document
+    text = project.storage.getDocumentText(hScene)
+    project.storage.getDocument(hScene).writeDocument(text + "\nMore text.\n")
+    third, built = runPreview(second)
+    assert built == [hScene]
+    assert third["stats"]["allWords"] == first["stats"]["allWords"] + 2
+    assert "More text." in "".join(third["html"])
+
+    # The result is the same as a clean build
+    clean, _ = runPreview()
+    assert third["html"] == clean["html"]
+    assert third["stats"] == clean["stats"]
+    assert third["outline"] == clean["outline"]
+
+    # Changing the build settings invalidates the cache
+    build.setValue("headings.fmtChapter", "Chapter {Chapter}")
+    _, built = runPreview(third)
+    assert len(built) == 19
+
+    # Invalid cache data is ignored
+    _, built = runPreview({"fragments": None, "html": None})
+    assert len(built) == 19
+
+# END Test testCoreDocBuild_PreviewCache
@@ -28,7 +28,10 @@ import pytest
 
 from novelwriter import SHARED
 from novelwriter.constants import nwFiles
-from novelwriter.core.index import IndexItem, NWIndex, TagsIndex, _checkModKey, processComment
+from novelwriter.core.index import (
+    IndexItem, ItemIndex, NWIndex, TagsIndex, TrigramIndex, _checkModKey, processComment,
+    textTrigrams
+)
 from novelwriter.core.item import NWItem
 from novelwriter.core.project import NWProject
 from novelwriter.enum import nwComment, nwItemClass, nwItemLayout
@@ -553,6 +556,54 @@ def testCoreIndex_ScanText(monkeypatch, mockGUI, fncPath, mockRnd):
 # END Test testCoreIndex_ScanText
 
 
+@pytest.mark.core
+def testCoreIndex_MovedHandle(monkeypatch, mockGUI, fncPath, mockRnd):
+    """Check updating the index for moved items."""
+    project = NWProject()
+    mockRnd.reset()
+    buildTestProject(project, fncPath)
+    index = project.index
+    tree = project.tree
+
+    cHandle = project.newFile("Jane", C.hCharRoot)
+    assert isinstance(cHandle, str)
+    assert project.writeNewFile(cHandle, 1, False, "# Jane\n\n@tag: Jane\n\n")
+    index.reIndexHandle(cHandle)
+    assert index._tagsIndex.tagClass("Jane") == "CHARACTER"
+
+    def moveItem(pHandle):
+        oldRoot = tree[cHandle].itemRoot  # type: ignore
+        wasActive = not tree[cHandle].isInactiveClass()  # type: ignore
+        tree.setItemParent(cHandle, pHandle)
+        tree.updateSubTree(cHandle)
+        return index.updateMovedHandle(cHandle, oldRoot, wasActive)
+
+    # Moving between active roots only updates the tag class
+    with monkeypatch.context() as mp:
+        mp.setattr(project.storage, "getDocumentText", causeException)
+        assert moveItem(C.hWorldRoot) is False
+    assert index._tagsIndex.tagClass("Jane") == "WORLD"
+    assert index._tagsIndex.tagHandle("Jane") == cHandle
+    assert index.rootChangedSince(C.hCharRoot, 0) is True
+    assert index.rootChangedSince(C.hWorldRoot, 0) is True
+
+    # Moving to the archive removes the item from the index
+    aHandle = project.newRoot(nwItemClass.ARCHIVE)
+    assert moveItem(aHandle) is False
+    assert "Jane" not in index._tagsIndex
+    assert cHandle not in index._itemIndex
+
+    # Moving it back requires a re-scan
+    assert moveItem(C.hCharRoot) is True
+    assert index._tagsIndex.tagClass("Jane") == "CHARACTER"
+
+    # Unknown and folder items are ignored
+    assert index.updateMovedHandle("0000000000000", None, True) is False
+    assert index.updateMovedHandle(C.hCharRoot, None, True) is False
+
+# END Test testCoreIndex_MovedHandle
+
+
 @pytest.mark.core
 def testCoreIndex_CommentKeys(monkeypatch, mockGUI, fncPath, mockRnd):
     """Check the index comment key generator."""
@@ -736,6 +787,46 @@ def testCoreIndex_ExtractData(mockGUI, fncPath, mockRnd):
     # ============
     assert index.getClassTags(nwItemClass.CHARACTER) == ["Jane", "John"]
 
+    # completeTags
+    # ============
+    # Jane is referenced twice, John once
+    assert index._itemIndex.referenceCounts() == {"jane": 2, "john": 1}
+    assert index.completeTags(nwItemClass.CHARACTER, "") == ["Jane", "John"]
+    assert index.completeTags(nwItemClass.CHARACTER, "J") == ["Jane", "John"]
+    assert index.completeTags(nwItemClass.CHARACTER, "J", 1) == ["Jane"]
+    assert index.completeTags(nwItemClass.CHARACTER, "ohn") == ["John"]
+    assert index.completeTags(nwItemClass.CHARACTER, "smith") == []
+    assert index.completeTags(nwItemClass.PLOT, "j") == []
+
+    # Counts are updated when references change
+    assert index.scanText(nHandle, (
+        "# Hello World!\n"
+        "@pov: John\n"
+        "@char: Jane, John\n\n"
+        "% this is a comment\n\n"
+        "This is a story about Jane Smith.\n\n"
+        "Well, not really.\n"
+    ))
+    assert index.completeTags(nwItemClass.CHARACTER, "j") == ["John", "Jane"]
+    assert index._itemIndex.referenceCounts() == {"jane": 1, "john": 2}
+
+    # Rescanning the same text does not change the counts, and they
+    # match the counts of a fresh index
+    refText = index._itemIndex.referenceCounts().copy()
+    assert index.scanText(nHandle, (
+        "# Hello World!\n"
+        "@pov: John\n"
+        "@char: Jane, John\n\n"
+    ))
+    assert index._itemIndex.referenceCounts() == refText
+    itemIndex = ItemIndex(project)
+    itemIndex.unpackData(index._itemIndex.packData())
+    assert itemIndex.referenceCounts() == refText
+
+    # Removing an item subtracts its references
+    del itemIndex[nHandle]
+    assert itemIndex.referenceCounts() == {}
+
     # getTagsData
     # ===========
     assert list(index.getTagsData()) == [(
@@ -747,6 +838,10 @@ def testCoreIndex_ExtractData(mockGUI, fncPath, mockRnd):
         index.getItemData(dHandle),
         index.getItemHeading(dHandle, "T0001")
     )]
+    assert [t[0] for t in index.getTagsData(itemClass=nwItemClass.CHARACTER)] == [
+        "jane", "john"
+    ]
+    assert list(index.getTagsData(itemClass=nwItemClass.WORLD)) == []
 
     # getItemHeading
     # ==============
@@ -1016,6 +1111,61 @@ def testCoreIndex_TagsIndex():
     # Pack Data
     assert tagsIndex.packData() == content
 
+    # Sorted class keys
+    tagsIndex.add("Alpha", "Alpha", "0000000000004", "T0001", "CHARACTER")
+    tagsIndex.add("beta", "beta", "0000000000004", "T0002", "CHARACTER")
+    assert tagsIndex.classKeys("CHARACTER") == ["alpha", "beta", "tag2"]
+    assert tagsIndex.classKeys("WORLD") == []
+
+    # Changing the class of a tag moves the key
+    tagsIndex.add("Beta", "Beta", "0000000000004", "T0002", "WORLD")
+    assert tagsIndex.classKeys("CHARACTER") == ["alpha", "tag2"]
+    assert tagsIndex.classKeys("WORLD") == ["beta"]
+    del tagsIndex["Alpha"]
+    del tagsIndex["beta"]
+    assert tagsIndex.classKeys("CHARACTER") == ["tag2"]
+    assert tagsIndex.classKeys("WORLD") == []
+    assert tagsIndex.packData() == content
+
+    # Versions and class sets
+    version = tagsIndex.version
+    assert tagsIndex.classSet("CHARACTER") == frozenset(["tag2"])
+    assert tagsIndex.changedSince(["tag2", "tag3"], version) is False
+
+    # Re-adding an unchanged tag does not change the version
+    tagsIndex.add("Tag2", "Tag 2", "0000000000002", "T0002", "CHARACTER")
+    assert tagsIndex.version == version
+
+    # Changing the handle or class of a tag does
+    tagsIndex.add("Tag2", "Tag 2", "0000000000004", "T0002", "CHARACTER")
+    assert tagsIndex.version == version + 1
+    assert tagsIndex.changedSince(["tag2"], version) is True
+    assert tagsIndex.changedSince(["tag3"], version) is False
+    assert tagsIndex.changedSince(["tag2"], tagsIndex.version) is False
+    tagsIndex.add("Tag2", "Tag 2", "0000000000002", "T0002", "CHARACTER")
+
+    version = tagsIndex.version
+    tagsIndex.add("Gamma", "Gamma", "0000000000004", "T0003", "PLOT")
+    assert tagsIndex.classSet("PLOT") == frozenset(["gamma", "tag3"])
+    assert tagsIndex.changedSince(["gamma"], version) is True
+
+    # Substring matching
+    assert tagsIndex.matchClassKeys("PLOT", "") == frozenset(["gamma", "tag3"])
+    assert tagsIndex.matchClassKeys("PLOT", "A") == {"gamma", "tag3"}
+    assert tagsIndex.matchClassKeys("PLOT", "mm") == {"gamma"}
+    assert tagsIndex.matchClassKeys("PLOT", "Gamma") == {"gamma"}
+    assert tagsIndex.matchClassKeys("PLOT", "gammas") == set()
+    assert tagsIndex.matchClassKeys("PLOT", "amag") == set()
+    assert tagsIndex.matchClassKeys("WORLD", "a") == set()
+
+    del tagsIndex["Gamma"]
+    assert tagsIndex.classSet("PLOT") == frozenset(["tag3"])
+    assert tagsIndex.matchClassKeys("PLOT", "a") == {"tag3"}
+    assert tagsIndex.matchClassKeys("PLOT", "mm") == set()
+    assert "mm" not in tagsIndex._grams["PLOT"]
+    assert tagsIndex.classSet("CHARACTER") == frozenset(["tag2"])
+    assert tagsIndex.packData() == content
+
     # Delete the second key and a non-existant key
     del tagsIndex["Tag2"]
     del tagsIndex["Tag4"]
@@ -1023,15 +1173,19 @@ def testCoreIndex_TagsIndex():
     assert "Tag2" not in tagsIndex
     assert "Tag3" in tagsIndex
     assert "Tag4" not in tagsIndex
+    assert tagsIndex.classKeys("CHARACTER") == []
 
     # Clear and reload
+    version = tagsIndex.version
     tagsIndex.clear()
     assert tagsIndex._tags == {}
     assert tagsIndex.packData() == {}
+    assert tagsIndex.changedSince([], version) is True
 
     tagsIndex.unpackData(content)
     assert tagsIndex._tags == content
     assert tagsIndex.packData() == content
+    assert tagsIndex.classKeys("NOVEL") == ["tag1"]
 
     # Unpack Errors
     # =============
@@ -1122,6 +1276,125 @@ def testCoreIndex_TagsIndex():
 # END Test testCoreIndex_TagsIndex
 
 
+@pytest.mark.core
+def testCoreIndex_TrigramIndex(monkeypatch, mockGUI, fncPath, mockRnd):
+    """Check the TrigramIndex class and how the project index keeps and
+    caches it.
+    """
+    # Trigrams
+    assert textTrigrams("") == set()
+    assert textTrigrams("ab") == set()
+    assert textTrigrams("Abcd") == {"abc", "bcd"}
+    assert textTrigrams("Straße") == {"str", "tra", "ras", "ass", "sse"}
+
+    # Class
+    stamp = (1, 11)
+    textIndex = TrigramIndex()
+    assert textIndex.mayContain("0000000000000", {"abc"}, stamp) is True
+
+    textIndex.add("0000000000000", "Hello World", stamp)
+    assert "0000000000000" in textIndex
+    assert textIndex.isCurrent("0000000000000", stamp) is True
+    assert textIndex.mayContain("0000000000000", set(), stamp) is True
+    assert textIndex.mayContain("0000000000000", {"hel", "wor"}, stamp) is True
+    assert textIndex.mayContain("0000000000000", {"hel", "xyz"}, stamp) is False
+
+    # If the file has changed, the entry is not used
+    assert textIndex.isCurrent("0000000000000", (2, 11)) is False
+    assert textIndex.mayContain("0000000000000", {"hel", "xyz"}, (2, 11)) is True
+
+    packed = textIndex.packData()
+    assert packed == {
+        "0000000000000": [1, 11, " wo"+"ell"+"hel"+"llo"+"lo "+"o w"+"orl"+"rld"+"wor"]
+    }
+
+    textIndex.clear()
+    textIndex.unpackData(packed)
+    assert textIndex.isCurrent("0000000000000", stamp) is True
+    assert textIndex.mayContain("0000000000000", {"hel", "xyz"}, stamp) is False
+
+    del textIndex["0000000000000"]
+    del textIndex["0000000000000"]
+    assert "0000000000000" not in textIndex
+
+    # Invalid data
+    with pytest.raises(ValueError):
+        textIndex.unpackData([])  # type: ignore
+    with pytest.raises(ValueError):
+        textIndex.unpackData({"stuff": [0, 0, "abc"]})
+    with pytest.raises(ValueError):
+        textIndex.unpackData({"0000000000000": "abc"})
+    with pytest.raises(ValueError):
+        textIndex.unpackData({"0000000000000": ["0", 0, "abc"]})
+    with pytest.raises(ValueError):
+        textIndex.unpackData({"0000000000000": [0, 0, "abcd"]})
+
+    # Project Index
+    project = NWProject()
+    mockRnd.reset()
+    buildTestProject(project, fncPath)
+    index = project.index
+    index.reIndexHandle(C.hSceneDoc)
+    assert index.textMayContain(C.hSceneDoc, {"sce"}) is True
+    assert index.textMayContain(C.hSceneDoc, {"xyz"}) is False
+
+    # A document written without re-indexing is not skipped
+    project.storage.getDocument(C.hSceneDoc).writeDocument("Some xyz text")
+    assert index.textMayContain(C.hSceneDoc, {"xyz"}) is True
+    assert index.textMayContain(C.hSceneDoc, {"qqq"}) is True
+
+    # Files without a layout are also searchable
+    with monkeypatch.context() as mp:
+        mp.setattr(project.tree[C.hSceneDoc], "_layout", nwItemLayout.NO_LAYOUT)
+        index.reIndexHandle(C.hSceneDoc)
+    assert index.textMayContain(C.hSceneDoc, {"xyz"}) is True
+    assert index.textMayContain(C.hSceneDoc, {"qqq"}) is False
+
+    index.deleteHandle(C.hSceneDoc)
+    assert C.hSceneDoc not in index._textIndex
+
+    # Save and load
+    index.rebuildIndex()
+    assert index.saveIndex() is True
+    textFile = fncPath / "meta" / nwFiles.TRIGRAM_FILE
+    assert textFile.exists()
+
+    index.clearIndex()
+    assert C.hChapterDoc not in index._textIndex
+    assert index.loadIndex() is True
+    assert index.textMayContain(C.hChapterDoc, {"new"}) is True
+    assert index.textMayContain(C.hChapterDoc, {"xyz"}) is False
+
+    # A document changed after the save is rebuilt on load
+    project.storage.getDocument(C.hChapterDoc).writeDocument("## Chapter xyz\n\n")
+    assert index.loadIndex() is True
+    assert index._textIndex.isCurrent(C.hChapterDoc, index._fileStamp(C.hChapterDoc))
+    assert index.textMayContain(C.hChapterDoc, {"xyz"}) is True
+    assert index.textMayContain(C.hChapterDoc, {"qqq"}) is False
+
+    # A broken cache file is rebuilt
+    textFile.write_text("{broken", encoding="utf-8")
+    assert index.loadIndex() is True
+    assert index.indexBroken is False
+    assert index.textMayContain(C.hChapterDoc, {"xyz"}) is True
+    assert index.textMayContain(C.hChapterDoc, {"qqq"}) is False
+
+    # Failing to save the cache file fails the save
+    with monkeypatch.context() as mp:
+        mp.setattr(json, "dump", causeException)
+        assert index.saveIndex() is False
+
+    # No file or no content folder
+    assert index._fileStamp("0000000000000") == (0, 0)
+    with monkeypatch.context() as mp:
+        mp.setattr("novelwriter.core.storage.NWStorage.contentPath", None)
+        assert index._fileStamp(C.hChapterDoc) == (0, 0)
+
+    project.closeProject()
+
+# END Test testCoreIndex_TrigramIndex
+
+
 @pytest.mark.core
 def testCoreIndex_ItemIndex(mockGUI, fncPath, mockRnd):
     """Check the ItemIndex class."""
@@ -28,6 +28,7 @@ from zipfile import ZipFile
 from mocked import causeOSError
 from tools import C, cmpFiles, buildTestProject, XML_IGNORE
 
+from PyQt5.QtCore import QCoreApplication, QThreadPool
 from PyQt5.QtWidgets import QMessageBox
 
 from novelwriter import CONFIG, SHARED
@@ -519,6 +520,11 @@ def testCoreProject_Backup(monkeypatch, mockGUI, fncPath, tstPaths):
     """
     project = NWProject()
 
+    def waitForBackup():
+        QThreadPool.globalInstance().waitForDone()
+        QCoreApplication.processEvents()
+        assert not project._backups
+
     # No Project
     assert project.backupProject(doNotify=False) is False
 
@@ -542,13 +548,27 @@ def testCoreProject_Backup(monkeypatch, mockGUI, fncPath, tstPaths):
         mp.setattr("pathlib.Path.mkdir", causeOSError)
         assert project.backupProject(doNotify=False) is False
 
-    # Can't write archive
+    # Can't stage files
     with monkeypatch.context() as mp:
-        mp.setattr("zipfile.ZipFile.write", causeOSError)
+        mp.setattr("novelwriter.core.backup.shutil.copy2", causeOSError)
         assert project.backupProject(doNotify=False) is False
+        assert SHARED.lastAlert.startswith("Could not prepare the project backup.")
+
+    # Can't write archive, which is reported when the backup finishes
+    SHARED._lastAlert = ""
+    with monkeypatch.context() as mp:
+        mp.setattr("zipfile.ZipFile.write", causeOSError)
+        assert project.backupProject(doNotify=False) is True
+        waitForBackup()
+    assert SHARED.lastAlert == "Could not write backup archive."
+
+    # Remove the failed archive
+    for path in (tstPaths.tmpDir / "Test Minimal").iterdir():
+        path.unlink()
 
     # Test correct settings
     assert project.backupProject(doNotify=True) is True
+    waitForBackup()
 
     files = sorted((tstPaths.tmpDir / "Test Minimal").iterdir())
     assert len(files) in (1, 2)  # Sometimes 2 due to clock tick
@@ -567,4 +587,20 @@ def testCoreProject_Backup(monkeypatch, mockGUI, fncPath, tstPaths):
         tstPaths.tmpDir / "extract" / "nwProject.nwx"
     )
 
+    # The backup is made from a staged copy, which is deleted when the
+    # backup is done, and the project can be closed while it runs
+    staged = []
+    with monkeypatch.context() as mp:
+        mp.setattr("novelwriter.core.project.mkdtemp", lambda **k: str(fncPath / "staged"))
+        mp.setattr(
+            "novelwriter.core.project.zipFiles",
+            lambda files, *a: staged.extend(p.read_bytes() for p, _ in files) or True
+        )
+        (fncPath / "staged").mkdir()
+        assert project.backupProject(doNotify=False) is True
+        project.closeProject()
+        waitForBackup()
+    assert len(staged) > 0
+    assert not (fncPath / "staged").exists()
+
 # END Test testCoreProject_Backup
@@ -21,6 +21,7 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
 import json
+import xml.etree.ElementTree as ET
 
 from datetime import datetime
 from shutil import copyfile
@@ -992,3 +993,69 @@ def testCoreProjectXML_ReadLegacy14(tstPaths, fncPath, mockGUI, mockRnd):
     assert cmpFiles(testFile, compFile)
 
 # END Test testCoreProjectXML_ReadLegacy14
+
+
+@pytest.mark.core
+def testCoreProjectXML_Streaming(mockGUI, fncPath):
+    """Test that the streamed project XML matches the output of the
+    ElementTree writer, and that the reader can pass items to a
+    function as they are read.
+    """
+    xmlFile = fncPath / nwFiles.PROJ_FILE
+    refFile = fncPath / "reference.nwx"
+
+    data = NWProjectData(MockProject())  # type: ignore
+    data.setName("Tom & Jerry's <Project>")
+    data.setAuthor("Jane \"Smith\"")
+    data.setLastHandles({"editor": "0000000000001"})
+    data.setAutoReplace({"A&B": "<C>", "Æøå": "“quoted”"})
+    data.itemStatus.add(None, "New & Old", (100, 100, 100), "SQUARE", 0)
+    data.itemImport.add(None, "\"Main\"", (100, 100, 100), "CIRCLE", 0)
+
+    content = []
+    for i in range(50):
+        content.append({
+            "name": f"Item <{i}> & \"more\"" if i % 2 else "",
+            "itemAttr": {"handle": f"{i:013x}", "parent": "None", "order": str(i)},
+            "metaAttr": {"expanded": "no", "heading": "H1", "wordCount": str(i)},
+            "nameAttr": {"status": "s000000", "import": "i000000", "active": "yes"},
+        })
+
+    # The streamed file should be identical to one written by the
+    # ElementTree writer after parsing the file with whitespace intact
+    xmlWriter = ProjectXMLWriter(xmlFile)
+    assert xmlWriter.write(data, content, 0.0, 1000) is True
+    xml = ET.parse(xmlFile)
+    xml.getroot().tail = "\n"
+    xml.write(refFile, encoding="utf-8", xml_declaration=True)
+    assert xmlFile.read_bytes() == refFile.read_bytes()
+
+    # And the same with no content
+    assert xmlWriter.write(data, [], 0.0, 1000) is True
+    xml = ET.parse(xmlFile)
+    xml.getroot().tail = "\n"
+    xml.write(refFile, encoding="utf-8", xml_declaration=True)
+    assert xmlFile.read_bytes() == refFile.read_bytes()
+
+    # Read back the items with a function
+    assert xmlWriter.write(data, content, 0.0, 1000) is True
+    items = []
+    newData = NWProjectData(MockProject())  # type: ignore
+    xmlReader = ProjectXMLReader(xmlFile)
+    assert xmlReader.read(newData, items.append) is True
+    assert xmlReader.state == XMLReadState.PARSED_OK
+    assert newData.name == "Tom & Jerry's <Project>"
+    assert newData.author == "Jane \"Smith\""
+    assert newData.autoReplace == {"A&B": "<C>", "Æøå": "“quoted”"}
+    assert len(items) == 50
+    assert items[0]["name"] == ""
+    assert items[1]["name"] == "Item <1> & \"more\""
+    assert items[49]["itemAttr"]["order"] == 49
+    assert items[49]["metaAttr"]["wordCount"] == 49
+
+    # A broken file stops the read
+    xmlFile.write_text(xmlFile.read_text(encoding="utf-8")[:-40], encoding="utf-8")
+    assert xmlReader.read(newData, []) is False
+    assert xmlReader.state == XMLReadState.CANNOT_PARSE
+
+# END Test testCoreProjectXML_Streaming
@@ -22,7 +22,7 @@ from __future__ import annotations
 
 import pytest
 
-from time import sleep
+from time import localtime, mktime, sleep
 from pathlib import Path
 
 from tools import buildTestProject
@@ -39,7 +39,8 @@ def testCoreSessions_Main(monkeypatch, mockGUI, fncPath):
     project = NWProject()
     buildTestProject(project, fncPath)
 
-    logFile = project.storage.getMetaFile(nwFiles.SESS_FILE)
+    year = localtime().tm_year
+    logFile = project.storage.getMetaFile(f"{nwFiles.SESS_PREFIX}{year}{nwFiles.SESS_EXT}")
     assert isinstance(logFile, Path)
 
     # Set some mock word counts
@@ -113,3 +114,130 @@ def testCoreSessions_Main(monkeypatch, mockGUI, fncPath):
         assert len(list(sessLog.iterRecords())) == 0
 
 # END Test testCoreSessions_Main
+
+
+@pytest.mark.core
+def testCoreSessions_Segments(monkeypatch, mockGUI, fncPath):
+    """Test the yearly segments and the migration from JSON Lines."""
+    project = NWProject()
+    buildTestProject(project, fncPath)
+    sessLog = project.session
+
+    metaPath = fncPath / "meta"
+    jsonFile = metaPath / nwFiles.SESS_FILE
+    thisYear = localtime().tm_year
+    lastYear = thisYear - 1
+    record = sessLog.createRecord
+
+    # Write a legacy log spanning two years, with an invalid record and
+    # a record with missing and malformed values
+    jsonFile.write_text("".join([
+        sessLog.createInitial(100),
+        record(f"{lastYear}-12-31 20:00:00", f"{lastYear}-12-31 21:00:00", 150, 0, 5),
+        "{\"type\": \"record\", \"start\": \"bad\"}\n",
+        record(f"{thisYear}-01-01 20:00:00", f"{thisYear}-01-01 21:00:00", 200, 10, 0),
+        f"{{\"type\": \"record\", \"start\": \"{thisYear}-01-01 22:00:00\", "
+        f"\"end\": \"{thisYear}-01-01 23:00:00\", \"novel\": \"x\", \"notes\": 20}}\n",
+    ]), encoding="utf-8")
+
+    # Reading the log migrates it, and keeps a backup since a line was
+    # skipped
+    records = list(sessLog.iterRecords())
+    assert jsonFile.exists() is False
+    assert (metaPath / f"{nwFiles.SESS_FILE}.bak").is_file()
+    assert records == [
+        {"type": "initial", "offset": 100},
+        {
+            "type": "record", "start": f"{lastYear}-12-31 20:00:00",
+            "end": f"{lastYear}-12-31 21:00:00", "novel": 150, "notes": 0, "idle": 5,
+        },
+        {
+            "type": "record", "start": f"{thisYear}-01-01 20:00:00",
+            "end": f"{thisYear}-01-01 21:00:00", "novel": 200, "notes": 10, "idle": 0,
+        },
+        {
+            "type": "record", "start": f"{thisYear}-01-01 22:00:00",
+            "end": f"{thisYear}-01-01 23:00:00", "novel": 0, "notes": 20, "idle": 0,
+        },
+    ]
+
+    # The past year is closed and compressed
+    oldSeg = metaPath / f"{nwFiles.SESS_PREFIX}{lastYear}{nwFiles.SESS_EXT}.gz"
+    newSeg = metaPath / f"{nwFiles.SESS_PREFIX}{thisYear}{nwFiles.SESS_EXT}"
+    assert oldSeg.is_file()
+    assert newSeg.is_file()
+    assert not oldSeg.with_suffix("").exists()
+
+    # The segments are part of the project files
+    relPaths = [r for _, r in project.storage.listProjectFiles()]
+    assert f"meta/{oldSeg.name}" in relPaths
+    assert f"meta/{newSeg.name}" in relPaths
+
+    # A new session is appended to the current segment
+    size = newSeg.stat().st_size
+    project.data.setInitCounts(150, 10)
+    project.data.setCurrCounts(300, 10)
+    assert sessLog.appendSession(0.0) is True
+    assert newSeg.stat().st_size > size
+    assert len(list(sessLog.iterRecords())) == 5
+
+    # A session in a closed year re-opens the segment, and it is closed
+    # again afterwards
+    sessLog._start = mktime((lastYear, 12, 31, 22, 0, 0, 0, 0, -1))
+    assert sessLog.appendSession(0.0) is True
+    assert oldSeg.is_file()
+    assert not oldSeg.with_suffix("").exists()
+    records = list(sessLog.iterRecords())
+    assert len(records) == 6
+    assert records[2]["start"] == f"{lastYear}-12-31 22:00:00"
+
+    # A legacy file added later is merged without its initial record
+    jsonFile.write_text("".join([
+        sessLog.createInitial(999),
+        record(f"{thisYear}-01-02 20:00:00", f"{thisYear}-01-02 21:00:00", 400, 10, 0),
+    ]), encoding="utf-8")
+    records = list(sessLog.iterRecords())
+    assert len(records) == 7
+    assert [r["type"] for r in records].count("initial") == 1
+    assert not jsonFile.exists()
+
+    # A failed migration leaves the segments unchanged, so it can be
+    # run again without duplicating records
+    jsonFile.write_text("".join([
+        record(f"{lastYear}-06-01 20:00:00", f"{lastYear}-06-01 21:00:00", 100, 0, 0),
+        record(f"{thisYear}-01-03 20:00:00", f"{thisYear}-01-03 21:00:00", 500, 10, 0),
+    ]), encoding="utf-8")
+    segments = {p: p.read_bytes() for _, p in sessLog._listSegments(metaPath)}
+    with monkeypatch.context() as mp:
+        mp.setattr("pathlib.Path.replace", causeOSError)
+        assert len(list(sessLog.iterRecords())) == 7
+    assert jsonFile.is_file()
+    assert {p: p.read_bytes() for _, p in sessLog._listSegments(metaPath)} == segments
+    assert not list(metaPath.glob("*.tmp"))
+
+    assert len(list(sessLog.iterRecords())) == 9
+    assert not jsonFile.exists()
+    assert len(list(sessLog.iterRecords())) == 9
+
+    # A truncated record is ignored
+    with open(newSeg, mode="ab") as fObj:
+        fObj.write(b"\x01\x02")
+    assert len(list(sessLog.iterRecords())) == 9
+
+    # A damaged segment is skipped, and later segments are still read
+    oldData = oldSeg.read_bytes()
+    oldSeg.write_bytes(b"\x01\x02")
+    assert len(list(sessLog.iterRecords())) == 5
+    oldSeg.write_bytes(oldData[:10])
+    assert len(list(sessLog.iterRecords())) == 5
+    noGz = oldSeg.with_suffix("")
+    oldSeg.unlink()
+    noGz.write_bytes(b"\x01\x02")
+    assert len(list(sessLog.iterRecords())) == 5
+    noGz.unlink()
+
+    # An unknown segment format is skipped
+    newSeg.write_bytes(b"XXXX\x01\x00")
+    assert len(list(sessLog.iterRecords())) == 0
+
+# END Test testCoreSessions_Segments
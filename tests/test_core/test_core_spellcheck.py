@@ -31,7 +31,9 @@ from mocked import causeOSError
 
 from novelwriter.constants import nwFiles
 from novelwriter.core.project import NWProject
-from novelwriter.core.spellcheck import FakeEnchant, NWSpellEnchant, UserDictionary
+from novelwriter.core.spellcheck import (
+    FakeEnchant, MisspelledWord, NWSpellEnchant, UserDictionary
+)
 
 
 @pytest.mark.core
@@ -162,6 +164,7 @@ def testCoreSpell_Enchant(monkeypatch, mockGUI, fncPath):
         assert spChk.checkWord("word") is True
         assert spChk.suggestWords("word") == []
         assert spChk.addWord("word") is True
+        assert isinstance(spChk.newDictionary(), FakeEnchant)
 
     # Set the dict to None, and check enchant error handling
     spChk = NWSpellEnchant(project)
@@ -181,6 +184,15 @@ def testCoreSpell_Enchant(monkeypatch, mockGUI, fncPath):
     assert spChk.listDictionaries() != []
     assert spChk.describeDict() != ("", "")
 
+    # New dictionaries are separate handles with the project words
+    version = spChk.version
+    assert spChk.addWord("qwertyuiop") is True
+    assert spChk.version == version + 1
+    handle = spChk.newDictionary()
+    assert isinstance(handle, enchant.Dict)
+    assert handle is not spChk._enchant
+    assert handle.check("qwertyuiop") is True
+
     # Set to non-existent language
     spChk.setLanguage("foo_bar")
 
@@ -191,3 +203,55 @@ def testCoreSpell_Enchant(monkeypatch, mockGUI, fncPath):
         assert isinstance(spChk._enchant, FakeEnchant)
 
 # END Test testCoreSpell_Enchant
+
+
+@pytest.mark.core
+def testCoreSpell_CheckDocuments(monkeypatch, mockGUI, fncPath):
+    """Test the project spell check."""
+    project = NWProject()
+    buildTestProject(project, fncPath)
+
+    docA = (
+        "# Hello Wrold\n\n"
+        "@pov: Jane\n\n"
+        "Some [b]text[/b] with a mistaek and another mistaek.\n\n"
+        "% synopsis: A synopsis with a mistaek.\n\n"
+        "%~ Ignored mistaek.\n\n"
+        "[vspace:2]\n\n"
+        "Numbers 1234 and ACRONYMS are fine, and so is qwertyuiop.\n"
+    )
+    docB = "Another wrold.\n\nx\U0001F600 [b]tesst[/b], wrold\n"
+
+    # No language means no errors
+    spChk = NWSpellEnchant(project)
+    assert spChk.checkDocuments([("0000000000001", docA)]) == []
+
+    spChk.setLanguage("en_US")
+    spChk.addWord("qwertyuiop")
+    docs = [("0000000000001", docA), ("0000000000002", docB)]
+    expected = [
+        MisspelledWord("mistaek", [
+            ("0000000000001", 5, 24), ("0000000000001", 5, 44), ("0000000000001", 7, 30),
+        ]),
+        MisspelledWord("wrold", [("0000000000002", 1, 8), ("0000000000002", 3, 18)]),
+        MisspelledWord("tesst", [("0000000000002", 3, 7)]),
+        MisspelledWord("Wrold", [("0000000000001", 1, 8)]),
+    ]
+
+    # Check in the calling process
+    errors = spChk.checkDocuments(docs)
+    assert errors == expected
+    assert errors[0].count == 3
+
+    # Check in worker processes
+    monkeypatch.setattr("novelwriter.core.spellcheck.MAX_WORKERS", 2)
+    monkeypatch.setattr("novelwriter.core.spellcheck.BATCH_SIZE", 10)
+    monkeypatch.setattr("novelwriter.core.spellcheck.MIN_PARALLEL", 0)
+    assert spChk.checkDocuments(docs) == expected
+
+    # If the worker processes fail, the check runs in this process
+    with monkeypatch.context() as mp:
+        mp.setattr("novelwriter.core.spellcheck.ProcessPoolExecutor", causeOSError)
+        assert spChk.checkDocuments(docs) == expected
+
+# END Test testCoreSpell_CheckDocuments
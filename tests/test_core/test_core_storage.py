@@ -283,7 +283,7 @@ def testCoreStorage_ZipIt(monkeypatch, mockGUI, fncPath, tstPaths, mockRnd):
 
     # Fail to create archive
     with monkeypatch.context() as mp:
-        mp.setattr("novelwriter.core.storage.ZipFile.write", causeOSError)
+        mp.setattr("novelwriter.core.backup.ZipFile.write", causeOSError)
         assert storage.zipIt(zipFile) is False
 
     # Create archive
@@ -26,7 +26,9 @@ import pytest
 
 from novelwriter.constants import nwHeadFmt
 from novelwriter.core.project import NWProject
-from novelwriter.core.tokenizer import HeadingFormatter, Tokenizer, stripEscape
+from novelwriter.core.tokenizer import (
+    HeadingFormatter, Tokenizer, TokenStore, stripEscape
+)
 from novelwriter.core.tomd import ToMarkdown
 
 from tests.tools import C, buildTestProject, readFile
@@ -236,6 +238,12 @@ def testCoreToken_TextOps(monkeypatch, mockGUI, mockRnd, fncPath):
     with pytest.raises(NotImplementedError):
         tokens.doConvert()
 
+    # Release the tokens
+    assert len(tokens._tokens) > 0
+    tokens.releaseTokens()
+    assert len(tokens._tokens) == 0
+    assert tokens._text == ""
+
 # END Test testCoreToken_TextOps
 
 
@@ -250,6 +258,48 @@ def testCoreToken_StripEscape():
 # END Test testCoreToken_StripEscape
 
 
+@pytest.mark.core
+def testCoreToken_TokenStore():
+    """Test the compact token store."""
+    store = TokenStore()
+    assert len(store) == 0
+    assert list(store) == []
+    assert store == []
+
+    tokens = [
+        (Tokenizer.T_HEAD1, 1, "Title", [], Tokenizer.A_PBB),
+        (Tokenizer.T_EMPTY, 1, "", [], Tokenizer.A_NONE),
+        (Tokenizer.T_TEXT, 1, "Some bold text", [
+            (5, Tokenizer.FMT_B_B, ""), (9, Tokenizer.FMT_B_E, ""),
+        ], Tokenizer.A_NONE),
+        (Tokenizer.T_TEXT, 1, "Note", [(4, Tokenizer.FMT_FNOTE, "T0001:fn1")], Tokenizer.A_NONE),
+    ]
+    for token in tokens[:2]:
+        store.append(token)
+    assert store[0] == tokens[0]
+
+    # Appending after reading extends the text buffer
+    for token in tokens[2:]:
+        store.append(token)
+    assert len(store) == 4
+    assert store == tokens
+    assert store[-1] == tokens[3]
+    assert list(store) == tokens
+    with pytest.raises(IndexError):
+        store[4]
+
+    # Format keys are interned
+    assert store._keys == ["", "T0001:fn1"]
+
+    # Styles can be changed in place
+    assert store.tokenType(0) == Tokenizer.T_HEAD1
+    assert store.tokenStyle(0) == Tokenizer.A_PBB
+    store.setTokenStyle(0, Tokenizer.A_CENTRE)
+    assert store[0] == (Tokenizer.T_HEAD1, 1, "Title", [], Tokenizer.A_CENTRE)
+
+# END Test testCoreToken_TokenStore
+
+
 @pytest.mark.core
 def testCoreToken_HeaderFormat(mockGUI):
     """Test the tokenization of header formats in the Tokenizer class."""
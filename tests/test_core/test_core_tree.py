@@ -445,6 +445,79 @@ def testCoreTree_Methods(monkeypatch, mockGUI, mockItems):
 # END Test testCoreTree_Methods
 
 
+@pytest.mark.core
+def testCoreTree_ChildrenIndex(mockGUI, mockItems):
+    """Test the children index and the sub tree methods."""
+    project = NWProject()
+    tree = NWTree(project)
+
+    for nwItem in mockItems:
+        tree.append(nwItem)
+        tree.updateItemData(nwItem.itemHandle)
+
+    # Children
+    assert tree.children(None) == [
+        "a000000000001", "a000000000002", "a000000000003", "a000000000004"
+    ]
+    assert tree.children("a000000000001") == ["b000000000001"]
+    assert tree.children("b000000000001") == ["c000000000001", "c000000000002"]
+    assert tree.children("c000000000001") == []
+    assert tree.children("stuff") == []
+
+    # Sub tree and depth
+    assert list(tree.iterSubTree("a000000000001")) == [
+        "a000000000001", "b000000000001", "c000000000001", "c000000000002"
+    ]
+    assert list(tree.iterSubTree("stuff")) == []
+    assert tree.itemDepth("a000000000001") == 0
+    assert tree.itemDepth("b000000000001") == 1
+    assert tree.itemDepth("c000000000002") == 2
+    assert tree.itemDepth("stuff") == -1
+
+    # Reorder the children
+    order = tree.handles()
+    order[2], order[3] = order[3], order[2]
+    tree.setOrder(order)
+    assert tree.children("b000000000001") == ["c000000000002", "c000000000001"]
+
+    # Move the folder to the characters root
+    tree.setItemParent("b000000000001", "a000000000004")
+    assert tree.updateSubTree("b000000000001") is True
+    assert tree.children("a000000000001") == []
+    assert tree.children("a000000000004") == ["b000000000002", "b000000000001"]
+    assert tree["b000000000001"].itemRoot == "a000000000004"  # type: ignore
+    assert tree["c000000000001"].itemRoot == "a000000000004"  # type: ignore
+    assert tree["c000000000001"].itemClass == nwItemClass.CHARACTER  # type: ignore
+    assert tree.itemDepth("c000000000001") == 2
+    assert tree.updateSubTree("stuff") is False
+
+    # Delete a document
+    del tree["c000000000001"]
+    assert tree.children("b000000000001") == ["c000000000002"]
+    assert list(tree.iterSubTree("a000000000004")) == [
+        "a000000000004", "b000000000002", "b000000000001", "c000000000002"
+    ]
+
+    # A cycle is not followed
+    tree._children["c000000000002"].append("b000000000001")
+    assert list(tree.iterSubTree("b000000000001")) == ["b000000000001", "c000000000002"]
+
+    # Clear
+    tree.clear()
+    assert tree.children(None) == []
+
+    # Children appended before their parent are kept
+    for nwItem in reversed(mockItems):
+        tree.append(nwItem)
+    assert tree.children("a000000000004") == ["b000000000002", "b000000000001"]
+    assert tree.children("b000000000001") == ["c000000000002", "c000000000001"]
+    assert list(tree.iterSubTree("a000000000004")) == [
+        "a000000000004", "b000000000002", "b000000000001", "c000000000002", "c000000000001"
+    ]
+
+# END Test testCoreTree_ChildrenIndex
+
+
 @pytest.mark.core
 def testCoreTree_MakeHandles(mockGUI):
     """Test generating item handles."""
@@ -491,6 +564,45 @@ def testCoreTree_Stats(mockGUI, mockItems):
     assert novelWords == 550
     assert noteWords == 400
 
+    # Running Totals
+    assert tree.wordTotals() == (550, 400)
+    assert tree.checkCounts() is True
+
+    tree["c000000000001"].setWordCount(150)  # type: ignore
+    assert tree.wordTotals() == (650, 400)
+
+    tree["c000000000001"].setLayout(nwItemLayout.NOTE)  # type: ignore
+    assert tree.wordTotals() == (500, 550)
+
+    tree["c000000000001"].setLayout(nwItemLayout.NO_LAYOUT)  # type: ignore
+    assert tree.wordTotals() == (500, 400)
+
+    del tree["c000000000002"]
+    assert tree.wordTotals() == (0, 400)
+    assert tree.sumWords() == (0, 400)
+
+    # Items not in the tree don't count
+    nwItem = NWItem(project, "c000000000002")
+    nwItem.setWordCount(100)
+    assert tree.wordTotals() == (0, 400)
+
+    # Status Totals
+    data = mockItems[0]._project.data
+    sKey = data.itemStatus.add(None, "New", (0, 0, 0), "SQUARE", 0)
+    iKey = data.itemImport.add(None, "New", (0, 0, 0), "SQUARE", 0)
+    for nwItem in tree:
+        nwItem.setStatus(sKey)
+        nwItem.setImport(iKey)
+    status, imports = tree.statusTotals()
+    assert status == {sKey: 4}
+    assert imports == {iKey: 3}
+
+    # Counts that drift are corrected
+    tree._novelWords = 42
+    assert tree.checkCounts() is False
+    assert tree.wordTotals() == (0, 400)
+    assert tree.checkCounts() is True
+
 # END Test testCoreTree_Stats
 
 
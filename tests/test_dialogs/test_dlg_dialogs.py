@@ -26,7 +26,11 @@ from PyQt5.QtCore import QItemSelectionModel
 from PyQt5.QtWidgets import QListWidgetItem, QDialog
 
 from novelwriter.dialogs.quotes import GuiQuoteSelect
+from novelwriter.core.coretools import DocReplacement
 from novelwriter.dialogs.editlabel import GuiEditLabel
+from novelwriter.dialogs.replacepreview import GuiReplacePreview
+
+from tests.tools import C, buildTestProject
 
 
 @pytest.mark.gui
@@ -83,3 +87,36 @@ def testDlgOther_EditLabel(qtbot, monkeypatch):
         assert newLabel == "Hello World"
 
 # END Test testDlgOther_EditLabel
+
+
+@pytest.mark.gui
+def testDlgOther_ReplacePreview(qtbot, monkeypatch, nwGUI, projPath, mockRnd):
+    """Test the replace preview dialog."""
+    buildTestProject(nwGUI, projPath)
+    replacements = [
+        DocReplacement(C.hSceneDoc, 2, "Text\nJane met Jane\n", "Text\nMary met Mary\n"),
+        DocReplacement("0000000000000", 1, "Jane", "Mary"),
+    ]
+
+    dialog = GuiReplacePreview(nwGUI, replacements)
+    assert dialog.listBox.topLevelItemCount() == 2
+    assert dialog.infoLabel.text() == "Replace 3 matches in 2 documents?"
+
+    first = dialog.listBox.topLevelItem(0)
+    assert first.text(GuiReplacePreview.C_TEXT) == "New Scene"
+    assert first.text(GuiReplacePreview.C_COUNT) == "(2)"
+    assert [first.child(i).text(0) for i in range(first.childCount())] == [
+        "@@ -2 +2 @@", "-Jane met Jane", "+Mary met Mary",
+    ]
+    assert dialog.listBox.topLevelItem(1).text(GuiReplacePreview.C_TEXT) == "0000000000000"
+    dialog.deleteLater()
+
+    monkeypatch.setattr(GuiReplacePreview, "exec", lambda *a: None)
+    with monkeypatch.context() as mp:
+        mp.setattr(GuiReplacePreview, "result", lambda *a: QDialog.DialogCode.Accepted)
+        assert GuiReplacePreview.confirmReplace(nwGUI, replacements) is True
+    with monkeypatch.context() as mp:
+        mp.setattr(GuiReplacePreview, "result", lambda *a: QDialog.DialogCode.Rejected)
+        assert GuiReplacePreview.confirmReplace(nwGUI, replacements) is False
+
+# END Test testDlgOther_ReplacePreview
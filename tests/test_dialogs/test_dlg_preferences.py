@@ -222,10 +222,12 @@ def testDlgPreferences_Settings(qtbot, monkeypatch, nwGUI, tstPaths):
     prefs.backupOnClose.setChecked(True)
     assert prefs.askBeforeBackup.isEnabled() is True
     prefs.askBeforeBackup.setChecked(False)
+    prefs.incrementalBackup.setChecked(True)
 
     assert CONFIG._backupPath != tstPaths.testDir
     assert CONFIG.backupOnClose is False
     assert CONFIG.askBeforeBackup is True
+    assert CONFIG.incrementalBackup is False
 
     # Session Timer
     prefs.stopWhenIdle.setChecked(False)
@@ -363,6 +365,7 @@ def testDlgPreferences_Settings(qtbot, monkeypatch, nwGUI, tstPaths):
     assert CONFIG._backupPath == tstPaths.testDir
     assert CONFIG.backupOnClose is True
     assert CONFIG.askBeforeBackup is False
+    assert CONFIG.incrementalBackup is True
 
     # Session Timer
     assert CONFIG.stopWhenIdle is False
@@ -22,7 +22,7 @@ from __future__ import annotations
 
 import pytest
 
-from PyQt5.QtCore import QEvent, Qt, QThreadPool
+from PyQt5.QtCore import QCoreApplication, QEvent, Qt, QThreadPool
 from PyQt5.QtGui import QClipboard, QMouseEvent, QTextBlock, QTextCursor, QTextOption
 from PyQt5.QtWidgets import QAction, QApplication, QMenu
 
@@ -33,6 +33,9 @@ from novelwriter.enum import (
     nwDocAction, nwDocInsert, nwItemClass, nwItemLayout, nwTrinary, nwWidget
 )
 from novelwriter.gui.doceditor import GuiDocEditor
+from novelwriter.gui.dochighlight import (
+    BLOCK_COMMENT, BLOCK_META, BLOCK_TEXT, BLOCK_TITLE, TextBlockData
+)
 from novelwriter.text.counting import standardCounter
 from novelwriter.types import (
     QtAlignJustify, QtAlignLeft, QtKeepAnchor, QtModCtrl, QtMouseLeft,
@@ -264,6 +267,130 @@ def testGuiEditor_MetaData(qtbot, nwGUI, projPath, mockRnd):
 # END Test testGuiEditor_MetaData
 
 
+@pytest.mark.gui
+def testGuiEditor_TagHighlighting(qtbot, monkeypatch, nwGUI, projPath, mockRnd):
+    """Test that only meta data lines with changed tags are
+    re-highlighted.
+    """
+    buildTestProject(nwGUI, projPath)
+    assert nwGUI.openDocument(C.hSceneDoc) is True
+    docEditor = nwGUI.docEditor
+    syntax = docEditor._qDocument.syntaxHighlighter
+    index = SHARED.project.index
+
+    docEditor.setPlainText("### Scene\n\n@pov: Jane\n\n@location: Home\n\nText\n")
+    qDoc = docEditor.document()
+    povData = qDoc.findBlockByNumber(2).userData()
+    locData = qDoc.findBlockByNumber(4).userData()
+    assert povData.tagKeys == ["jane"]
+    assert locData.tagKeys == ["home"]
+    assert povData.tagVersion == index.tagsVersion()
+
+    rehighlighted = []
+    monkeypatch.setattr(
+        syntax, "rehighlightBlock", lambda b: rehighlighted.append(b.blockNumber())
+    )
+
+    # Nothing has changed
+    docEditor.updateTagHighLighting()
+    assert rehighlighted == []
+
+    # Adding a character tag only affects the pov line
+    hJane = SHARED.project.newFile("Jane", C.hCharRoot)
+    assert hJane is not None
+    index.scanText(hJane, "# Jane\n\n@tag: Jane\n")
+    assert rehighlighted == [2]
+
+    # A full rebuild affects all meta lines
+    rehighlighted.clear()
+    index.clearIndex()
+    docEditor.updateTagHighLighting()
+    assert rehighlighted == [2, 4]
+
+    # qtbot.stop()
+
+# END Test testGuiEditor_TagHighlighting
+
+
+@pytest.mark.gui
+def testGuiEditor_BlockRegistry(qtbot, nwGUI, projPath, mockRnd):
+    """Test that the block registry follows the edits made to the
+    document.
+    """
+    buildTestProject(nwGUI, projPath)
+    assert nwGUI.openDocument(C.hSceneDoc) is True
+    docEditor = nwGUI.docEditor
+    qDoc = docEditor._qDocument
+
+    def blockTypes(cType):
+        """Find the block numbers of a type by a full loop."""
+        return [
+            i for i in range(qDoc.blockCount())
+            if qDoc.findBlockByNumber(i).userState() & cType > 0
+        ]
+
+    def checkRegistry():
+        """Check the registry against the block states."""
+        for cType in (BLOCK_TITLE, BLOCK_META, BLOCK_COMMENT):
+            assert qDoc._blocks.blockNumbers(cType) == blockTypes(cType)
+        assert qDoc._blocks.blockNumbers(BLOCK_TITLE | BLOCK_META) == blockTypes(
+            BLOCK_TITLE | BLOCK_META
+        )
+
+    docEditor.replaceText(
+        "# Chapter\n\n"
+        "% Comment\n\n"
+        "### Scene\n\n"
+        "@pov: Jane\n"
+        "@char: John\n\n"
+        "Text\n\n"
+        "### Scene\n\n"
+        "Text\n"
+    )
+    assert [b.blockNumber() for b in qDoc.iterBlockByType(BLOCK_TITLE)] == [0, 4, 11]
+    assert [b.blockNumber() for b in qDoc.iterBlockByType(BLOCK_TITLE, maxCount=2)] == [0, 4]
+    assert [b.blockNumber() for b in qDoc.iterBlockByType(BLOCK_TEXT)] == [2, 9, 13]
+    assert qDoc._blocks.blockNumbers(BLOCK_TEXT) is None
+    checkRegistry()
+
+    # Insert lines
+    cursor = docEditor.textCursor()
+    cursor.setPosition(qDoc.findBlockByNumber(2).position())
+    cursor.insertText("## Section\n\n@pov: John\n")
+    checkRegistry()
+    assert qDoc._blocks.blockNumbers(BLOCK_TITLE) == [0, 2, 7, 14]
+
+    # Change block types
+    cursor.setPosition(qDoc.findBlockByNumber(2).position())
+    cursor.insertText("%")
+    cursor.setPosition(qDoc.findBlockByNumber(4).position())
+    cursor.deleteChar()
+    checkRegistry()
+    assert qDoc._blocks.blockNumbers(BLOCK_COMMENT) == [2, 5]
+
+    # Remove lines across block types
+    cursor.setPosition(qDoc.findBlockByNumber(1).position())
+    cursor.setPosition(qDoc.findBlockByNumber(9).position(), QtKeepAnchor)
+    cursor.removeSelectedText()
+    checkRegistry()
+    assert qDoc._blocks.blockNumbers(BLOCK_META) == [1, 2]
+
+    # Undo and redo
+    docEditor.undo()
+    checkRegistry()
+    docEditor.redo()
+    checkRegistry()
+
+    # Clear the document
+    docEditor.replaceText("")
+    checkRegistry()
+    assert qDoc._blocks.blockNumbers(BLOCK_TITLE) == []
+
+    # qtbot.stop()
+
+# END Test testGuiEditor_BlockRegistry
+
+
 @pytest.mark.gui
 def testGuiEditor_ContextMenu(monkeypatch, qtbot, nwGUI, projPath, mockRnd):
     """Test the editor context menu."""
@@ -477,6 +604,96 @@ def testGuiEditor_SpellChecking(qtbot, monkeypatch, nwGUI, projPath, ipsumText,
 # END Test testGuiEditor_SpellChecking
 
 
+@pytest.mark.gui
+def testGuiEditor_BackgroundSpellCheck(qtbot, monkeypatch, nwGUI, projPath, mockRnd):
+    """Test the background spell checker."""
+    class MockDict:
+        def check(self, word):
+            return word != "tesst"
+
+    monkeypatch.setattr(SHARED.spelling, "newDictionary", lambda: MockDict())
+
+    buildTestProject(nwGUI, projPath)
+    assert nwGUI.openDocument(C.hSceneDoc) is True
+    docEditor = nwGUI.docEditor
+    qDoc = docEditor._qDocument
+    syntax = qDoc.syntaxHighlighter
+    worker = syntax._spellWorker
+
+    with monkeypatch.context() as mp:
+        started = []
+        mp.setattr(SHARED, "runInThreadPool", lambda r, *a: started.append(r))
+
+        docEditor.replaceText("### Scene\n\nSome tesst text.\n\n% A tesst comment TESST 1234\n")
+        syntax.setSpellCheck(True)
+        docEditor.spellCheckDocument()
+
+        # The checks are queued, and the worker is only started once
+        assert started == [worker]
+        assert len(worker._jobs) == 3
+        textData = qDoc.findBlockByNumber(2).userData()
+        assert textData.spellErrors == []
+
+        # Results are applied to the blocks
+        worker.run()
+        assert textData.spellErrors == [(5, 5)]
+        assert qDoc.findBlockByNumber(4).userData().spellErrors == [(4, 5)]
+        assert syntax._spellPending == {}
+        assert worker._running is False
+
+        # Re-highlighting unchanged blocks queues no new checks
+        started.clear()
+        syntax.rehighlight()
+        assert started == []
+        assert worker._jobs == {}
+
+        # Editing a block queues a new check, replacing the queued one
+        cursor = docEditor.textCursor()
+        cursor.setPosition(qDoc.findBlockByNumber(2).position())
+        cursor.insertText("A ")
+        cursor.insertText("B ")
+        assert started == [worker]
+        assert list(worker._jobs) == [textData.blockId]
+
+        # A stale result is dropped
+        revision = textData.spellRevision
+        syntax._applySpellCheck(textData.blockId, revision - 1, [(0, 1)])
+        assert textData.spellErrors == [(5, 5)]
+
+        # The block moves before the result arrives
+        cursor.setPosition(0)
+        cursor.insertText("\n\n")
+        worker.run()
+        assert qDoc.findBlockByNumber(4).userData() is textData
+        assert textData.spellErrors == [(9, 5)]
+
+        # A deleted block drops its result
+        syntax._spellPending[textData.blockId] = (revision + 1, QTextCursor(qDoc))
+        syntax._applySpellCheck(textData.blockId, revision + 1, [(0, 1)])
+        assert textData.spellErrors == [(9, 5)]
+
+        # Turning spell checking off drops queued jobs
+        cursor.insertText("x")
+        assert worker._jobs != {}
+        syntax.setSpellCheck(False)
+        assert worker._jobs == {}
+        assert syntax._spellPending == {}
+        worker.run()
+
+    # Run the worker in the thread pool
+    QThreadPool.globalInstance().waitForDone()
+    syntax.setSpellCheck(True)
+    docEditor.replaceText("Another tesst")
+    QThreadPool.globalInstance().waitForDone()
+    QCoreApplication.sendPostedEvents()
+    assert qDoc.firstBlock().userData().spellErrors == [(8, 5)]
+    syntax.setSpellCheck(False)
+
+    # qtbot.stop()
+
+# END Test testGuiEditor_BackgroundSpellCheck
+
+
 @pytest.mark.gui
 def testGuiEditor_Actions(qtbot, nwGUI, projPath, ipsumText, mockRnd):
     """Test the document actions. This is not an extensive test of the
@@ -1824,20 +2041,6 @@ def testGuiEditor_CursorVisibility(qtbot, monkeypatch, nwGUI, projPath, mockRnd)
 def testGuiEditor_WordCounters(qtbot, monkeypatch, nwGUI, projPath, ipsumText, mockRnd):
     """Test the word counter."""
     docEditor = nwGUI.docEditor
-
-    class MockThreadPool:
-
-        def __init__(self):
-            self._objID = None
-
-        def start(self, runObj, priority=0):
-            self._objID = id(runObj)
-
-        def objectID(self):
-            return self._objID
-
-    threadPool = MockThreadPool()
-    monkeypatch.setattr(QThreadPool, "globalInstance", lambda *a: threadPool)
     docEditor.timerDoc.blockSignals(True)
     docEditor.timerSel.blockSignals(True)
 
@@ -1863,35 +2066,57 @@ def testGuiEditor_WordCounters(qtbot, monkeypatch, nwGUI, projPath, ipsumText, m
     cC, wC, pC = standardCounter(text)
     docEditor.replaceText(text)
 
-    # Check that a busy counter is blocked
-    with monkeypatch.context() as mp:
-        mp.setattr(docEditor.wCounterDoc, "isRunning", lambda *a: True)
-        docEditor._runDocumentTasks()
-        assert docEditor.docFooter.wordsText.text() == "Words: 0 (+0)"
-
-    with monkeypatch.context() as mp:
-        mp.setattr(docEditor.wCounterSel, "isRunning", lambda *a: True)
-        docEditor._runSelCounter()
-        assert docEditor.docFooter.wordsText.text() == "Words: 0 (+0)"
-
     # Run the full word counter
     docEditor._runDocumentTasks()
-    assert threadPool.objectID() == id(docEditor.wCounterDoc)
-
-    docEditor.wCounterDoc.run()
-    # docEditor._updateDocCounts(cC, wC, pC)
     assert SHARED.project.tree[C.hSceneDoc]._charCount == cC  # type: ignore
     assert SHARED.project.tree[C.hSceneDoc]._wordCount == wC  # type: ignore
     assert SHARED.project.tree[C.hSceneDoc]._paraCount == pC  # type: ignore
     assert docEditor.docFooter.wordsText.text() == f"Words: {wC} (+{wC})"
 
+    # All blocks have cached counts
+    qDoc = docEditor.document()
+    block = qDoc.firstBlock()
+    while block.isValid():
+        assert isinstance(block.userData(), TextBlockData)
+        assert block.userData().counts is not None
+        block = block.next()
+
+    # Only the edited block is cleared
+    cursor = docEditor.textCursor()
+    cursor.setPosition(qDoc.findBlockByNumber(2).position())
+    cursor.insertText("Extra words. ")
+    assert qDoc.findBlockByNumber(0).userData().counts is not None
+    assert qDoc.findBlockByNumber(2).userData().counts is None
+    assert qDoc.findBlockByNumber(4).userData().counts is not None
+
+    # Splitting and merging blocks updates the counts
+    pos = cursor.position()
+    cursor.insertText("\n\n# Heading\n\n")
+    assert qDoc.documentCounts() == standardCounter(docEditor.getText())
+    cursor.setPosition(pos, QTextCursor.MoveMode.KeepAnchor)
+    cursor.removeSelectedText()
+    assert qDoc.documentCounts() == standardCounter(docEditor.getText())
+    assert qDoc.documentCounts()[1] == wC + 2
+
     # Select all text and run the selection word counter
     docEditor.docAction(nwDocAction.SEL_ALL)
     docEditor._runSelCounter()
-    assert threadPool.objectID() == id(docEditor.wCounterSel)
+    assert docEditor.docFooter.wordsText.text() == f"Words: {wC + 2} selected"
+
+    # Select part of the text
+    cursor = docEditor.textCursor()
+    cursor.setPosition(qDoc.findBlockByNumber(0).position() + 5)
+    cursor.setPosition(qDoc.findBlockByNumber(4).position() + 20, QTextCursor.MoveMode.KeepAnchor)
+    docEditor.setTextCursor(cursor)
+    selCounts = standardCounter(docEditor.getSelectedText())
+    assert qDoc.rangeCounts(cursor.selectionStart(), cursor.selectionEnd()) == selCounts
+    docEditor._runSelCounter()
+    assert docEditor.docFooter.wordsText.text() == f"Words: {selCounts[1]} selected"
 
-    docEditor.wCounterSel.run()
-    assert docEditor.docFooter.wordsText.text() == f"Words: {wC} selected"
+    cursor.setPosition(qDoc.findBlockByNumber(2).position() + 5)
+    cursor.setPosition(qDoc.findBlockByNumber(2).position() + 50, QTextCursor.MoveMode.KeepAnchor)
+    selCounts = standardCounter(cursor.selectedText())
+    assert qDoc.rangeCounts(cursor.selectionStart(), cursor.selectionEnd()) == selCounts
 
     # qtbot.stop()
 
@@ -2178,6 +2403,78 @@ def testGuiEditor_Search(qtbot, monkeypatch, nwGUI, prjLipsum):
 # END Test testGuiEditor_Search
 
 
+@pytest.mark.gui
+def testGuiEditor_ReplaceAll(qtbot, monkeypatch, nwGUI, projPath, mockRnd):
+    """Test the replace all function of the document editor."""
+    buildTestProject(nwGUI, projPath)
+    assert nwGUI.openDocument(C.hSceneDoc) is True
+    docEditor = nwGUI.docEditor
+    docSearch = docEditor.docSearch
+
+    docEditor.replaceText("### Scene\n\nAlice met alice and ALICE \U0001f600 Alice.\n")
+    docSearch.toggleCase.setChecked(False)
+    docSearch.toggleWord.setChecked(False)
+    docSearch.toggleRegEx.setChecked(False)
+    docSearch.toggleMatchCap.setChecked(False)
+
+    # Search not open
+    docSearch.closeSearch()
+    assert docEditor.replaceAll() == 0
+    assert docSearch.isVisible() is True
+    assert docSearch.replaceBox.isVisible() is True
+
+    # No search text
+    assert docEditor.replaceAll() == 0
+
+    # No matches
+    docSearch.searchBox.setText("Bob")
+    docSearch.replaceBox.setText("Mary")
+    assert docEditor.replaceAll() == 0
+    assert docSearch.resultLabel.text() == "0/0"
+
+    # Replace all, with positions after an astral character
+    docSearch.searchBox.setText("alice")
+    assert docEditor.replaceAll() == 4
+    assert docEditor.getText() == "### Scene\n\nMary met Mary and Mary \U0001f600 Mary.\n"
+
+    # The whole replace is a single undo step
+    docEditor.undo()
+    assert docEditor.getText() == "### Scene\n\nAlice met alice and ALICE \U0001f600 Alice.\n"
+
+    # Preserve case
+    docSearch.toggleMatchCap.setChecked(True)
+    assert docEditor.replaceAll() == 4
+    assert docEditor.getText() == "### Scene\n\nMary met mary and MARY \U0001f600 Mary.\n"
+    docEditor.undo()
+    docSearch.toggleMatchCap.setChecked(False)
+
+    # Case sensitive
+    docSearch.toggleCase.setChecked(True)
+    docSearch.searchBox.setText("Alice")
+    assert docEditor.replaceAll() == 2
+    assert docEditor.getText() == "### Scene\n\nMary met alice and ALICE \U0001f600 Mary.\n"
+    docEditor.undo()
+    docSearch.toggleCase.setChecked(False)
+
+    # RegEx
+    docSearch.toggleRegEx.setChecked(True)
+    docSearch.searchBox.setText(r"\bm\w+")
+    assert docEditor.replaceAll() == 1
+    assert docEditor.getText() == "### Scene\n\nAlice Mary alice and ALICE \U0001f600 Alice.\n"
+    docEditor.undo()
+    docSearch.toggleRegEx.setChecked(False)
+
+    # Triggered from the search bar
+    docSearch.searchBox.setText("and")
+    docSearch.replaceBox.setText("or")
+    docSearch.replaceAllButton.click()
+    assert docEditor.getText() == "### Scene\n\nAlice met alice or ALICE \U0001f600 Alice.\n"
+
+    # qtbot.stop()
+
+# END Test testGuiEditor_ReplaceAll
+
+
 @pytest.mark.gui
 def testGuiEditor_StaticMethods():
     """Test the document editor's static methods."""
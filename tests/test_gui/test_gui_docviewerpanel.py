@@ -24,6 +24,7 @@ import pytest
 
 from tools import C, buildTestProject
 
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 
 from novelwriter import SHARED
@@ -162,15 +163,13 @@ def testGuiViewerPanel_Tags(qtbot, monkeypatch, caplog, nwGUI, projPath, mockRnd
     # Check Character Tab
     charTab = viewPanel.kwTabs["CHARACTER"]
     viewPanel.mainTabs.setCurrentIndex(viewPanel.idTabs["CHARACTER"])
-    assert charTab.topLevelItemCount() == 2
-    item = charTab.topLevelItem(0)
-    assert item.text(charTab.C_NAME) == "Jane"
-    assert item.text(charTab.C_DOC) == "Jane"
-    assert item.text(charTab.C_TITLE) == "Jane"
-    item = charTab.topLevelItem(1)
-    assert item.text(charTab.C_NAME) == "John"
-    assert item.text(charTab.C_DOC) == "John"
-    assert item.text(charTab.C_TITLE) == "John"
+    assert charTab.countEntries() == 2
+    assert charTab.entryText(0, charTab.C_NAME) == "Jane"
+    assert charTab.entryText(0, charTab.C_DOC) == "Jane"
+    assert charTab.entryText(0, charTab.C_TITLE) == "Jane"
+    assert charTab.entryText(1, charTab.C_NAME) == "John"
+    assert charTab.entryText(1, charTab.C_DOC) == "John"
+    assert charTab.entryText(1, charTab.C_TITLE) == "John"
 
     # Edit Jane
     nwGUI.openDocument(hJane)
@@ -178,18 +177,17 @@ def testGuiViewerPanel_Tags(qtbot, monkeypatch, caplog, nwGUI, projPath, mockRnd
     nwGUI.saveDocument()
     SHARED.project.tree[hJane].setName("Awesome Jane")  # type: ignore
     projTree.renameTreeItem(hJane)
-    item = charTab.topLevelItem(0)
-    assert item.text(charTab.C_NAME) == "Janey"
-    assert item.text(charTab.C_DOC) == "Awesome Jane"
-    assert item.text(charTab.C_TITLE) == "Jane Smith"
+    assert charTab.entryText(0, charTab.C_NAME) == "Janey"
+    assert charTab.entryText(0, charTab.C_DOC) == "Awesome Jane"
+    assert charTab.entryText(0, charTab.C_TITLE) == "Jane Smith"
 
     # Clear Index
     SHARED.project.index.clearIndex()
-    assert charTab.topLevelItemCount() == 0
+    assert charTab.countEntries() == 0
 
     # Rebuild Index
     SHARED.project.index.rebuildIndex()
-    assert charTab.topLevelItemCount() == 2
+    assert charTab.countEntries() == 2
 
     # Test Update Theme
     charTab._classIcon = None
@@ -203,7 +201,7 @@ def testGuiViewerPanel_Tags(qtbot, monkeypatch, caplog, nwGUI, projPath, mockRnd
     # Remove Non-Existing Tag
     caplog.clear()
     viewPanel.updateChangedTags(["foo"], ["bar"])
-    assert charTab.topLevelItemCount() == 2
+    assert charTab.countEntries() == 2
     assert "Could not remove tag" in caplog.text
 
     # View/Edit John
@@ -216,16 +214,23 @@ def testGuiViewerPanel_Tags(qtbot, monkeypatch, caplog, nwGUI, projPath, mockRnd
     charTab._treeItemDoubleClicked(charTab.model().index(0, charTab.C_NAME))
     assert nwGUI.docViewer.docHandle == hJane
 
+    # Sort by Document
+    charTab.sortByColumn(charTab.C_DOC, Qt.SortOrder.DescendingOrder)
+    assert charTab.entryText(0, charTab.C_DOC) == "John"
+    assert charTab.entryText(1, charTab.C_DOC) == "Awesome Jane"
+    charTab.sortByColumn(charTab.C_NAME, Qt.SortOrder.AscendingOrder)
+    assert charTab.entryText(0, charTab.C_NAME) == "Janey"
+
     # Hide Inactive Tags
     viewPanel.aInactive.setChecked(True)
-    assert charTab.topLevelItemCount() == 2
+    assert charTab.countEntries() == 2
 
     nwJohn = SHARED.project.tree[hJohn]
     assert isinstance(nwJohn, NWItem)
     nwJohn.setActive(False)
     projTree.setTreeItemValues(hJohn)
     projTree._alertTreeChange(hJohn, flush=False)
-    assert charTab.topLevelItemCount() == 1
+    assert charTab.countEntries() == 1
 
     # qtbot.stop()
 
@@ -487,7 +487,7 @@ def testGuiMain_Editing(qtbot, monkeypatch, nwGUI, projPath, tstPaths, mockRnd):
     qtbot.keyClick(docEditor, Qt.Key_Return, delay=KEY_DELAY)
     qtbot.keyClick(docEditor, Qt.Key_Return, delay=KEY_DELAY)
 
-    docEditor.wCounterDoc.run()
+    docEditor._runDocumentTasks()
 
     # Spell Checking
     # ==============
@@ -20,10 +20,13 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
+import json
+
 import pytest
 
 from PyQt5.QtGui import QTextBlock, QTextCursor
 from PyQt5.QtWidgets import QAction, QFileDialog, QMessageBox
+from mocked import causeOSError
 from tools import C, buildTestProject, writeFile
 
 from novelwriter import CONFIG, SHARED
@@ -666,3 +669,40 @@ def testGuiMenu_Insert(qtbot, monkeypatch, nwGUI, fncPath, projPath, mockRnd):
     # qtbot.stop()
 
 # END Test testGuiMenu_Insert
+
+
+@pytest.mark.gui
+def testGuiMenu_PerformanceReport(qtbot, monkeypatch, nwGUI, prjLipsum, fncPath):
+    """Test saving the performance report from the help menu."""
+    assert nwGUI.openProject(prjLipsum)
+    assert nwGUI.openDocument("4c4f28287af27")
+
+    report = fncPath / "report.json"
+
+    # User cancels
+    with monkeypatch.context() as mp:
+        mp.setattr(QFileDialog, "getSaveFileName", lambda *a, **k: ("", ""))
+        nwGUI.mainMenu.aPerfReport.activate(QAction.Trigger)
+        assert not report.exists()
+
+    # Write fails
+    with monkeypatch.context() as mp:
+        mp.setattr(QFileDialog, "getSaveFileName", lambda *a, **k: (str(report), ""))
+        mp.setattr("builtins.open", causeOSError)
+        nwGUI.mainMenu.aPerfReport.activate(QAction.Trigger)
+        assert SHARED.lastAlert == "Could not save the performance report."
+
+    # Write report
+    with monkeypatch.context() as mp:
+        mp.setattr(QFileDialog, "getSaveFileName", lambda *a, **k: (str(report), ""))
+        nwGUI.mainMenu.aPerfReport.activate(QAction.Trigger)
+
+    data = json.loads(report.read_text(encoding="utf-8"))
+    assert data["timers"]["project.open"]["count"] >= 1
+    assert data["timers"]["tree.project.build"]["count"] >= 1
+    assert data["timers"]["editor.highlight"]["count"] >= 1
+    assert data["timers"]["editor.loadText"]["count"] >= 1
+
+    # qtbot.stop()
+
+# END Test testGuiMenu_PerformanceReport
@@ -27,6 +27,8 @@ import pytest
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QAction
 
+from novelwriter import SHARED
+from novelwriter.dialogs.replacepreview import GuiReplacePreview
 from novelwriter.enum import nwView
 from novelwriter.gui.search import GuiProjectSearch
 
@@ -131,3 +133,54 @@ def testGuiDocSearch_Main(qtbot, monkeypatch, nwGUI, prjLipsum):
     nwGUI.closeProject()
 
 # END Test testGuiDocSearch_Main
+
+
+@pytest.mark.gui
+def testGuiDocSearch_Replace(qtbot, monkeypatch, nwGUI, prjLipsum):
+    """Test replacing text in the whole project."""
+    nwGUI.openProject(prjLipsum)
+    nwGUI._changeView(nwView.SEARCH)
+    search = nwGUI.projSearch
+    project = SHARED.project
+
+    search.searchText.setText("Lorem")
+    search.searchAction.activate(QAction.ActionEvent.Trigger)
+    handle = search.searchResult.topLevelItem(0).data(
+        GuiProjectSearch.C_RESULT, GuiProjectSearch.D_HANDLE
+    )
+    assert nwGUI.openDocument(handle) is True
+    original = project.storage.getDocumentText(handle)
+
+    # Nothing to replace
+    search.searchText.setText("Qwertyuiop")
+    search.replaceText.setText("Ipsum")
+    with monkeypatch.context() as mp:
+        mp.setattr(GuiReplacePreview, "confirmReplace", lambda *a: False)
+        search.replaceAction.activate(QAction.ActionEvent.Trigger)
+    assert project.storage.getDocumentText(handle) == original
+
+    # Cancelled replace writes nothing
+    search.searchText.setText("Lorem")
+    search.replaceText.setText("Merol")
+    with monkeypatch.context() as mp:
+        mp.setattr(GuiReplacePreview, "confirmReplace", lambda *a: False)
+        search.replaceAction.activate(QAction.ActionEvent.Trigger)
+    assert project.storage.getDocumentText(handle) == original
+
+    # Accepted replace writes all documents and reloads the editor
+    with monkeypatch.context() as mp:
+        mp.setattr(GuiReplacePreview, "confirmReplace", lambda *a: True)
+        search.replaceAction.activate(QAction.ActionEvent.Trigger)
+    assert "Lorem" not in project.storage.getDocumentText(handle)
+    assert "Merol" in project.storage.getDocumentText(handle)
+    assert "Merol" in nwGUI.docEditor.getText()
+    assert search.searchResult.topLevelItemCount() == 0
+
+    search.searchText.setText("Merol")
+    search.searchAction.activate(QAction.ActionEvent.Trigger)
+    assert search.searchResult.topLevelItemCount() == 14
+
+    # qtbot.stop()
+    nwGUI.closeProject()
+
+# END Test testGuiDocSearch_Replace
@@ -22,7 +22,9 @@ from __future__ import annotations
 
 import pytest
 
-from novelwriter.text.counting import bodyTextCounter, preProcessText, standardCounter
+from novelwriter.text.counting import (
+    blockCounter, bodyTextCounter, preProcessText, standardCounter, sumBlockCounts
+)
 
 
 @pytest.mark.core
@@ -183,6 +185,32 @@ def testTextCounting_standardCounter():
 # END Test testTextCounting_standardCounter
 
 
+@pytest.mark.core
+def testTextCounting_blockCounter():
+    """Test the block counter against the standard counter."""
+    # Single Blocks
+    assert blockCounter("") == (0, 0, 0, 0, 1)
+    assert blockCounter("% Comment") == (0, 0, 0, 0, -1)
+    assert blockCounter("@tag: Jane") == (0, 0, 0, 0, -1)
+    assert blockCounter("# Heading One") == (11, 2, 0, 0, 1)
+    assert blockCounter("Some text") == (9, 2, 0, 1, 0)
+    assert blockCounter("First\u2028Second") == (11, 2, 0, 1, 0)
+    assert blockCounter("\u2028Second") == (6, 1, 1, 0, 0)
+
+    # Full Texts
+    for text in [
+        "",
+        "# Heading\nText\n\nMore text\nSame paragraph\n",
+        "Text\n% Comment\nSame paragraph\n\n@tag: Jane\n\nNew paragraph",
+        "### Scene\nText — with dashes\n#! Title\n> Indented <\n\n[vspace]\n\nEnd",
+        "Text with [b]bold[/b] text.\n#hashtag\n\n\n##! Partition\nText\u2028line",
+    ]:
+        counts = sumBlockCounts(blockCounter(line) for line in text.split("\n"))
+        assert counts == standardCounter(text)
+
+# END Test testTextCounting_blockCounter
+
+
 @pytest.mark.core
 def testTextCounting_bodyTextCounter():
     """Test the body text counter."""
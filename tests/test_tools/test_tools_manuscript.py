@@ -25,7 +25,7 @@ import sys
 import pytest
 
 from PyQt5.QtCore import pyqtSlot
-from PyQt5.QtPrintSupport import QPrintPreviewDialog
+from PyQt5.QtPrintSupport import QPrintPreviewDialog, QPrinter
 from PyQt5.QtWidgets import QAction, QListWidgetItem
 
 from novelwriter import CONFIG, SHARED
@@ -335,3 +335,78 @@ def testManuscript_Print(monkeypatch, qtbot, nwGUI, projPath):
     # qtbot.stop()
 
 # END Test testManuscript_Print
+
+
+@pytest.mark.gui
+def testManuscript_ChunkedPreview(monkeypatch, qtbot, nwGUI, fncPath):
+    """Test that the preview widget loads large documents in chunks."""
+    manus = GuiManuscript(nwGUI)
+    manus.show()
+    manus.loadContent()
+
+    docPreview = manus.docPreview
+    monkeypatch.setattr(docPreview, "CHUNK_SIZE", 500)
+
+    html = []
+    for i in range(100):
+        html.append(
+            f"<h2><a name='0000000000000:T{i:04d}'></a>Heading {i}</h2>\n"
+            f"<p>Text\twith a tab in paragraph {i}.</p>\n"
+        )
+    docPreview.setContent({"html": html, "styles": [], "time": 0})
+
+    # Only the first chunk is loaded
+    docPreview.resize(400, 300)
+    text = docPreview.toPlainText()
+    assert "Heading 0" in text
+    assert "Heading 99" not in text
+    assert "Text\twith a tab in paragraph 0." in text
+    assert "!!tab!!" not in text
+    loaded = docPreview._loaded
+    assert 0 < loaded < 100
+
+    # Scrolling to the end loads more
+    vBar = docPreview.verticalScrollBar()
+    qtbot.wait(20)
+    vBar.setValue(vBar.maximum())
+    qtbot.wait(20)
+    assert docPreview._loaded > loaded
+
+    # Navigating to an anchor loads up to that point
+    docPreview.navigateTo("0000000000000:T0080")
+    assert docPreview._loaded > 80
+    assert "Heading 80" in docPreview.toPlainText()
+
+    # Printing loads everything
+    printer = QPrinter()
+    printer.setOutputFormat(QPrinter.OutputFormat.PdfFormat)
+    printer.setOutputFileName(str(fncPath / "preview.pdf"))
+    docPreview.printPreview(printer)
+    assert docPreview._loaded == 100
+    text = docPreview.toPlainText()
+    assert "Heading 99" in text
+    assert "Text\twith a tab in paragraph 99." in text
+    assert "!!tab!!" not in text
+
+    # A new build resets the content
+    vBar.setValue(vBar.maximum() // 2)
+    scrollPos = vBar.value()
+    assert scrollPos > 0
+    docPreview.beginNewBuild(10)
+    assert docPreview._loaded == 0
+    assert docPreview.toPlainText() == ""
+
+    # The scroll position is restored after the rebuild, even if it is
+    # beyond the first chunk, without loading the whole document
+    assert 10 < docPreview._scrollIndex < 100
+    docPreview.setContent({"html": html, "styles": [], "time": 0})
+    assert docPreview._scrollIndex < docPreview._loaded < 100
+    docPreview._postUpdate()
+    qtbot.waitUntil(lambda: vBar.value() == scrollPos, timeout=1000)
+    assert docPreview._loaded < 100
+
+    # Finish
+    manus.close()
+    # qtbot.stop()
+
+# END Test testManuscript_ChunkedPreview
@@ -0,0 +1,94 @@
+"""
+novelWriter – Spelling Report Tool Tester
+=========================================
+
+This file is a part of novelWriter
+Copyright 2018–2024, Veronica Berglyd Olsen
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import pytest
+
+from tools import C, buildTestProject
+
+from PyQt5.QtWidgets import QAction
+
+from novelwriter import SHARED
+from novelwriter.tools.spellreport import GuiSpellReport
+
+
+@pytest.mark.gui
+def testToolSpellReport_Main(qtbot, monkeypatch, nwGUI, projPath, mockRnd):
+    """Test the project spelling report tool."""
+    class MockDict:
+        def check(self, word):
+            return word not in ("tesst", "wrold") or word in SHARED.spelling._userDict
+
+    monkeypatch.setattr(SHARED, "runInThreadPool", lambda r, *a: r.run())
+
+    buildTestProject(nwGUI, projPath)
+    monkeypatch.setattr(SHARED.spelling, "newDictionary", lambda: MockDict())
+
+    # The open document is checked from the editor
+    assert nwGUI.openDocument(C.hSceneDoc) is True
+    nwGUI.docEditor.replaceText("### New Scene\n\nHello wrold, this is a tesst.\n")
+
+    chDoc = SHARED.project.storage.getDocument(C.hChapterDoc)
+    assert chDoc.writeDocument("## New Chapter\n\nAnother tesst.\n") is True
+
+    # Open the tool, which runs the check
+    nwGUI.mainMenu.aSpellReport.activate(QAction.Trigger)
+    qtbot.waitUntil(lambda: SHARED.findTopLevelWidget(GuiSpellReport) is not None, timeout=1000)
+    report = SHARED.findTopLevelWidget(GuiSpellReport)
+    assert isinstance(report, GuiSpellReport)
+
+    listBox = report.listBox
+    assert listBox.topLevelItemCount() == 2
+    tItem = listBox.topLevelItem(0)
+    wItem = listBox.topLevelItem(1)
+    assert tItem.text(0) == "tesst"
+    assert tItem.text(1) == "2"
+    assert tItem.childCount() == 2
+    assert tItem.child(0).text(0) == "New Chapter, line 3"
+    assert tItem.child(1).text(0) == "New Scene, line 3"
+    assert wItem.text(0) == "wrold"
+    assert wItem.text(1) == "1"
+    assert report.btnCheck.isEnabled() is True
+    assert report.btnAdd.isEnabled() is False
+
+    # Jump to a location
+    nwGUI.closeDocument()
+    report._openLocation(tItem.child(0), 0)
+    assert nwGUI.docEditor.docHandle == C.hChapterDoc
+    assert nwGUI.docEditor.textCursor().selectedText() == "tesst"
+
+    # A selected word can be added to the dictionary
+    listBox.setCurrentItem(wItem)
+    assert report.btnAdd.isEnabled() is True
+    report.btnAdd.click()
+    assert "wrold" in SHARED.spelling._userDict
+    assert listBox.topLevelItemCount() == 1
+    assert listBox.topLevelItem(0).text(0) == "tesst"
+
+    # Re-running the check finds the remaining words
+    report.btnCheck.click()
+    assert listBox.topLevelItemCount() == 1
+
+    report._doClose()
+
+    # qtbot.stop()
+
+# END Test testToolSpellReport_Main
@@ -90,6 +90,8 @@ def testToolWritingStats_Main(qtbot, monkeypatch, nwGUI, projPath, tstPaths):
         project.session.createRecord("2021-02-06 19:00:00", "2021-02-06 19:30:00", 600, 275, 80),
         project.session.createRecord("2021-02-07 19:00:00", "2021-02-07 19:30:00", 600, 275, 90),
     ]
+    for segment in (projPath / "meta").glob(f"{nwFiles.SESS_PREFIX}*"):
+        segment.unlink()
     sessFile.write_text("".join(data), encoding="utf-8")
     sessLog.populateGUI()
 